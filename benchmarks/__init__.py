@@ -0,0 +1,72 @@
+"""Reproducible micro-benchmarks for strapp.
+
+Each benchmark module is runnable directly, i.e. :code:`python -m benchmarks.http_client`, and
+emits its results as json (to stdout, or to the file given by :code:`--output`) so that
+results can be diffed between runs to track regressions.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+def measure(fn: Callable[[], Any], *, number: int, repeat: int = 5, warmup: int = 1) -> Dict:
+    """Time `number` calls of `fn`, `repeat` times, and summarize the per-call cost.
+
+    Returns:
+        A dict of the best/median per-call time (in microseconds) and the corresponding
+        best-case operations per second.
+    """
+    for _ in range(warmup):
+        fn()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - start) / number)
+
+    best = min(timings)
+    return {
+        "number": number,
+        "repeat": repeat,
+        "best_us": round(best * 1e6, 3),
+        "median_us": round(statistics.median(timings) * 1e6, 3),
+        "ops_per_sec": round(1 / best, 1) if best else None,
+    }
+
+
+def parse_args(description: str, argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--output", help="Write json results to this path, rather than stdout.")
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Multiply iteration counts, i.e. 0.1 for a quick smoke run.",
+    )
+    return parser.parse_args(argv)
+
+
+def scaled(number: int, scale: float) -> int:
+    return max(1, int(number * scale))
+
+
+def emit(name: str, results: Dict[str, Dict], output: Optional[str] = None):
+    document = {
+        "benchmark": name,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    content = json.dumps(document, indent=2, sort_keys=True)
+    if output:
+        with open(output, "w") as f:
+            f.write(content + "\n")
+    else:
+        sys.stdout.write(content + "\n")
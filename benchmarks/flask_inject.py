@@ -0,0 +1,93 @@
+"""Benchmark the per-request overhead of :func:`strapp.flask.inject`.
+
+Views are called directly within an app context, excluding flask's own dispatch, such that
+the results reflect only the cost of the injection itself. Measures, for a single
+:func:`identity` injection, a single context-managed injection and three context-managed
+injections:
+    * The undecorated view, as the baseline.
+    * The original per-request implementation (an `ExitStack`, and an extension lookup and
+      error handling per injection), for comparison.
+    * :func:`strapp.flask.inject`.
+
+Examples:
+    python -m benchmarks.flask_inject --output bench_output.json
+"""
+import contextlib
+import functools
+
+import flask
+
+from benchmarks import emit, measure, parse_args, scaled
+from strapp.flask import create_app, identity, inject
+
+
+def legacy_inject(**injections):
+    """The original implementation of :func:`strapp.flask.inject`."""
+
+    def _inject(fn_):
+        @functools.wraps(fn_)
+        def wrapper(**kwargs):
+            with contextlib.ExitStack() as stack:
+                injected_kwargs = {}
+                for key, injection in injections.items():
+                    try:
+                        extension = flask.current_app.extensions[key]
+                    except KeyError:
+                        raise ValueError(f"{key} is not registered in flask's extensions.")
+                    injected_kwargs[key] = stack.enter_context(injection(extension))
+
+                result = fn_(**kwargs, **injected_kwargs)
+            return result
+
+        return wrapper
+
+    return _inject
+
+
+@contextlib.contextmanager
+def managed(extension):
+    yield extension
+
+
+def view(**kwargs):
+    return kwargs
+
+
+CASES = {
+    "identity": {"a": identity()},
+    "managed": {"a": managed},
+    "managed_3": {"a": managed, "b": managed, "c": managed},
+}
+
+
+def main(argv=None):
+    args = parse_args(__doc__, argv)
+    number = scaled(100_000, args.scale)
+
+    def register(app):
+        app.extensions.update(a="a", b="b", c="c")
+
+    app = create_app(callbacks=[register])
+
+    results = {}
+    with app.app_context():
+        for name, injections in CASES.items():
+            baseline = functools.partial(view, **{key: key for key in injections})
+            legacy = legacy_inject(**injections)(view)
+            injected = inject(**injections)(view)
+
+            results[f"{name}.baseline"] = measure(baseline, number=number)
+            results[f"{name}.legacy"] = measure(legacy, number=number)
+            results[f"{name}.inject"] = measure(injected, number=number)
+
+            for variant in ["legacy", "inject"]:
+                overhead = (
+                    results[f"{name}.{variant}"]["best_us"] - results[f"{name}.baseline"]["best_us"]
+                )
+                results[f"{name}.{variant}"]["overhead_us"] = round(overhead, 3)
+
+    emit("flask_inject", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
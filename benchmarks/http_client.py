@@ -0,0 +1,126 @@
+"""Benchmark :mod:`strapp.http` against a local stand-in server.
+
+Measures:
+    * Raw :class:`requests.Session` throughput, as the baseline.
+    * :meth:`HttpClient.make_request` throughput, and its per-request overhead over the baseline
+      (backoff wrapping, logging, error mapping and session handling).
+    * The 4XX error-mapping path, and the cost of a request which exhausts its retries.
+    * Mapper throughput for :func:`map_many` and :func:`into_map`.
+
+Examples:
+    python -m benchmarks.http_client --output bench_output.json
+"""
+import json
+import threading
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from benchmarks import emit, measure, parse_args, scaled
+from strapp.http.client import Http4XXError, Http5XXError, HttpClient
+from strapp.http.request import into_map, map_many
+
+BODY = json.dumps({"id": 1, "name": "foo"}).encode()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # Avoid delayed-ack stalls from writing the headers and body in separate packets.
+    disable_nagle_algorithm = True
+    wbufsize = -1
+
+    def do_GET(self):
+        status = 200
+        if self.path.startswith("/status/"):
+            status = int(self.path.split("/")[-1])
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@dataclass
+class Item:
+    id: int
+    name: str
+
+
+def run_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
+
+
+def bench_requests(base_url, scale):
+    number = scaled(500, scale)
+    results = {}
+
+    session = requests.Session()
+    results["raw_requests"] = measure(lambda: session.get(f"{base_url}/ok"), number=number)
+
+    client = HttpClient(base_url)
+    results["http_client"] = measure(lambda: client.make_request("GET", "ok"), number=number)
+    results["http_client_log_response_body"] = measure(
+        lambda: client.make_request("GET", "ok", log_response_body=True), number=number
+    )
+
+    def error_4xx():
+        try:
+            client.make_request("GET", "status/404")
+        except Http4XXError:
+            pass
+
+    results["http_client_4xx"] = measure(error_4xx, number=number)
+
+    def retry_5xx():
+        try:
+            client.make_request("GET", "status/500", retries=3, backoff_base=0, backoff_factor=0)
+        except Http5XXError:
+            pass
+
+    results["http_client_5xx_3_retries"] = measure(retry_5xx, number=scaled(100, scale))
+
+    overhead = results["http_client"]["best_us"] - results["raw_requests"]["best_us"]
+    results["http_client_overhead"] = {"best_us": round(overhead, 3)}
+    return results
+
+
+def bench_mappers(scale):
+    number = scaled(50, scale)
+    payload = [{"id": i, "name": str(i)} for i in range(10_000)]
+
+    def to_item(data):
+        return Item(**data)
+
+    many = map_many(to_item)
+    by_id = into_map(to_item, "id")
+
+    return {
+        "map_many_10k": measure(lambda: many(payload), number=number),
+        "into_map_10k": measure(lambda: by_id(payload), number=number),
+    }
+
+
+def main(argv=None):
+    args = parse_args(__doc__, argv)
+
+    server, base_url = run_server()
+    try:
+        results = bench_requests(base_url, args.scale)
+    finally:
+        server.shutdown()
+
+    results.update(bench_mappers(args.scale))
+    emit("http_client", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
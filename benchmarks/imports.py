@@ -0,0 +1,66 @@
+"""Benchmark the import time of each strapp subpackage, each in a fresh interpreter.
+
+Measures, per subpackage, the best/median wall time of :code:`import strapp.<subpackage>`
+(excluding interpreter startup), along with the heavy dependencies that import loaded.
+
+Examples:
+    python -m benchmarks.imports --output bench_output.json
+"""
+import json
+import statistics
+import subprocess  # nosec
+import sys
+
+from benchmarks import emit, parse_args, scaled
+
+MODULES = [
+    "strapp.click",
+    "strapp.datadog",
+    "strapp.dramatiq",
+    "strapp.flask",
+    "strapp.http.client",
+    "strapp.sentry",
+    "strapp.sqlalchemy",
+]
+
+HEAVY = ["datadog", "flask", "pytest", "redis", "requests", "sentry_sdk", "sqlalchemy"]
+
+SCRIPT = """
+import json, sys, time, types
+start = time.perf_counter()
+import {module}
+duration = time.perf_counter() - start
+loaded = [
+    name for name in {heavy!r}
+    if name in sys.modules and type(sys.modules[name]) is types.ModuleType
+]
+print(json.dumps({{"duration": duration, "loaded": loaded}}))
+"""
+
+
+def time_import(module: str) -> dict:
+    script = SCRIPT.format(module=module, heavy=HEAVY)
+    output = subprocess.check_output([sys.executable, "-c", script])  # nosec
+    return json.loads(output)
+
+
+def main(argv=None):
+    args = parse_args(__doc__, argv)
+    repeat = scaled(10, args.scale)
+
+    results = {}
+    for module in MODULES:
+        runs = [time_import(module) for _ in range(repeat)]
+        timings = [run["duration"] for run in runs]
+        results[module] = {
+            "repeat": repeat,
+            "best_ms": round(min(timings) * 1000, 3),
+            "median_ms": round(statistics.median(timings) * 1000, 3),
+            "loaded": runs[-1]["loaded"],
+        }
+
+    emit("imports", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
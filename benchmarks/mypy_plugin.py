@@ -0,0 +1,140 @@
+"""Benchmark the overhead of :mod:`strapp.sqlalchemy.mypy` on a generated project.
+
+Generates a project of (by default) 400 models, spread across modules of 20, some of which use
+the `created_at`/`updated_at`/`deleted_at` class keywords, and type-checks it (without mypy's
+incremental cache) with the strapp plugin ahead of sqlalchemy's, as documented.
+
+Measures:
+    * The total type-checking time.
+    * The time spent within the strapp plugin's hooks, and the number of calls to each.
+
+Examples:
+    python -m benchmarks.mypy_plugin --output bench_output.json
+    python -m benchmarks.mypy_plugin --scale 0.1
+"""
+import collections
+import functools
+import os
+import tempfile
+import time
+
+from mypy import api
+
+import strapp.sqlalchemy.mypy
+from benchmarks import emit, parse_args, scaled
+
+MODELS_PER_MODULE = 20
+
+MODEL = """
+class Model{index}(Base{keywords}):
+    __tablename__ = "model{index}"
+
+    id = Column(types.Integer(), primary_key=True)
+    name = Column(types.Unicode(), nullable=False)
+    parent_id = Column(types.Integer(), ForeignKey("model{index}.id"))
+
+
+def use{index}(model: Model{index}) -> int:
+    return (model.id or 0) + len(model.name or "")
+"""
+
+KEYWORDS = ["", ", created_at=True", ", created_at=True, updated_at=True", ", deleted_at=True"]
+
+
+def generate(path: str, models: int):
+    package = os.path.join(path, "project")
+    os.makedirs(package)
+
+    with open(os.path.join(package, "__init__.py"), "w") as f:
+        f.write("")
+
+    with open(os.path.join(package, "base.py"), "w") as f:
+        f.write("from strapp.sqlalchemy import declarative_base\n\nBase = declarative_base()\n")
+
+    for module in range(0, models, MODELS_PER_MODULE):
+        with open(os.path.join(package, f"models{module}.py"), "w") as f:
+            f.write("from sqlalchemy import Column, ForeignKey, types\n\n")
+            f.write("from project.base import Base\n")
+            for index in range(module, min(module + MODELS_PER_MODULE, models)):
+                f.write(MODEL.format(index=index, keywords=KEYWORDS[index % len(KEYWORDS)]))
+
+    return package
+
+
+def instrument(timings, calls):
+    """Accumulate the time spent within (and calls to) each of the plugin's hooks."""
+
+    def timed(name, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timings[name] += time.perf_counter() - start
+                calls[name] += 1
+
+        return wrapper
+
+    plugin = strapp.sqlalchemy.mypy.StrappSqlalchemyPlugin
+    for name in ["get_base_class_hook", "get_dynamic_class_hook"]:
+        setattr(plugin, name, timed(name, getattr(plugin, name)))
+
+    for name in ["_base_cls_hook", "_dynamic_class_hook"]:
+        setattr(strapp.sqlalchemy.mypy, name, timed(name, getattr(strapp.sqlalchemy.mypy, name)))
+
+
+def check(path: str, package: str) -> float:
+    config = os.path.join(path, "mypy.ini")
+    with open(config, "w") as f:
+        f.write(
+            "[mypy]\n"
+            "plugins = strapp.sqlalchemy.mypy, sqlalchemy.ext.mypy.plugin\n"
+            "incremental = False\n"
+        )
+
+    start = time.perf_counter()
+    stdout, stderr, status = api.run(["--config-file", config, package])
+    duration = time.perf_counter() - start
+
+    if status:
+        raise RuntimeError(f"Type checking the generated project failed:\n{stdout}{stderr}")
+    return duration
+
+
+def main(argv=None):
+    args = parse_args(__doc__, argv)
+    models = scaled(400, args.scale)
+
+    timings: collections.Counter = collections.Counter()
+    calls: collections.Counter = collections.Counter()
+    instrument(timings, calls)
+
+    with tempfile.TemporaryDirectory() as path:
+        package = generate(path, models)
+
+        cwd = os.getcwd()
+        os.chdir(path)
+        try:
+            duration = check(path, package)
+        finally:
+            os.chdir(cwd)
+
+    # The hooks returned by `get_*_hook` are timed separately from the lookups themselves.
+    plugin = sum(timings.values())
+    results = {
+        "type_check": {
+            "models": models,
+            "total_s": round(duration, 3),
+            "plugin_s": round(plugin, 3),
+            "plugin_ms_per_model": round(plugin / models * 1000, 3),
+        }
+    }
+    for name in sorted(calls):
+        results[name] = {"calls": calls[name], "total_ms": round(timings[name] * 1000, 3)}
+
+    emit("mypy_plugin", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import importlib.util
+import sys
+import threading
+from types import ModuleType
+from typing import Dict, Set
+
+# Guards the execution of each lazily imported module (by name).
+_locks: Dict[str, threading.RLock] = {}
+_loading: Set[str] = set()
+
+
+class _LazyModule(ModuleType):
+    """A module which is executed upon first attribute access.
+
+    Unlike the module of :class:`importlib.util.LazyLoader` (before python 3.12), which reverts to
+    a plain module before executing, the module is only made available once executed. Threads
+    concurrently accessing it first therefore never observe a partially executed module.
+    """
+
+    def __getattribute__(self, attr):
+        spec = object.__getattribute__(self, "__spec__")
+        with _locks[spec.name]:
+            # The executing thread itself accesses the module while executing it.
+            if type(self) is _LazyModule and spec.name not in _loading:
+                _loading.add(spec.name)
+                try:
+                    spec.loader.exec_module(self)
+                finally:
+                    _loading.discard(spec.name)
+                self.__class__ = ModuleType
+        return ModuleType.__getattribute__(self, attr)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Import the module `name`, deferring its execution until an attribute is first accessed.
+
+    Raises :class:`ImportError` immediately if the module is not installed, such that the usual
+    `try`/`except ImportError` handling of optional dependencies is unaffected.
+
+    Examples:
+        >>> json = lazy_import("json")
+        >>> json.dumps([1])
+        '[1]'
+
+        >>> lazy_import("not_a_module")
+        Traceback (most recent call last):
+          ...
+        ModuleNotFoundError: No module named 'not_a_module'
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+
+    _locks.setdefault(spec.name, threading.RLock())
+    module = importlib.util.module_from_spec(spec)
+    module.__class__ = _LazyModule
+    sys.modules[name] = module
+    return module
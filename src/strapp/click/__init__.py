@@ -1,4 +1,7 @@
 # flake8: noqa
+import importlib
+import sys
+
 import click
 
 from strapp.click.resolver import Resolver
@@ -6,12 +9,13 @@ from strapp.click.resolver import Resolver
 option = click.option
 argument = click.argument
 
-try:
-    import pytest
-except ImportError:  # pragma: nocover
-    pass
-else:
-    pytest.register_assert_rewrite("strapp.click.testing")
-    del pytest
-finally:
-    from strapp.click import testing
+# Assertion rewriting only matters under pytest, which will already have been imported.
+if "pytest" in sys.modules:
+    sys.modules["pytest"].register_assert_rewrite("strapp.click.testing")
+
+
+def __getattr__(name):
+    # `testing` (and `unittest.mock`) is imported upon first use, rather than by every cli.
+    if name == "testing":
+        return importlib.import_module("strapp.click.testing")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,11 +1,15 @@
+import contextlib
 import functools
 import inspect
+import sys
 import traceback
 
 import click
 
+from strapp._lazy import lazy_import
+
 try:
-    import sentry_sdk
+    sentry_sdk = lazy_import("sentry_sdk")
 except ImportError:  # pragma: nocover
     sentry_sdk = None  # type: ignore
 
@@ -106,6 +110,10 @@ class Resolver:
 
         The primary difference between this and :func:`click.command` is that :meth:`Resolver.command`
         accepts its cli group as an argument, rather than being a method on the group itself.
+
+        Each invocation of the command is a :func:`strapp.sqlalchemy.profiling.unit_of_work`, for
+        the purposes of statement instrumentation, provided :mod:`strapp.sqlalchemy` has been
+        imported before the command is invoked (i.e. not first imported by the command itself).
         """
 
         def decorator(fn):
@@ -115,7 +123,8 @@ class Resolver:
                 context = self.resolve(fn)
                 final_kwargs = {**context, **kwargs}
                 try:
-                    return fn(*args, **final_kwargs)
+                    with _command_unit_of_work(fn):
+                        return fn(*args, **final_kwargs)
                 except (click.ClickException, click.Abort):
                     raise
                 except Exception as e:
@@ -127,3 +136,12 @@ class Resolver:
             return wrapper
 
         return decorator
+
+
+def _command_unit_of_work(fn):
+    # Units of work are only observable through `strapp.sqlalchemy.profiling`, so commands of
+    # clis which never import it need not pay for importing it (and sqlalchemy).
+    profiling = sys.modules.get("strapp.sqlalchemy.profiling")
+    if profiling is None:
+        return contextlib.nullcontext()
+    return profiling.unit_of_work(fn.__name__)
@@ -1,10 +1,15 @@
 import contextlib
 import datetime
 import functools
+import importlib.util
 import logging
+import sys
 from typing import Any, Dict, Optional
 
-import datadog
+# `datadog` itself is imported upon `setup`, rather than upon import. Without it, there is
+# nothing to report.
+if importlib.util.find_spec("datadog") is None:
+    raise ImportError("No module named 'datadog'", name="datadog")
 
 log = logging.getLogger(__name__)
 
@@ -21,6 +26,8 @@ def setup(
     statsd_port = config.get("statsd_port")
 
     if app_key is not None and api_key is not None:
+        import datadog
+
         constant_tags = []
 
         if environment:
@@ -40,6 +47,11 @@ def setup(
 def require_datadog_initialization(fn):
     @functools.wraps(fn)
     def decorator(*args, **kwargs):
+        # Datadog cannot have been initialized, if it has not even been imported.
+        datadog = sys.modules.get("datadog")
+        if datadog is None:
+            return
+
         if datadog.api._api_key is not None and datadog.api._application_key is not None:
             fn(*args, **kwargs)
 
@@ -48,14 +60,25 @@ def require_datadog_initialization(fn):
 
 @require_datadog_initialization
 def increment(metric, value=1, tags=None, sample_rate=None):
+    import datadog
+
     datadog.statsd.increment(metric=metric, value=value, tags=tags, sample_rate=sample_rate)
 
 
 @require_datadog_initialization
 def gauge(metric, value, tags=None, sample_rate=None):
+    import datadog
+
     datadog.statsd.gauge(metric=metric, value=value, tags=tags, sample_rate=sample_rate)
 
 
+@require_datadog_initialization
+def histogram(metric, value, tags=None, sample_rate=None):
+    import datadog
+
+    datadog.statsd.histogram(metric=metric, value=value, tags=tags, sample_rate=sample_rate)
+
+
 @contextlib.contextmanager
 def gauge_duration(metric: str, tags=None, sample_rate=None):
     start = datetime.datetime.now()
@@ -1,14 +1,9 @@
-from typing import Callable, Optional, Union
+from typing import Callable, Optional, TYPE_CHECKING, Union
 
 import dramatiq
-from dramatiq.brokers.redis import RedisBroker
-from dramatiq.results import Results
-from dramatiq.results.backends import RedisBackend
 
-try:
-    from strapp.dramatiq.datadog import DatadogMiddleware
-except Exception:  # nosec
-    pass
+if TYPE_CHECKING:
+    from dramatiq.brokers.redis import RedisBroker
 
 
 def configure(
@@ -16,18 +11,25 @@ def configure(
     redis_dsn=None,
     enable_datadog_middleware: bool = False,
     env: Optional[str] = None,
-) -> RedisBroker:
+) -> "RedisBroker":
     """Configure a Redis broker.
 
     Both the worker itself, as well as any code which wants to `enqueue` work, should call this
     function at startup.
     """
+    # Imported here, rather than upon import, such that code which only defines actors or builds
+    # messages does not pay for importing redis (or datadog).
+    from dramatiq.brokers.redis import RedisBroker
+    from dramatiq.results import Results
+    from dramatiq.results.backends import RedisBackend
 
     backend = RedisBackend(url=redis_dsn)
     broker = RedisBroker(url=redis_dsn)
     broker.add_middleware(Results(backend=backend))
 
     if enable_datadog_middleware:
+        from strapp.dramatiq.datadog import DatadogMiddleware
+
         broker.add_middleware(DatadogMiddleware(env=env))
 
     dramatiq.set_broker(broker)
@@ -0,0 +1,45 @@
+import logging
+
+import dramatiq
+from dramatiq.middleware import Middleware
+
+try:
+    from strapp.sqlalchemy.profiling import RepeatedStatementError, unit_of_work
+except ImportError:
+    raise RuntimeError("sqlalchemy is required for the sqlalchemy middleware")
+
+log = logging.getLogger(__name__)
+
+
+class UnitOfWorkMiddleware(Middleware):
+    """Process each message as a :func:`strapp.sqlalchemy.profiling.unit_of_work`.
+
+    Statements executed (by instrumented engines) while processing a message are counted
+    against that message's actor. As the message has already been processed, repeated statements
+    (with :code:`on_repeat="raise"`) are logged as errors rather than raised.
+    """
+
+    def __init__(self):
+        self.units = {}
+
+    def before_process_message(self, broker: dramatiq.Broker, message: dramatiq.Message):
+        unit = unit_of_work(message.actor_name)
+        unit.__enter__()
+        self.units[message.message_id] = unit
+
+    def after_process_message(
+        self, broker: dramatiq.Broker, message: dramatiq.Message, *, result=None, exception=None
+    ):
+        unit = self.units.pop(message.message_id, None)
+        if unit is None:
+            return
+
+        try:
+            if exception is None:
+                unit.__exit__(None, None, None)
+            else:
+                unit.__exit__(type(exception), exception, exception.__traceback__)
+        except RepeatedStatementError:
+            log.exception("Repeated statements while processing %s", message)
+
+    after_skip_message = after_process_message
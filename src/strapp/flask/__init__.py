@@ -1,7 +1,14 @@
 # flake8: noqa
 from strapp.flask.base import create_app
 from strapp.flask.database import callback_factory, sqlalchemy_database
-from strapp.flask.decorators import identity, inject, inject_db, json_response, manage_session
+from strapp.flask.decorators import (
+    check_injections,
+    identity,
+    inject,
+    inject_db,
+    json_response,
+    manage_session,
+)
 from strapp.flask.error import (
     BadRequest,
     default_error_handlers,
@@ -3,6 +3,7 @@ from typing import Mapping, Optional
 import flask
 from flask_reverse_proxy import FlaskReverseProxied
 
+from strapp.flask.decorators import check_injections
 from strapp.flask.error import default_error_handlers
 from strapp.flask.route import Route
 
@@ -38,7 +39,8 @@ def create_app(
     error_handlers=None,
     flask_args=None,
     proxied=True,
-    callbacks=None
+    callbacks=None,
+    validate_injections=False
 ):
     """Create a flask app instance.
 
@@ -52,6 +54,10 @@ def create_app(
         flask_args: Optional set of kwargs to pass through to the `Flask` constructor.
         proxied: Whether to apply a flask middleware which allows it to be proxied through nginx.
         callbacks: Optional list of functions which accept an `app` instance as their only argument.
+        validate_injections: Whether to check that the extensions injected into the routes'
+            views are registered (once `callbacks` have run), see
+            :func:`strapp.flask.decorators.check_injections`. Off by default, as apps may
+            register extensions after creating the app.
 
     Examples:
         Registering routes:
@@ -111,4 +117,7 @@ def create_app(
     for callback in callbacks:
         callback(app)
 
+    if validate_injections:
+        check_injections(app)
+
     return app
@@ -4,10 +4,13 @@ import flask
 import werkzeug
 
 
-def sqlalchemy_database(app: flask.Flask, config: Mapping):
+def sqlalchemy_database(app: flask.Flask, config: Mapping, **kwargs):
     """Produce a session, for use in the context of a flask request response cycle.
 
     Typically this would be used in conjunction with :func:`strapp.flask.callback_factory`.
+
+    Any additional `kwargs` are passed through to :func:`strapp.sqlalchemy.create_session_cls`,
+    i.e. :code:`functools.partial(sqlalchemy_database, pool_health={"warm_up": 5})`.
     """
     from strapp.sqlalchemy import create_session_cls
 
@@ -16,7 +19,7 @@ def sqlalchemy_database(app: flask.Flask, config: Mapping):
     else:
         scopefunc = None
 
-    Session = create_session_cls(config, scopefunc=scopefunc)
+    Session = create_session_cls(config, scopefunc=scopefunc, **kwargs)
     session = Session()
 
     @app.teardown_appcontext
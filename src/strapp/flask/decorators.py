@@ -1,12 +1,20 @@
 import contextlib
 import functools
+import sys
 
 import flask
 
+# The attribute of injected views naming the extensions they require, see `check_injections`.
+INJECTIONS_ATTR = "__strapp_injections__"
+
 
 def manage_session(commit_on_success=False):
     """Create a context manager which manages the lifecycle of a sqlalchemy session.
 
+    The request is also a :func:`strapp.sqlalchemy.profiling.unit_of_work`, named after its
+    endpoint, for the purposes of statement instrumentation, provided :mod:`strapp.sqlalchemy`
+    has been imported before the request (i.e. not first imported by the view itself).
+
     See :func:`strapp.flask.inject`.
 
     Args:
@@ -16,19 +24,31 @@ def manage_session(commit_on_success=False):
 
     @contextlib.contextmanager
     def _manage_session(db):
-        try:
-            yield db
-        except Exception:
-            db.rollback()
-            raise
-        else:
-            if commit_on_success:
-                db.commit()
-            db.close()
+        with _request_unit_of_work():
+            try:
+                yield db
+            except Exception:
+                db.rollback()
+                raise
+            else:
+                if commit_on_success:
+                    db.commit()
+                db.close()
 
     return _manage_session
 
 
+def _request_unit_of_work():
+    # As with `strapp.click`, units of work are only observable through
+    # `strapp.sqlalchemy.profiling`, so apps which never import it need not import it either.
+    profiling = sys.modules.get("strapp.sqlalchemy.profiling")
+    if profiling is None:
+        return contextlib.nullcontext()
+
+    name = flask.request.endpoint if flask.has_request_context() else None
+    return profiling.unit_of_work(name or "flask")
+
+
 def identity():
     """Create a context manager which **just** yields the extension.
 
@@ -39,17 +59,24 @@ def identity():
         ... def view(db):
         ...     ...
     """
+    return _identity
 
-    @contextlib.contextmanager
-    def _manage(extension):
-        yield extension
 
-    return _manage
+@contextlib.contextmanager
+def _identity(extension):
+    yield extension
 
 
 def inject(**injections):
     """Inject context managed extensions into the view.
 
+    The injections are resolved once, upon decoration, rather than per request. Views whose
+    injections are all :func:`identity` skip context management altogether.
+
+    A missing extension fails each request into the view. To instead check the existence of
+    the extensions up front, supply :code:`validate_injections=True` to
+    :func:`strapp.flask.create_app`, or call :func:`check_injections` on the app.
+
     Args:
         **injections: A mapping from the name of an extension, to a context-manager function
             which knows how to manage that extension within the context of a request.
@@ -69,26 +96,89 @@ def inject(**injections):
         ...    ...
     """
 
+    keys = tuple(injections)
+    managers = tuple(injections.values())
+
     def _inject(fn_):
-        @functools.wraps(fn_)
-        def wrapper(**kwargs):
-            with contextlib.ExitStack() as stack:
-                injected_kwargs = {}
-                for key, injection in injections.items():
-                    try:
-                        extension = flask.current_app.extensions[key]
-                    except KeyError:
-                        raise ValueError(f"{key} is not registered in flask's extensions.")
-                    injected_kwargs[key] = stack.enter_context(injection(extension))
-
-                result = fn_(**kwargs, **injected_kwargs)
-            return result
+        if all(manager is _identity for manager in managers):
+
+            @functools.wraps(fn_)
+            def wrapper(**kwargs):
+                extensions = _current_app().extensions
+                try:
+                    for key in keys:
+                        kwargs[key] = extensions[key]
+                except KeyError as e:
+                    raise _not_registered(e)
+                return fn_(**kwargs)
+
+        elif len(keys) == 1:
+            key, manager = keys[0], managers[0]
+
+            @functools.wraps(fn_)
+            def wrapper(**kwargs):
+                try:
+                    extension = _current_app().extensions[key]
+                except KeyError as e:
+                    raise _not_registered(e)
+
+                with manager(extension) as value:
+                    kwargs[key] = value
+                    return fn_(**kwargs)
+
+        else:
 
+            @functools.wraps(fn_)
+            def wrapper(**kwargs):
+                extensions = _current_app().extensions
+                with contextlib.ExitStack() as stack:
+                    for key, manager in zip(keys, managers):
+                        try:
+                            extension = extensions[key]
+                        except KeyError as e:
+                            raise _not_registered(e)
+                        kwargs[key] = stack.enter_context(manager(extension))
+                    return fn_(**kwargs)
+
+        _add_injections(wrapper, keys)
         return wrapper
 
     return _inject
 
 
+# Resolving the app once, rather than accessing attributes through the proxy, is considerably
+# cheaper.
+_current_app = flask.current_app._get_current_object  # type: ignore
+
+
+def _not_registered(error: KeyError) -> ValueError:
+    # Only reachable for views registered outside of `create_app`, see `check_injections`.
+    return ValueError(f"{error.args[0]} is not registered in flask's extensions.")
+
+
+def _add_injections(wrapper, keys):
+    # Accumulated, as `functools.wraps` copies the attribute of any injected view being wrapped.
+    setattr(wrapper, INJECTIONS_ATTR, (*getattr(wrapper, INJECTIONS_ATTR, ()), *keys))
+
+
+def check_injections(app):
+    """Check that the extensions injected into each of the `app`'s views are registered.
+
+    Called by :func:`strapp.flask.create_app` (given :code:`validate_injections=True`), such
+    that a missing extension fails at startup, rather than upon each request.
+
+    Raises:
+        ValueError: If any view injects an extension which is not registered.
+    """
+    for endpoint, view in app.view_functions.items():
+        for key in getattr(view, INJECTIONS_ATTR, ()):
+            if key not in app.extensions:
+                raise ValueError(
+                    f"{key} is not registered in flask's extensions, "
+                    f"but is injected into the {endpoint!r} view."
+                )
+
+
 def inject_db(fn=None, *, commit_on_success=False, key="db"):
     """Shortcut to :code:`@inject(db=manage_session(...))`, to inject and manage database sessions.
 
@@ -109,15 +199,17 @@ def inject_db(fn=None, *, commit_on_success=False, key="db"):
         ...     pass
     """
 
+    manager = manage_session(commit_on_success=commit_on_success)
+
     def _inject_db(fn):
         @functools.wraps(fn)
         def wrapper(*args, **kwargs):
-            manager = manage_session(commit_on_success=commit_on_success)
-            db = flask.current_app.extensions[key]
+            db = _current_app().extensions[key]
             with manager(db) as db:
                 result = fn(db, *args, **kwargs)
             return result
 
+        _add_injections(wrapper, (key,))
         return wrapper
 
     if fn is not None:
@@ -6,8 +6,10 @@ import traceback
 import werkzeug
 from flask import Response
 
+from strapp._lazy import lazy_import
+
 try:
-    import sentry_sdk
+    sentry_sdk = lazy_import("sentry_sdk")
 except ImportError:  # pragma: nocover
     sentry_sdk = None  # type: ignore
 
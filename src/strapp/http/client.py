@@ -1,11 +1,14 @@
 from json import JSONDecodeError
 from pprint import pformat
+from typing import Optional
 
 import backoff
 import requests
 import urllib3
 from setuplog import log
 
+from strapp.http.transport import RequestsTransport, Transport
+
 
 class Http4XXError(requests.exceptions.HTTPError):
     """A request returned a 4XX code."""
@@ -43,22 +46,43 @@ def default_give_up_retries(e):
 
 
 class HttpClient:
-    def __init__(self, base_url, authenticator=None):
+    """Make requests against a common base url.
+
+    Args:
+        base_url: The url which all (relative) requests are made against.
+        authenticator: Optional callable, which is called with the client upon first use.
+        transport: Optional :class:`strapp.http.transport.Transport`. Defaults to a
+            :class:`requests.Session`-backed HTTP/1.1 transport. Supply a
+            :class:`strapp.http.transport.Http2Transport` to multiplex concurrent requests
+            over a single HTTP/2 connection.
+    """
+
+    def __init__(self, base_url, authenticator=None, transport: Optional[Transport] = None):
         self._base_url = base_url
         self._authenticator = authenticator
+        self._transport = transport if transport is not None else RequestsTransport()
         self._session = None
 
+    @property
+    def transport(self) -> Transport:
+        # Ensure the authenticator has had the chance to configure the session.
+        self.session
+        return self._transport
+
     @property
     def session(self):
         if not self._session:
-            session = requests.Session()
-            self._session = session
+            self._session = self._transport.session
 
             if self._authenticator:
                 self._authenticator(self)
 
         return self._session
 
+    def close(self):
+        self._transport.close()
+        self._session = None
+
     def set_header(self, header, value):
         self.session.headers[header] = value
 
@@ -100,7 +124,7 @@ class HttpClient:
             factor=backoff_factor,
         )
         def _request(fq_url):
-            response = self.session.request(
+            response = self.transport.request(
                 method,
                 fq_url,
                 headers=headers,
@@ -0,0 +1,222 @@
+import abc
+import threading
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import httpx
+except ImportError:  # pragma: nocover
+    httpx = None  # type: ignore
+
+
+class Transport(metaclass=abc.ABCMeta):
+    """The thing which actually sends requests on behalf of an :class:`HttpClient`.
+
+    Transports always produce :class:`requests.Response` objects and raise
+    :mod:`requests.exceptions`, so that retry and error handling behave identically
+    regardless of the underlying protocol.
+    """
+
+    @property
+    @abc.abstractmethod
+    def session(self):
+        """Return the underlying (protocol-specific) session object."""
+
+    @abc.abstractmethod
+    def request(
+        self,
+        method,
+        url,
+        *,
+        headers=None,
+        params=None,
+        data=None,
+        files=None,
+        auth=None,
+        timeout=None,
+        json=None,
+        stream=None,
+    ) -> requests.Response:
+        """Send a single request."""
+
+    def close(self):
+        """Release any held connections."""
+
+
+class RequestsTransport(Transport):
+    """HTTP/1.1 transport backed by a :class:`requests.Session`."""
+
+    def __init__(self):
+        self._session = None
+
+    @property
+    def session(self):
+        if not self._session:
+            self._session = requests.Session()
+        return self._session
+
+    def request(self, method, url, **kwargs):
+        return self.session.request(method, url, **kwargs)
+
+    def close(self):
+        if self._session:
+            self._session.close()
+            self._session = None
+
+
+class Http2Transport(Transport):
+    """HTTP/2 transport backed by an :class:`httpx.Client`.
+
+    Concurrent requests (for example, from a thread pool sharing one :class:`HttpClient`) to
+    the same origin are multiplexed as separate streams over a single connection.
+
+    Requests-style arguments are translated: :code:`(connect, read)` timeout tuples become an
+    :class:`httpx.Timeout`, and :class:`requests.auth.AuthBase` instances an equivalent httpx
+    auth. Streamed (:code:`stream=True`) responses are not supported. Redirects are followed,
+    unless :code:`follow_redirects=False` is supplied.
+
+    Args:
+        **client_kwargs: Passed through to :class:`httpx.Client`. For example, :code:`http1=False`
+            forces HTTP/2 "prior knowledge" for plaintext (h2c) upstreams.
+
+    Examples:
+        >>> from strapp.http.client import HttpClient
+        >>> client = HttpClient("https://example.com", transport=Http2Transport())
+    """
+
+    def __init__(self, **client_kwargs):
+        if httpx is None:  # pragma: nocover
+            raise RuntimeError("httpx[http2] is required for the HTTP/2 transport.")
+
+        # As with :class:`requests.Session`, redirects are followed by default.
+        client_kwargs.setdefault("follow_redirects", True)
+
+        self.client_kwargs = client_kwargs
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        # The client is shared between threads, so that their requests can share a connection.
+        if not self._session:
+            with self._lock:
+                if not self._session:
+                    self._session = httpx.Client(http2=True, **self.client_kwargs)
+        return self._session
+
+    def request(
+        self,
+        method,
+        url,
+        *,
+        headers=None,
+        params=None,
+        data=None,
+        files=None,
+        auth=None,
+        timeout=None,
+        json=None,
+        stream=None,
+    ):
+        if stream:
+            raise ValueError("The HTTP/2 transport does not support streamed responses.")
+
+        content = None
+        if isinstance(data, (bytes, str)):
+            content, data = data, None
+
+        try:
+            response = self.session.request(
+                method,
+                url,
+                headers=headers,
+                params=params,
+                content=content,
+                data=data,
+                files=files,
+                auth=_to_httpx_auth(auth),
+                timeout=_to_httpx_timeout(timeout),
+                json=json,
+            )
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(e)
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(e)
+
+        return _to_requests_response(response)
+
+    def close(self):
+        if self._session:
+            self._session.close()
+            self._session = None
+
+
+def _to_httpx_timeout(timeout):
+    """Translate a requests-style :code:`(connect, read)` timeout tuple."""
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(None, connect=connect, read=read)
+    return timeout
+
+
+def _to_httpx_auth(auth):
+    """Translate a :class:`requests.auth.AuthBase` into an equivalent httpx auth."""
+    if not isinstance(auth, requests.auth.AuthBase):
+        # i.e. None, or a (username, password) tuple, which httpx accepts as-is.
+        return auth
+
+    if type(auth) is requests.auth.HTTPBasicAuth:
+        return httpx.BasicAuth(auth.username, auth.password)
+
+    if type(auth) is requests.auth.HTTPDigestAuth:
+        return httpx.DigestAuth(auth.username, auth.password)
+
+    return _RequestsAuth(auth)
+
+
+if httpx is not None:
+
+    class _RequestsAuth(httpx.Auth):
+        """Apply an arbitrary :class:`requests.auth.AuthBase` to httpx requests.
+
+        The auth is applied to an equivalent :class:`requests.PreparedRequest`, whose resulting
+        headers are copied back. Auths relying on response hooks (i.e. challenge-response
+        schemes) are not supported.
+        """
+
+        def __init__(self, auth):
+            self.auth = auth
+
+        def auth_flow(self, request):
+            prepared = requests.PreparedRequest()
+            prepared.method = request.method
+            prepared.url = str(request.url)
+            prepared.headers = CaseInsensitiveDict(request.headers)
+            prepared.body = request.content
+
+            prepared = self.auth(prepared)
+            request.headers.update(prepared.headers)
+            yield request
+
+
+def _to_requests_response(response) -> requests.Response:
+    """Adapt an :class:`httpx.Response` into an equivalent :class:`requests.Response`."""
+    request = requests.PreparedRequest()
+    request.method = response.request.method
+    request.url = str(response.request.url)
+    request.headers = CaseInsensitiveDict(response.request.headers)
+    # Read, as the requests of redirected responses are not.
+    request.body = response.request.read()
+
+    result = requests.Response()
+    result.status_code = response.status_code
+    result.reason = response.reason_phrase
+    result.headers = CaseInsensitiveDict(response.headers)
+    result.url = str(response.url)
+    result.encoding = response.encoding
+    result.elapsed = response.elapsed
+    result.request = request
+    result.history = [_to_requests_response(redirect) for redirect in response.history]
+    result._content = response.content
+    return result
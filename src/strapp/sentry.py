@@ -5,9 +5,10 @@ import os
 import urllib.parse
 from typing import Any, Dict, Generator, Optional, Union
 
-import sentry_sdk
-from sentry_sdk.integrations.logging import LoggingIntegration
-from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+from strapp._lazy import lazy_import
+
+# Loaded upon first use, rather than upon import, along with its integrations.
+sentry_sdk = lazy_import("sentry_sdk")
 
 log = logging.getLogger(__name__)
 
@@ -24,6 +25,9 @@ def setup_sentry(
 
     It's expected that this function is called once at app startup.
     """
+    from sentry_sdk.integrations.logging import LoggingIntegration
+    from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+
     sentry_sdk.init(
         dsn=dsn,
         integrations=[
@@ -1,11 +1,56 @@
 # flake8: noqa
+import importlib
+import sys
+from typing import TYPE_CHECKING
+
+from strapp.sqlalchemy.engine import dispose_engines, EngineRegistry, get_engine
 from strapp.sqlalchemy.model_base import declarative_base, DeclarativeMeta
 from strapp.sqlalchemy.session import create_session, create_session_cls
 
-try:
-    import pytest
-except ImportError:  # pragma: nocover
-    pass
-else:
-    pytest.register_assert_rewrite("strapp.sqlalchemy.testing")
-    del pytest
+# Assertion rewriting only matters under pytest, which will already have been imported.
+if "pytest" in sys.modules:
+    sys.modules["pytest"].register_assert_rewrite("strapp.sqlalchemy.testing")
+
+# Imported upon first use, such that importing the package only pays for the essentials, rather
+# than every feature (and optional, or slow to import, dependency).
+_lazy_exports = {
+    "batch_delete": "strapp.sqlalchemy.batch",
+    "batch_update": "strapp.sqlalchemy.batch",
+    "cached": "strapp.sqlalchemy.cache",
+    "QueryCache": "strapp.sqlalchemy.cache",
+    "change_feed": "strapp.sqlalchemy.change_feed",
+    "copy_from": "strapp.sqlalchemy.copy",
+    "copy_to": "strapp.sqlalchemy.copy",
+    "create_async_session": "strapp.sqlalchemy.async_session",
+    "create_async_session_cls": "strapp.sqlalchemy.async_session",
+    "create_routing_session_cls": "strapp.sqlalchemy.routing",
+    "RoutingSession": "strapp.sqlalchemy.routing",
+    "to_dict": "strapp.sqlalchemy.serialize",
+    "to_dicts": "strapp.sqlalchemy.serialize",
+    "include_deleted": "strapp.sqlalchemy.soft_delete",
+    "stream": "strapp.sqlalchemy.stream",
+    "create_tenant_session_cls": "strapp.sqlalchemy.tenancy",
+    "tenant": "strapp.sqlalchemy.tenancy",
+}
+
+if TYPE_CHECKING:
+    from strapp.sqlalchemy.async_session import create_async_session, create_async_session_cls
+    from strapp.sqlalchemy.batch import batch_delete, batch_update
+    from strapp.sqlalchemy.cache import cached, QueryCache
+    from strapp.sqlalchemy.change_feed import change_feed
+    from strapp.sqlalchemy.copy import copy_from, copy_to
+    from strapp.sqlalchemy.routing import create_routing_session_cls, RoutingSession
+    from strapp.sqlalchemy.serialize import to_dict, to_dicts
+    from strapp.sqlalchemy.soft_delete import include_deleted
+    from strapp.sqlalchemy.stream import stream
+    from strapp.sqlalchemy.tenancy import create_tenant_session_cls, tenant
+
+
+def __getattr__(name):
+    module = _lazy_exports.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,240 @@
+import re
+from typing import Callable, Optional
+
+from alembic.autogenerate import comparators, renderers
+from alembic.operations import MigrateOperation, Operations
+
+from strapp.sqlalchemy.partitions import (
+    create_partition_ddl,
+    list_partitions,
+    PARTITION_INFO_KEY,
+    plan_partitions,
+)
+from strapp.sqlalchemy.timestamps import (
+    create_trigger_ddl,
+    drop_trigger_ddl,
+    has_trigger,
+    SUPPORTED_DIALECTS,
+    TRIGGER_INFO_KEY,
+)
+
+
+@Operations.register_operation("create_updated_at_trigger")
+class CreateUpdatedAtTriggerOp(MigrateOperation):
+    """Create the trigger which maintains a table's `updated_at` column."""
+
+    def __init__(self, table_name: str, schema: Optional[str] = None):
+        self.table_name = table_name
+        self.schema = schema
+
+    @classmethod
+    def create_updated_at_trigger(cls, operations, table_name, schema=None):
+        return operations.invoke(cls(table_name, schema=schema))
+
+    def reverse(self):
+        return DropUpdatedAtTriggerOp(self.table_name, schema=self.schema)
+
+
+@Operations.register_operation("drop_updated_at_trigger")
+class DropUpdatedAtTriggerOp(MigrateOperation):
+    """Drop the trigger which maintains a table's `updated_at` column."""
+
+    def __init__(self, table_name: str, schema: Optional[str] = None):
+        self.table_name = table_name
+        self.schema = schema
+
+    @classmethod
+    def drop_updated_at_trigger(cls, operations, table_name, schema=None):
+        return operations.invoke(cls(table_name, schema=schema))
+
+    def reverse(self):
+        return CreateUpdatedAtTriggerOp(self.table_name, schema=self.schema)
+
+
+@Operations.register_operation("create_partitions")
+class CreatePartitionsOp(MigrateOperation):
+    """Create the current (and next `premake`) partitions of a partitioned table.
+
+    Subsequent partitions are expected to be created by
+    :func:`strapp.sqlalchemy.partitions.maintain_partitions`.
+    """
+
+    def __init__(
+        self, table_name: str, interval: str, schema: Optional[str] = None, premake: int = 3
+    ):
+        self.table_name = table_name
+        self.interval = interval
+        self.schema = schema
+        self.premake = premake
+
+    @classmethod
+    def create_partitions(cls, operations, table_name, interval, schema=None, premake=3):
+        return operations.invoke(cls(table_name, interval, schema=schema, premake=premake))
+
+    def reverse(self):
+        return DropPartitionsOp(self.table_name, self.interval, schema=self.schema)
+
+
+@Operations.register_operation("drop_partitions")
+class DropPartitionsOp(MigrateOperation):
+    """Drop every partition of a partitioned table."""
+
+    def __init__(self, table_name: str, interval: str, schema: Optional[str] = None):
+        self.table_name = table_name
+        self.interval = interval
+        self.schema = schema
+
+    @classmethod
+    def drop_partitions(cls, operations, table_name, interval, schema=None):
+        return operations.invoke(cls(table_name, interval, schema=schema))
+
+    def reverse(self):
+        return CreatePartitionsOp(self.table_name, self.interval, schema=self.schema)
+
+
+@Operations.implementation_for(CreateUpdatedAtTriggerOp)
+def create_updated_at_trigger(operations, operation):
+    dialect = operations.get_context().dialect.name
+    for statement in create_trigger_ddl(dialect, operation.table_name, schema=operation.schema):
+        operations.execute(statement)
+
+
+@Operations.implementation_for(DropUpdatedAtTriggerOp)
+def drop_updated_at_trigger(operations, operation):
+    dialect = operations.get_context().dialect.name
+    for statement in drop_trigger_ddl(dialect, operation.table_name, schema=operation.schema):
+        operations.execute(statement)
+
+
+@Operations.implementation_for(CreatePartitionsOp)
+def create_partitions(operations, operation):
+    # The table is only partitioned on postgresql.
+    if operations.get_context().dialect.name != "postgresql":
+        return
+
+    create, _ = plan_partitions(
+        operation.table_name, operation.interval, [], premake=operation.premake
+    )
+    for lower in create:
+        operations.execute(
+            create_partition_ddl(
+                operation.table_name, operation.interval, lower, schema=operation.schema
+            )
+        )
+
+
+@Operations.implementation_for(DropPartitionsOp)
+def drop_partitions(operations, operation):
+    if operations.get_context().dialect.name != "postgresql":
+        return
+
+    connection = operations.get_bind()
+    for name in list_partitions(connection, operation.table_name, schema=operation.schema):
+        operations.drop_table(name, schema=operation.schema)
+
+
+@renderers.dispatch_for(CreateUpdatedAtTriggerOp)
+def render_create_updated_at_trigger(autogen_context, op):
+    return f"op.create_updated_at_trigger({op.table_name!r}, schema={op.schema!r})"
+
+
+@renderers.dispatch_for(DropUpdatedAtTriggerOp)
+def render_drop_updated_at_trigger(autogen_context, op):
+    return f"op.drop_updated_at_trigger({op.table_name!r}, schema={op.schema!r})"
+
+
+@renderers.dispatch_for(CreatePartitionsOp)
+def render_create_partitions(autogen_context, op):
+    return (
+        f"op.create_partitions({op.table_name!r}, {op.interval!r}, schema={op.schema!r}, "
+        f"premake={op.premake!r})"
+    )
+
+
+@renderers.dispatch_for(DropPartitionsOp)
+def render_drop_partitions(autogen_context, op):
+    return f"op.drop_partitions({op.table_name!r}, {op.interval!r}, schema={op.schema!r})"
+
+
+@comparators.dispatch_for("table")
+def compare_partitions(
+    autogen_context, modify_table_ops, schema, table_name, conn_table, metadata_table
+):
+    """Create the initial partitions of newly partitioned tables."""
+    connection = autogen_context.connection
+    if connection is None or connection.dialect.name != "postgresql":
+        return
+
+    if conn_table is not None or metadata_table is None:
+        return
+
+    interval = metadata_table.info.get(PARTITION_INFO_KEY)
+    if interval is not None:
+        modify_table_ops.ops.append(CreatePartitionsOp(table_name, interval, schema=schema))
+
+
+def exclude_partitions(metadata, include_name: Optional[Callable] = None) -> Callable:
+    """Produce an alembic `include_name` hook which excludes the partitions of partitioned tables.
+
+    Partitions are created at runtime (see
+    :func:`strapp.sqlalchemy.partitions.maintain_partitions`) rather than declared, so
+    autogenerate would otherwise propose dropping them.
+
+    Args:
+        metadata: The `target_metadata`.
+        include_name: An optional existing `include_name` hook, applied to every other name.
+
+    Examples:
+        >>> import sqlalchemy
+        >>> from strapp.sqlalchemy import declarative_base
+        >>> Base = declarative_base()
+        >>> class Event(Base, created_at=True, partitioned="month"):
+        ...     __tablename__ = 'event'
+        ...     id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+        >>> include_name = exclude_partitions(Base.metadata)
+        >>> include_name("event_p202001", "table", {})
+        False
+        >>> include_name("event", "table", {})
+        True
+    """
+    patterns = {
+        (table.schema, re.compile(rf"{re.escape(table.name)}_p\d+$"))
+        for table in metadata.tables.values()
+        if PARTITION_INFO_KEY in table.info
+    }
+
+    def _include_name(name, type_, parent_names):
+        if type_ == "table":
+            schema = parent_names.get("schema_name")
+            for table_schema, pattern in patterns:
+                if table_schema == schema and pattern.match(name):
+                    return False
+
+        if include_name is None:
+            return True
+        return include_name(name, type_, parent_names)
+
+    return _include_name
+
+
+@comparators.dispatch_for("table")
+def compare_updated_at_trigger(
+    autogen_context, modify_table_ops, schema, table_name, conn_table, metadata_table
+):
+    """Detect tables whose `updated_at` trigger is missing from, or extraneous in, the database."""
+    connection = autogen_context.connection
+    if connection is None or connection.dialect.name not in SUPPORTED_DIALECTS:
+        return
+
+    # Triggers are dropped along with their table.
+    if metadata_table is None:
+        return
+
+    expected = bool(metadata_table.info.get(TRIGGER_INFO_KEY))
+    exists = conn_table is not None and has_trigger(connection, table_name, schema=schema)
+
+    if expected and not exists:
+        modify_table_ops.ops.append(CreateUpdatedAtTriggerOp(table_name, schema=schema))
+    elif exists and not expected:
+        modify_table_ops.ops.append(DropUpdatedAtTriggerOp(table_name, schema=schema))
@@ -0,0 +1,192 @@
+import asyncio
+from typing import Dict, Mapping, Optional
+
+import sqlalchemy.orm
+from sqlalchemy.ext.asyncio import async_scoped_session, AsyncSession, create_async_engine
+
+from strapp.sqlalchemy.engine import make_url
+from strapp.sqlalchemy.session import _begin, log_session_state
+
+
+def create_async_session_cls(
+    config: Mapping,
+    *,
+    scopefunc=None,
+    engine_kwargs: Optional[Dict] = None,
+    expire_on_commit: bool = False,
+):
+    """Create a :class:`sqlalchemy.ext.asyncio.async_scoped_session` class.
+
+    Unlike :func:`strapp.sqlalchemy.create_session_cls`, the engine is not shared through an
+    engine registry, because asyncio connections cannot be shared between event loops.
+
+    Sessions are scoped to the current :class:`asyncio.Task` by default, and must be removed
+    (:code:`await Session.remove()`) when the task is done with them.
+
+    Args:
+        config: The dict-like set of options to :class:`sqlalchemy.engine.url.URL`, with an
+            asyncio driver, i.e. :code:`sqlite+aiosqlite` or :code:`postgresql+asyncpg`.
+        scopefunc: The optional `scopefunc` arg to
+            :class:`sqlalchemy.ext.asyncio.async_scoped_session`. Defaults to
+            :func:`asyncio.current_task`.
+        engine_kwargs: Optional kwargs to pass through to the
+            :func:`sqlalchemy.ext.asyncio.create_async_engine` call
+        expire_on_commit: Passthrough to :class:`sqlalchemy.orm.sessionmaker`. Defaults to
+            :code:`False`, as accessing expired attributes would otherwise require (implicit)
+            IO, which is not possible under asyncio.
+
+    Examples:
+        >>> async def main():
+        ...     Session = create_async_session_cls({"drivername": "sqlite+aiosqlite"})
+        ...     session = Session()
+        ...     try:
+        ...         result = await session.execute(sqlalchemy.text("select 1"))
+        ...         return result.scalar()
+        ...     finally:
+        ...         await Session.remove()
+        ...         await session.bind.dispose()
+        >>> asyncio.run(main())
+        1
+    """
+    return _create_async_session_cls(
+        config,
+        scopefunc=scopefunc,
+        engine_kwargs=engine_kwargs,
+        expire_on_commit=expire_on_commit,
+        class_=AsyncSession,
+    )
+
+
+def _create_async_session_cls(config, *, scopefunc, engine_kwargs, expire_on_commit, class_):
+    engine = create_async_engine(make_url(config), **(engine_kwargs or {}))
+
+    return async_scoped_session(
+        sqlalchemy.orm.sessionmaker(bind=engine, class_=class_, expire_on_commit=expire_on_commit),
+        scopefunc=scopefunc or asyncio.current_task,
+    )
+
+
+class _EngineOwningAsyncSession(AsyncSession):
+    """An :class:`AsyncSession` whose (unshared) engine is disposed when it is closed."""
+
+    async def close(self):
+        await super().close()
+        await self.bind.dispose()
+
+
+def create_async_session(
+    config: Mapping,
+    *,
+    scopefunc=None,
+    dry_run: bool = False,
+    verbosity: int = 0,
+    engine_kwargs: Optional[Dict] = None,
+    savepoint: bool = False,
+):
+    """Create an asyncio sqlalchemy session.
+
+    Must be called within a running event loop (i.e. inside a coroutine), when using the default
+    `scopefunc`.
+
+    The session has an engine of its own, which is disposed of (closing its connections) when
+    the session is closed. Close the session (:code:`await session.close()`, or use it as an
+    :code:`async with` context) once done with it.
+
+    Args:
+        config: See :func:`create_async_session_cls`.
+        scopefunc: See :func:`create_async_session_cls`.
+        dry_run: If :code:`True`, wraps the session such that it cannot perform `commit` operations
+        verbosity: Only applies to `dry_run` sessions, but when > 0 will log the state of the
+            session on would-be commit operations
+        engine_kwargs: See :func:`create_async_session_cls`.
+        savepoint: Only applies to `dry_run` sessions, see :class:`AsyncDryRunSession`.
+    """
+    Session = _create_async_session_cls(
+        config,
+        scopefunc=scopefunc,
+        engine_kwargs=engine_kwargs,
+        expire_on_commit=False,
+        class_=_EngineOwningAsyncSession,
+    )
+    session = Session()
+
+    if dry_run:
+        session = AsyncDryRunSession(session, verbosity=verbosity, savepoint=savepoint)
+
+    return session
+
+
+class AsyncDryRunSession:
+    """The asyncio equivalent of :class:`strapp.sqlalchemy.session.DryRunSession`.
+
+    Everything is rolled back when the session is closed (:code:`await session.close()`), or
+    its :code:`async with` context is exited.
+
+    As SAVEPOINTs cannot be awaited in `__init__`, in `savepoint` mode the first is begun upon
+    entering the :code:`async with` context (or by the first `commit`, otherwise).
+
+    Examples:
+        >>> async def main():
+        ...     config = {"drivername": "sqlite+aiosqlite"}
+        ...     async with create_async_session(config, dry_run=True, savepoint=True) as session:
+        ...         await session.execute(sqlalchemy.text("create table foo (id integer)"))
+        ...         await session.commit()
+        ...         await session.execute(sqlalchemy.text("insert into foo values (1)"))
+        ...         await session.rollback()
+        ...         result = await session.execute(sqlalchemy.text("select count(*) from foo"))
+        ...         return result.scalar()
+        >>> asyncio.run(main())
+        0
+    """
+
+    def __init__(self, session, verbosity=0, log_at_verbosity=1, savepoint=False):
+        self.session = session
+        self.verbosity = verbosity
+        self.log_at_verbosity = log_at_verbosity
+        self.savepoint = savepoint
+
+        self._nested = None
+        self._closed = False
+
+    async def commit(self):
+        if self.verbosity >= self.log_at_verbosity:
+            log_session_state(self.session)
+
+        await self.session.flush()
+
+        if self.savepoint:
+            if self._nested is not None:
+                await self._nested.commit()
+            await self._begin_nested()
+
+    async def rollback(self):
+        if self.savepoint and self._nested is not None:
+            await self._nested.rollback()
+            await self._begin_nested()
+        else:
+            await self.session.rollback()
+
+    async def close(self):
+        """Roll back everything performed through the session, and close it."""
+        if self._closed:
+            return
+
+        self._closed = True
+        await self.session.rollback()
+        await self.session.close()
+
+    async def _begin_nested(self):
+        connection = await self.session.connection()
+        await connection.run_sync(_begin)
+        self._nested = await self.session.begin_nested()
+
+    async def __aenter__(self):
+        if self.savepoint and self._nested is None:
+            await self._begin_nested()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def __getattr__(self, attr):
+        return getattr(self.session, attr)
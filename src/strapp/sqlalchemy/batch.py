@@ -0,0 +1,272 @@
+import logging
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import sqlalchemy
+
+from strapp.sqlalchemy.stream import _after
+
+log = logging.getLogger(__name__)
+
+
+class BatchRunner:
+    """Execute an UPDATE or DELETE against a model's table in primary-key ranged chunks.
+
+    Prefer :func:`batch_update` or :func:`batch_delete` to constructing this directly.
+    """
+
+    def __init__(
+        self,
+        session,
+        model,
+        *,
+        values: Optional[Dict[str, Any]] = None,
+        where=None,
+        chunk_size: int = 1000,
+        target_duration: Optional[float] = None,
+        min_chunk_size: int = 100,
+        max_chunk_size: int = 100_000,
+        sleep: float = 0,
+        cursor: Optional[Tuple] = None,
+        on_progress: Optional[Callable[["BatchRunner"], None]] = None,
+    ):
+        self.session = session
+        self.table = getattr(model, "__table__", model)
+        self.key = list(self.table.primary_key.columns)
+        self.values = values
+        self.where = where
+        self.chunk_size = chunk_size
+        self.target_duration = target_duration
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.sleep = sleep
+        self.cursor = cursor
+        self.on_progress = on_progress
+
+        self.chunks_run = 0
+        self.rows = 0
+        self.duration: Optional[float] = None
+
+    def run(self) -> int:
+        """Process every chunk, returning the total number of rows affected."""
+        for _ in self.chunks():
+            pass
+        return self.rows
+
+    def chunks(self) -> Iterator[int]:
+        """Process one chunk at a time, yielding the number of rows affected by each.
+
+        Each chunk is committed before it is yielded, after which :attr:`cursor` holds the
+        primary key of the chunk's upper bound.
+        """
+        while True:
+            upper = self._upper_bound()
+            if upper is None:
+                return
+
+            if self.chunks_run and self.sleep:
+                time.sleep(self.sleep)
+
+            start = time.perf_counter()
+            result = self.session.execute(self._statement(upper))
+            self.duration = time.perf_counter() - start
+            self.session.commit()
+
+            self.cursor = upper
+            self.chunks_run += 1
+            self.rows += result.rowcount
+
+            log.debug(
+                "Processed chunk %s of %s (%s rows in %.3fs), up to %s",
+                self.chunks_run,
+                self.table.name,
+                result.rowcount,
+                self.duration,
+                upper,
+            )
+            if self.on_progress:
+                self.on_progress(self)
+
+            yield result.rowcount
+
+            self._adapt_chunk_size()
+
+    def _upper_bound(self) -> Optional[Tuple]:
+        """Find the primary key of the last row of the next chunk.
+
+        That is, the `chunk_size`-th remaining matching row or, if there are fewer, the last.
+        """
+        query = sqlalchemy.select(*self.key)
+        if self.cursor is not None:
+            query = query.where(_after(self.key, self.cursor))
+        if self.where is not None:
+            query = query.where(self.where)
+
+        upper = self.session.execute(
+            query.order_by(*self.key).offset(self.chunk_size - 1).limit(1)
+        ).first()
+        if upper is None:
+            upper = self.session.execute(
+                query.order_by(*(column.desc() for column in self.key)).limit(1)
+            ).first()
+
+        if upper is None:
+            return None
+        return tuple(upper)
+
+    def _statement(self, upper: Tuple):
+        if self.values is None:
+            statement = self.table.delete()
+        else:
+            statement = self.table.update().values(self.values)
+
+        statement = statement.where(_at_or_before(self.key, upper))
+        if self.cursor is not None:
+            statement = statement.where(_after(self.key, self.cursor))
+        if self.where is not None:
+            statement = statement.where(self.where)
+        return statement
+
+    def _adapt_chunk_size(self):
+        """Scale the chunk size towards `target_duration`, by at most a factor of 2 per chunk."""
+        if self.target_duration is None or not self.duration:
+            return
+
+        scale = min(max(self.target_duration / self.duration, 0.5), 2)
+        chunk_size = int(self.chunk_size * scale)
+        self.chunk_size = min(max(chunk_size, self.min_chunk_size), self.max_chunk_size)
+
+
+def batch_update(
+    session,
+    model,
+    values: Dict[str, Any],
+    *,
+    where=None,
+    chunk_size: int = 1000,
+    target_duration: Optional[float] = None,
+    min_chunk_size: int = 100,
+    max_chunk_size: int = 100_000,
+    sleep: float = 0,
+    cursor: Optional[Tuple] = None,
+    on_progress: Optional[Callable[[BatchRunner], None]] = None,
+) -> BatchRunner:
+    """Update the rows of a (potentially very large) table in chunks, committing each chunk.
+
+    Rather than one statement which locks (and rewrites) every matching row in a single long
+    transaction, or one statement per row, each chunk is a single statement over a range of
+    the primary key, :code:`WHERE key > <cursor> AND key <= <upper> AND <where>`, where
+    `upper` is the key of the `chunk_size`-th remaining matching row.
+
+    Args:
+        session: The session with which to execute (and commit) each chunk.
+        model: The declarative model class (or table).
+        values: The values to set, as with :meth:`sqlalchemy.sql.expression.Update.values`.
+        where: Optional criteria restricting the affected rows. The bound of each chunk is
+            found by scanning, in primary key order, the remaining rows matching `where`, so
+            an unindexed (or unselective) `where` reads up to the whole remaining table per
+            chunk. Prefer criteria which an index can satisfy.
+        chunk_size: The (initial) number of rows per chunk.
+        target_duration: When supplied, the chunk size is adapted (by at most a factor of 2
+            per chunk) such that each statement takes about this many seconds.
+        min_chunk_size: The lower bound of the adapted chunk size.
+        max_chunk_size: The upper bound of the adapted chunk size.
+        sleep: The number of seconds to sleep between chunks, i.e. to let replicas catch up.
+        cursor: The :attr:`BatchRunner.cursor` of an earlier, interrupted run, in order to
+            resume after it.
+        on_progress: Optional callable, called with the :class:`BatchRunner` after each chunk
+            is committed, i.e. to report :attr:`BatchRunner.rows` and persist
+            :attr:`BatchRunner.cursor`.
+
+    Returns:
+        The :class:`BatchRunner`, whose :meth:`BatchRunner.run` processes every chunk, and
+        :meth:`BatchRunner.chunks` processes one chunk at a time.
+
+    Examples:
+        >>> from strapp.sqlalchemy import create_session, declarative_base
+        >>> Base = declarative_base()
+        >>> class Foo(Base):
+        ...     __tablename__ = 'foo'
+        ...     id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+        ...     name = sqlalchemy.Column(sqlalchemy.types.Unicode())
+
+        >>> session = create_session({"drivername": "sqlite"})
+        >>> Base.metadata.create_all(bind=session.connection())
+        >>> Foo.bulk_insert(session, [{"id": i, "name": None} for i in range(1, 6)])
+        5
+
+        >>> runner = batch_update(
+        ...     session, Foo, {"name": "foo"}, where=Foo.name.is_(None), chunk_size=2
+        ... )
+        >>> list(runner.chunks())
+        [2, 2, 1]
+        >>> runner.cursor
+        (5,)
+    """
+    return BatchRunner(
+        session,
+        model,
+        values=values,
+        where=where,
+        chunk_size=chunk_size,
+        target_duration=target_duration,
+        min_chunk_size=min_chunk_size,
+        max_chunk_size=max_chunk_size,
+        sleep=sleep,
+        cursor=cursor,
+        on_progress=on_progress,
+    )
+
+
+def batch_delete(
+    session,
+    model,
+    *,
+    where=None,
+    chunk_size: int = 1000,
+    target_duration: Optional[float] = None,
+    min_chunk_size: int = 100,
+    max_chunk_size: int = 100_000,
+    sleep: float = 0,
+    cursor: Optional[Tuple] = None,
+    on_progress: Optional[Callable[[BatchRunner], None]] = None,
+) -> BatchRunner:
+    """Delete the rows of a (potentially very large) table in chunks, committing each chunk.
+
+    See :func:`batch_update` for the arguments.
+
+    Examples:
+        >>> from strapp.sqlalchemy import create_session, declarative_base
+        >>> Base = declarative_base()
+        >>> class Foo(Base):
+        ...     __tablename__ = 'foo'
+        ...     id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+        >>> session = create_session({"drivername": "sqlite"})
+        >>> Base.metadata.create_all(bind=session.connection())
+        >>> Foo.bulk_insert(session, [{"id": i} for i in range(1, 6)])
+        5
+
+        >>> batch_delete(session, Foo, where=Foo.id % 2 == 1, chunk_size=2).run()
+        3
+        >>> session.query(Foo.id).all()
+        [(2,), (4,)]
+    """
+    return BatchRunner(
+        session,
+        model,
+        where=where,
+        chunk_size=chunk_size,
+        target_duration=target_duration,
+        min_chunk_size=min_chunk_size,
+        max_chunk_size=max_chunk_size,
+        sleep=sleep,
+        cursor=cursor,
+        on_progress=on_progress,
+    )
+
+
+def _at_or_before(key, upper):
+    if len(key) == 1:
+        return key[0] <= upper[0]
+    return sqlalchemy.tuple_(*key) <= sqlalchemy.tuple_(*upper)
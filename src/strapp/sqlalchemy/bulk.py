@@ -0,0 +1,245 @@
+import itertools
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import sqlalchemy
+
+Row = Union[Dict[str, Any], Any]
+
+# Columns which are only ever set upon insert, and so never updated by default on conflict.
+INSERT_ONLY_COLUMNS = ("created_at",)
+
+
+def bulk_insert(
+    session,
+    model,
+    rows: Iterable[Row],
+    *,
+    chunk_size: int = 1000,
+    return_primary_keys: bool = False,
+):
+    """Insert `rows` into the table of `model`, in chunks of `chunk_size` executemany batches.
+
+    The `created_at` column (see :func:`strapp.sqlalchemy.declarative_base`) is filled once
+    per chunk, rather than calling :code:`datetime.utcnow` per row.
+
+    Args:
+        session: A session (or connection) with which to execute the inserts.
+        model: The declarative model class.
+        rows: An iterable of dicts, keyed by column name, or instances of `model`. Every row
+            should supply the same set of columns. The iterable is consumed lazily, one chunk
+            at a time.
+        chunk_size: The maximum number of rows per executed statement.
+        return_primary_keys: When :code:`True`, return the primary keys of the inserted rows.
+            These are retrieved with :code:`RETURNING` where the dialect supports it.
+
+    Returns:
+        The number of rows inserted or, if `return_primary_keys` is :code:`True`, the list of
+        their primary keys (scalar values for single-column primary keys, otherwise tuples).
+
+    Examples:
+        >>> from strapp.sqlalchemy import create_session, declarative_base
+        >>> Base = declarative_base()
+        >>> class Foo(Base, created_at=True):
+        ...     __tablename__ = 'foo'
+        ...     id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+        ...     name = sqlalchemy.Column(sqlalchemy.types.Unicode())
+
+        >>> session = create_session({"drivername": "sqlite"})
+        >>> Base.metadata.create_all(bind=session.connection())
+        >>> Foo.bulk_insert(session, [{"name": "a"}, {"name": "b"}], return_primary_keys=True)
+        [1, 2]
+    """
+    table = model.__table__
+    primary_key = list(table.primary_key.columns)
+    returning = return_primary_keys and _supports_returning(_dialect(session, model))
+
+    result: Union[int, List] = [] if return_primary_keys else 0
+    for chunk in _chunks(rows, model, chunk_size):
+        _fill_timestamps(table, chunk, "created_at")
+
+        if not return_primary_keys:
+            session.execute(table.insert(), chunk)
+            result += len(chunk)  # type: ignore
+        elif returning:
+            statement = table.insert().values(chunk).returning(*primary_key)
+            result.extend(_primary_keys(session.execute(statement)))  # type: ignore
+        elif all(column.key in chunk[0] for column in primary_key):
+            session.execute(table.insert(), chunk)
+            result.extend(_primary_keys_from_rows(chunk, primary_key))  # type: ignore
+        else:
+            # Without RETURNING, generated keys are only observable one row at a time.
+            for row in chunk:
+                inserted = session.execute(table.insert(), row).inserted_primary_key
+                result.append(_unwrap(tuple(inserted)))  # type: ignore
+
+    return result
+
+
+def bulk_upsert(
+    session,
+    model,
+    rows: Iterable[Row],
+    *,
+    conflict_columns: Optional[Sequence[str]] = None,
+    update_columns: Optional[Sequence[str]] = None,
+    chunk_size: int = 1000,
+    return_primary_keys: bool = False,
+):
+    """Insert `rows`, updating existing rows on conflict (:code:`INSERT ... ON CONFLICT`).
+
+    Supported for the postgresql and sqlite dialects. `created_at` is filled once per chunk for
+    inserted rows, and `updated_at` (when present) is set once per chunk for updated rows.
+
+    Args:
+        session: A session (or connection) with which to execute the upserts.
+        model: The declarative model class.
+        rows: See :func:`bulk_insert`.
+        conflict_columns: The columns of the unique constraint/index which identify a conflict.
+            Defaults to the primary key.
+        update_columns: The columns to update on conflict. Defaults to every supplied column
+            which is neither a conflict column nor `created_at`. If there are none, conflicting
+            rows are left as-is (:code:`ON CONFLICT DO NOTHING`).
+        chunk_size: The maximum number of rows per executed statement.
+        return_primary_keys: When :code:`True`, return the primary keys of the upserted rows.
+
+    Returns:
+        See :func:`bulk_insert`.
+
+    Examples:
+        >>> from strapp.sqlalchemy import create_session, declarative_base
+        >>> Base = declarative_base()
+        >>> class Foo(Base, updated_at=True):
+        ...     __tablename__ = 'foo'
+        ...     id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+        ...     name = sqlalchemy.Column(sqlalchemy.types.Unicode())
+
+        >>> session = create_session({"drivername": "sqlite"})
+        >>> Base.metadata.create_all(bind=session.connection())
+        >>> Foo.bulk_upsert(session, [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}])
+        2
+        >>> Foo.bulk_upsert(session, [{"id": 2, "name": "c"}])
+        1
+        >>> session.query(Foo.name).order_by(Foo.id).all()
+        [('a',), ('c',)]
+    """
+    table = model.__table__
+    primary_key = list(table.primary_key.columns)
+    dialect = _dialect(session, model)
+
+    # Imported upon use, as importing the dialects is comparatively slow.
+    from sqlalchemy.dialects import postgresql, sqlite
+
+    if dialect.name == "postgresql":
+        insert = postgresql.insert
+    elif dialect.name == "sqlite":
+        insert = sqlite.insert
+    else:
+        raise NotImplementedError(f"bulk_upsert is not supported for {dialect.name}.")
+
+    if conflict_columns is None:
+        conflict_columns = [column.key for column in primary_key]
+
+    returning = return_primary_keys and _supports_returning(dialect)
+
+    result: Union[int, List] = [] if return_primary_keys else 0
+    for chunk in _chunks(rows, model, chunk_size):
+        columns = update_columns
+        if columns is None:
+            excluded = {*conflict_columns, *INSERT_ONLY_COLUMNS}
+            columns = [key for key in chunk[0] if key not in excluded]
+
+        now = _fill_timestamps(table, chunk, "created_at")
+
+        statement = insert(table)
+        if columns:
+            set_ = {column: statement.excluded[column] for column in columns}
+            if "updated_at" in table.c and "updated_at" not in set_:
+                set_["updated_at"] = now or datetime.utcnow()
+            statement = statement.on_conflict_do_update(index_elements=conflict_columns, set_=set_)
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=conflict_columns)
+
+        if not return_primary_keys:
+            session.execute(statement, chunk)
+            result += len(chunk)  # type: ignore
+        elif returning:
+            statement = statement.values(chunk).returning(*primary_key)
+            result.extend(_primary_keys(session.execute(statement)))  # type: ignore
+        elif all(column.key in chunk[0] for column in primary_key):
+            session.execute(statement, chunk)
+            result.extend(_primary_keys_from_rows(chunk, primary_key))  # type: ignore
+        else:
+            raise ValueError(
+                f"{dialect.name} does not support RETURNING, the primary key must be supplied "
+                "in order to return primary keys."
+            )
+
+    return result
+
+
+class BulkOperations:
+    """Class-level bulk operations, available on models built with :func:`declarative_base`."""
+
+    @classmethod
+    def bulk_insert(cls, session, rows: Iterable[Row], **kwargs):
+        """See :func:`strapp.sqlalchemy.bulk.bulk_insert`."""
+        return bulk_insert(session, cls, rows, **kwargs)
+
+    @classmethod
+    def bulk_upsert(cls, session, rows: Iterable[Row], **kwargs):
+        """See :func:`strapp.sqlalchemy.bulk.bulk_upsert`."""
+        return bulk_upsert(session, cls, rows, **kwargs)
+
+
+def _chunks(rows: Iterable[Row], model, chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    columns = [column.key for column in model.__table__.columns]
+
+    iterator = iter(rows)
+    while True:
+        chunk = [_as_dict(row, model, columns) for row in itertools.islice(iterator, chunk_size)]
+        if not chunk:
+            return
+        yield chunk
+
+
+def _as_dict(row: Row, model, columns) -> Dict[str, Any]:
+    if isinstance(row, model):
+        state = row.__dict__
+        return {column: state[column] for column in columns if column in state}
+    return dict(row)
+
+
+def _fill_timestamps(table, chunk, column) -> Optional[datetime]:
+    if column not in table.c or column in chunk[0]:
+        return None
+
+    now = datetime.utcnow()
+    for row in chunk:
+        row[column] = now
+    return now
+
+
+def _dialect(session, model):
+    get_bind = getattr(session, "get_bind", None)
+    if get_bind is not None:
+        return get_bind(sqlalchemy.inspect(model)).dialect
+    return session.dialect
+
+
+def _supports_returning(dialect) -> bool:
+    return getattr(dialect, "insert_returning", dialect.implicit_returning)
+
+
+def _primary_keys(result) -> List:
+    return [_unwrap(tuple(row)) for row in result]
+
+
+def _primary_keys_from_rows(chunk, primary_key) -> List:
+    return [_unwrap(tuple(row[column.key] for column in primary_key)) for row in chunk]
+
+
+def _unwrap(values: tuple):
+    if len(values) == 1:
+        return values[0]
+    return values
@@ -0,0 +1,279 @@
+import collections
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import sqlalchemy
+from sqlalchemy.orm import attributes, loading, make_transient_to_detached
+from sqlalchemy.orm.state import InstanceState
+from sqlalchemy.sql.util import find_tables
+
+CACHE_OPTION = "strapp_cache"
+_PENDING = "strapp_cache_tables"
+
+
+class MemoryBackend:
+    """A bounded, thread-safe, in-memory LRU store, whose entries may expire."""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: "collections.OrderedDict" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class QueryCache:
+    """A second-level (cross-session) cache of query results.
+
+    Only queries which have been marked with :func:`cached` (or loaded through :meth:`get`) are
+    cached. Results are keyed by the statement, its parameters, and a per-table generation,
+    which is bumped whenever a session flushes (and again when it commits or rolls back) changes
+    to, or executes DML against, that table. Invalidation is therefore tracked per-process, and
+    `backend` should not be shared with other processes.
+
+    A session bypasses the cache for queries of tables to which it has uncommitted writes, so
+    that neither are its writes hidden from it, nor are they cached for other sessions.
+
+    Prefer supplying `query_cache` to :func:`strapp.sqlalchemy.create_session_cls` to calling
+    :meth:`install` directly.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[MemoryBackend] = None,
+        *,
+        ttl: Optional[float] = 60,
+        max_size: int = 1024,
+        increment: Optional[Callable] = None,
+        tags: Optional[List[str]] = None,
+        prefix: str = "sqlalchemy.cache",
+    ):
+        self.backend = backend if backend is not None else MemoryBackend(max_size)
+        self.ttl = ttl
+        self.increment = increment
+        self.tags = tags
+        self.prefix = prefix
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+        self._generations: Dict[str, int] = collections.defaultdict(int)
+        self._lock = threading.Lock()
+
+    def install(self, session_factory):
+        """Attach the cache to a :class:`sqlalchemy.orm.sessionmaker` (or `Session` class)."""
+        sqlalchemy.event.listen(session_factory, "do_orm_execute", self._on_execute)
+        sqlalchemy.event.listen(session_factory, "after_flush", self._on_flush)
+        sqlalchemy.event.listen(session_factory, "after_commit", self._on_commit)
+        sqlalchemy.event.listen(session_factory, "after_transaction_end", self._on_transaction_end)
+
+    def get(self, session, model, ident, *, ttl: Optional[float] = None):
+        """Cached equivalent of :code:`session.get(model, ident)`.
+
+        Objects already present in the session's identity map are returned without consulting
+        the cache.
+        """
+        return session.get(model, ident, execution_options={CACHE_OPTION: _option(ttl)})
+
+    def invalidate(self, tables: Iterable[str]):
+        """Invalidate every cached result which depends upon any of the named `tables`."""
+        tables = set(tables)
+        if not tables:
+            return
+
+        with self._lock:
+            for table in tables:
+                self._generations[table] += 1
+        self.invalidations += len(tables)
+        self._increment("invalidate", len(tables))
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else None,
+            "invalidations": self.invalidations,
+            "size": len(self.backend),
+        }
+
+    def _on_execute(self, orm_execute_state):
+        if not orm_execute_state.is_select:
+            state = orm_execute_state
+            if state.is_insert or state.is_update or state.is_delete:
+                tables = _table_names(state.statement)
+                self._pending(state.session).update(tables)
+                self.invalidate(tables)
+            return None
+
+        option = orm_execute_state.execution_options.get(CACHE_OPTION)
+        if not option:
+            return None
+
+        statement = orm_execute_state.statement
+        tables = _table_names(statement)
+
+        # The session's uncommitted writes must neither be cached, nor be hidden by the cache.
+        session = orm_execute_state.session
+        if not tables.isdisjoint(session.info.get(_PENDING, ())):
+            return None
+
+        key = self._key(statement, orm_execute_state.parameters, tables)
+
+        cached = self.backend.get(key)
+        if cached is None:
+            self.misses += 1
+            self._increment("miss")
+
+            frozen = _detach(orm_execute_state.invoke_statement().freeze())
+            ttl = self.ttl if option is True else option
+            self.backend.set(key, frozen, ttl)
+        else:
+            self.hits += 1
+            self._increment("hit")
+            frozen = cached
+
+        # Merging copies the cached (detached) objects into the session, leaving them untouched.
+        return loading.merge_frozen_result(session, statement, frozen, load=False)()
+
+    def _on_flush(self, session, flush_context):
+        tables = set()
+        for instance in (*session.new, *session.dirty, *session.deleted):
+            tables.update(table.name for table in sqlalchemy.inspect(instance).mapper.tables)
+
+        self._pending(session).update(tables)
+        self.invalidate(tables)
+
+    def _on_commit(self, session):
+        # Concurrent sessions may have cached pre-commit data between the flush and the commit.
+        self.invalidate(session.info.pop(_PENDING, ()))
+
+    def _on_transaction_end(self, session, transaction):
+        # The outermost transaction ended without committing, i.e. it was rolled back or the
+        # session closed. Anything cached from the discarded writes must not survive them.
+        if transaction.parent is None:
+            self.invalidate(session.info.pop(_PENDING, ()))
+
+    def _key(self, statement, parameters, tables: Set[str]) -> str:
+        cache_key = statement._generate_cache_key()
+        key = cache_key.to_offline_string({}, statement, parameters or {})
+
+        generations = ",".join(f"{table}:{self._generations[table]}" for table in sorted(tables))
+        return f"{generations}|{key}"
+
+    def _pending(self, session) -> Set[str]:
+        return session.info.setdefault(_PENDING, set())
+
+    def _increment(self, name, value=1):
+        if self.increment:
+            self.increment(f"{self.prefix}.{name}", value, tags=self.tags)
+
+
+def cached(query, ttl: Optional[float] = None):
+    """Mark a :class:`sqlalchemy.orm.Query` or :func:`sqlalchemy.select` for caching.
+
+    Marked queries are only cached by sessions with a :class:`QueryCache` installed, and are
+    otherwise executed as normal.
+
+    Args:
+        query: The query or statement to mark.
+        ttl: The number of seconds for which the result is cached. Defaults to the `ttl` of
+            the :class:`QueryCache`.
+
+    Examples:
+        >>> from strapp.sqlalchemy import create_session_cls, declarative_base
+        >>> Base = declarative_base()
+        >>> class Foo(Base):
+        ...     __tablename__ = 'foo'
+        ...     id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+        >>> query_cache = QueryCache(ttl=300, max_size=10_000)
+        >>> Session = create_session_cls({"drivername": "sqlite"}, query_cache=query_cache)
+        >>> session = Session()
+        >>> Base.metadata.create_all(bind=session.connection())
+
+        >>> cached(session.query(Foo)).all()
+        []
+        >>> cached(session.query(Foo)).all()
+        []
+        >>> query_cache.stats()["hits"]
+        1
+
+        Writes to the table invalidate its cached results.
+
+        >>> session.add(Foo(id=1))
+        >>> session.flush()
+        >>> cached(session.query(Foo)).all()
+        [Foo(id=1)]
+    """
+    return query.execution_options(**{CACHE_OPTION: _option(ttl)})
+
+
+def _option(ttl):
+    return True if ttl is None else ttl
+
+
+def _table_names(statement) -> Set[str]:
+    # Columns of not-yet-resolved criteria (i.e. `with_loader_criteria` lambdas) have no table.
+    tables = find_tables(statement, check_columns=True, include_crud=True)
+    return {table.name for table in tables if table is not None}
+
+
+def _detach(frozen):
+    """Replace the ORM objects of a frozen result with detached copies of their loaded columns.
+
+    The cached result must not share objects with the loading session, whose subsequent changes
+    to them would otherwise leak into the cache.
+    """
+    rows = frozen.rewrite_rows()
+    for row in rows:
+        for index, value in enumerate(row):
+            state = sqlalchemy.inspect(value, raiseerr=False)
+            if isinstance(state, InstanceState):
+                row[index] = _copy(state)
+    return frozen.with_new_rows(rows)
+
+
+def _copy(state):
+    mapper = state.mapper
+    instance = mapper.class_manager.new_instance()
+
+    instance_dict = attributes.instance_dict(instance)
+    for prop in mapper.column_attrs:
+        if prop.key in state.dict:
+            instance_dict[prop.key] = state.dict[prop.key]
+
+    make_transient_to_detached(instance)
+    return instance
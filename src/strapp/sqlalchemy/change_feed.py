@@ -0,0 +1,185 @@
+import warnings
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+import sqlalchemy
+
+from strapp.sqlalchemy.soft_delete import INCLUDE_DELETED_OPTION
+from strapp.sqlalchemy.stream import _primary_key, QueryStream
+
+
+class ChangeFeed(QueryStream):
+    """Iterate over the rows of a model which changed after a watermark.
+
+    Prefer :func:`change_feed` to constructing this directly.
+    """
+
+    def __init__(
+        self,
+        query,
+        *,
+        watermark: Optional[Tuple] = None,
+        chunk_size: int = 1000,
+        settle: timedelta = timedelta(seconds=5),
+        expunge: bool = True,
+        yield_per: Optional[int] = None,
+    ):
+        self.model = query.column_descriptions[0]["entity"]
+        self.timestamp = change_timestamp(self.model)
+
+        if not hasattr(self.model, "created_at") and self.timestamp.nullable:
+            warnings.warn(
+                f"{self.model.__name__} has no `created_at`, so its rows whose `updated_at` is "
+                "null (i.e. which were never updated) are skipped by the change feed",
+                stacklevel=3,
+            )
+        self.until = datetime.utcnow() - settle
+
+        query = query.filter(self.timestamp <= self.until).execution_options(
+            **{INCLUDE_DELETED_OPTION: True}
+        )
+        super().__init__(
+            query,
+            key=[self.timestamp, *_primary_key(query)],
+            chunk_size=chunk_size,
+            cursor=watermark,
+            expunge=expunge,
+            yield_per=yield_per,
+        )
+
+    @property
+    def watermark(self) -> Optional[Tuple]:
+        """The (timestamp, *primary key) of the last row processed, to be persisted."""
+        return self.cursor
+
+    def _key_of(self, row) -> Tuple:
+        primary_key = tuple(getattr(row, column.key) for column in self.key[1:])
+        return (_timestamp_of(row), *primary_key)
+
+
+def change_feed(
+    query,
+    *,
+    watermark: Optional[Tuple] = None,
+    chunk_size: int = 1000,
+    settle: timedelta = timedelta(seconds=5),
+    expunge: bool = True,
+    yield_per: Optional[int] = None,
+) -> ChangeFeed:
+    """Stream the rows of a `created_at`/`updated_at` model which changed after a `watermark`.
+
+    Rows are ordered by their change timestamp (see :func:`change_timestamp`), and then their
+    primary key. The (timestamp, primary key) pair of the last row processed forms the
+    `watermark` from which the next sync resumes, such that many rows sharing a timestamp are
+    neither skipped nor repeated. Each sync thereby reads only the rows changed since the last,
+    rather than the whole table (given the index from :func:`change_feed_index`).
+
+    Soft-deleted rows are included, in order for their deletion to be synced. For models with
+    an `updated_at` but no `created_at`, rows which were never updated (whose `updated_at` is
+    null) cannot be placed in the feed, and are skipped (with a warning).
+
+    Args:
+        query: A :class:`sqlalchemy.orm.Query` of the model, optionally with further filters.
+            Any existing ordering is replaced.
+        watermark: The :attr:`ChangeFeed.watermark` of a previous sync. Defaults to the
+            beginning of the table.
+        chunk_size: The number of rows fetched per query.
+        settle: Rows whose timestamp is within this long of the present are left to a future
+            sync. Timestamps are assigned before their transaction commits (and by application
+            servers whose clocks may differ), so a row can become visible with a timestamp
+            earlier than rows which were already synced. The `settle` period should exceed the
+            longest such transaction and skew.
+        expunge: See :func:`strapp.sqlalchemy.stream`.
+        yield_per: See :func:`strapp.sqlalchemy.stream`.
+
+    Examples:
+        >>> from strapp.sqlalchemy import create_session, declarative_base
+        >>> Base = declarative_base()
+        >>> class Foo(Base, created_at=True, updated_at=True):
+        ...     __tablename__ = 'foo'
+        ...     id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+        >>> session = create_session({"drivername": "sqlite"})
+        >>> Base.metadata.create_all(bind=session.connection())
+        >>> session.add_all([Foo(id=i, created_at=datetime(2020, 1, 1)) for i in range(1, 4)])
+
+        >>> feed = change_feed(session.query(Foo), chunk_size=2)
+        >>> [[foo.id for foo in chunk] for chunk in feed.chunks()]
+        [[1, 2], [3]]
+        >>> watermark = feed.watermark
+        >>> watermark
+        (datetime.datetime(2020, 1, 1, 0, 0), 3)
+
+        >>> session.get(Foo, 2).updated_at = datetime(2020, 1, 2)
+        >>> [foo.id for foo in change_feed(session.query(Foo), watermark=watermark)]
+        [2]
+    """
+    return ChangeFeed(
+        query,
+        watermark=watermark,
+        chunk_size=chunk_size,
+        settle=settle,
+        expunge=expunge,
+        yield_per=yield_per,
+    )
+
+
+def change_timestamp(model):
+    """Produce the expression of when a row of `model` last changed.
+
+    :code:`coalesce(updated_at, created_at)` for models with both columns (as `updated_at` is
+    null until the row is first updated), otherwise whichever of the two the model has.
+    """
+    columns = [getattr(model, name) for name in _timestamp_columns if hasattr(model, name)]
+    return _coalesce(model, columns)
+
+
+def change_feed_index(model, *, name: Optional[str] = None) -> sqlalchemy.Index:
+    """Declare the composite index which supports a :func:`change_feed` of `model`.
+
+    The index is of the :func:`change_timestamp` expression followed by the primary key, and
+    is attached to the model's table (and therefore picked up by `create_all` and Alembic
+    autogenerate). Call it alongside the model's definition. Calling it again returns the
+    existing index.
+
+    Examples:
+        >>> from strapp.sqlalchemy import declarative_base
+        >>> Base = declarative_base()
+        >>> class Foo(Base, created_at=True, updated_at=True):
+        ...     __tablename__ = 'foo'
+        ...     id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+        >>> index = change_feed_index(Foo)
+
+        >>> print(sqlalchemy.schema.CreateIndex(index))
+        CREATE INDEX ix_foo_change_feed ON foo (coalesce(updated_at, created_at), id)
+    """
+    table = model.__table__
+    name = name or f"ix_{table.name}_change_feed"
+
+    for index in table.indexes:
+        if index.name == name:
+            return index
+
+    columns = [table.c[column] for column in _timestamp_columns if column in table.c]
+    return sqlalchemy.Index(name, _coalesce(model, columns), *table.primary_key.columns)
+
+
+_timestamp_columns = ("updated_at", "created_at")
+
+
+def _coalesce(model, columns):
+    if not columns:
+        raise ValueError(f"{model.__name__} has neither an `updated_at` nor `created_at` column")
+
+    if len(columns) == 1:
+        return columns[0]
+    return sqlalchemy.func.coalesce(*columns)
+
+
+def _timestamp_of(instance) -> datetime:
+    for name in _timestamp_columns:
+        timestamp = getattr(instance, name, None)
+        if timestamp is not None:
+            return timestamp
+
+    raise ValueError(f"{instance!r} has neither an `updated_at` nor `created_at` timestamp")
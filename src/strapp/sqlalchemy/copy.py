@@ -0,0 +1,232 @@
+import csv
+import enum
+import io
+import json
+from typing import IO, Iterable, Optional
+
+import sqlalchemy.orm
+
+from strapp.sqlalchemy.bulk import _chunks, _fill_timestamps, bulk_insert, Row
+
+
+def copy_from(session, model, rows: Iterable[Row], *, chunk_size: int = 10_000) -> int:
+    """Load `rows` into the table of `model`, with postgresql's :code:`COPY ... FROM STDIN`.
+
+    COPY avoids the per-row statement overhead of even batched (executemany) inserts. Rows
+    are consumed lazily and written, `chunk_size` rows at a time, into an in-memory CSV buffer,
+    which is sent as one COPY per chunk. Memory is therefore bounded by `chunk_size`, rather
+    than the size of the whole dataset.
+
+    As with :func:`strapp.sqlalchemy.bulk.bulk_insert`, `created_at` is filled once per chunk.
+    Other python-side column defaults are not applied, although server defaults are.
+
+    Dialects (or drivers) other than postgresql (with psycopg2) fall back to
+    :func:`strapp.sqlalchemy.bulk.bulk_insert`.
+
+    Args:
+        session: A session (or connection) with which to load the rows. The rows are loaded
+            within its transaction.
+        model: The declarative model class.
+        rows: An iterable of dicts, keyed by column name, or instances of `model`. Every row
+            should supply the same set of columns.
+        chunk_size: The maximum number of rows per COPY.
+
+    Returns:
+        The number of rows loaded.
+
+    Examples:
+        >>> from strapp.sqlalchemy import create_session, declarative_base
+        >>> Base = declarative_base()
+        >>> class Foo(Base):
+        ...     __tablename__ = 'foo'
+        ...     id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+        ...     name = sqlalchemy.Column(sqlalchemy.types.Unicode())
+
+        >>> session = create_session({"drivername": "sqlite"})
+        >>> Base.metadata.create_all(bind=session.connection())
+        >>> copy_from(session, Foo, ({"id": i, "name": str(i)} for i in range(1, 4)))
+        3
+    """
+    cursor = _copy_cursor(_connection(session, mapper=sqlalchemy.inspect(model)))
+    if cursor is None:
+        return bulk_insert(session, model, rows, chunk_size=chunk_size)
+
+    table = model.__table__
+    preparer = cursor.dialect.identifier_preparer
+
+    count = 0
+    try:
+        for chunk in _chunks(rows, model, chunk_size):
+            _fill_timestamps(table, chunk, "created_at")
+
+            columns = [table.c[key] for key in chunk[0]]
+            buffer = io.StringIO()
+            for row in chunk:
+                buffer.write(_copy_line(_copy_value(column, row[column.key]) for column in columns))
+            buffer.seek(0)
+
+            names = ", ".join(preparer.quote(column.name) for column in columns)
+            statement = (
+                f"COPY {preparer.format_table(table)} ({names}) FROM STDIN WITH (FORMAT csv)"
+            )
+            cursor.copy_expert(statement, buffer)
+            count += len(chunk)
+    finally:
+        cursor.close()
+
+    return count
+
+
+def copy_to(session, query, file: IO[str], *, header: bool = True, chunk_size: int = 10_000) -> int:
+    """Export the result of `query` as CSV into `file`, with postgresql's :code:`COPY TO STDOUT`.
+
+    The result is streamed straight from the database into `file`, without being loaded into
+    python objects (or memory) first.
+
+    Dialects (or drivers) other than postgresql (with psycopg2) fall back to executing the
+    query with a server-side cursor, and writing the rows `chunk_size` at a time.
+
+    Args:
+        session: A session (or connection) with which to execute the query.
+        query: A :class:`sqlalchemy.orm.Query`, :func:`sqlalchemy.select`, model or table.
+        file: A text file-like object to write the CSV into.
+        header: Whether to write a header line of the column names.
+        chunk_size: The number of rows fetched at a time, for the fallback.
+
+    Returns:
+        The number of rows exported.
+
+    Examples:
+        >>> from strapp.sqlalchemy import create_session, declarative_base
+        >>> Base = declarative_base()
+        >>> class Foo(Base):
+        ...     __tablename__ = 'foo'
+        ...     id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+        ...     name = sqlalchemy.Column(sqlalchemy.types.Unicode())
+
+        >>> session = create_session({"drivername": "sqlite"})
+        >>> Base.metadata.create_all(bind=session.connection())
+        >>> Foo.bulk_insert(session, [{"id": 1, "name": "a"}, {"id": 2, "name": None}])
+        2
+
+        >>> file = io.StringIO()
+        >>> copy_to(session, session.query(Foo).order_by(Foo.id), file)
+        2
+        >>> print(file.getvalue().replace("\\r", ""), end="")
+        id,name
+        1,a
+        2,
+    """
+    statement = _statement(query)
+
+    connection = _connection(session, clause=statement)
+    cursor = _copy_cursor(connection)
+    if cursor is None:
+        return _export(connection, statement, file, header=header, chunk_size=chunk_size)
+
+    compiled = statement.compile(
+        dialect=cursor.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    sql = cursor.mogrify(compiled.string, compiled.params).decode()
+    options = "FORMAT csv, HEADER" if header else "FORMAT csv"
+
+    # Postgres sends each row (and the header) as its own message, which psycopg2 writes
+    # separately.
+    writer = _CountingWriter(file)
+    try:
+        cursor.copy_expert(f"COPY ({sql}) TO STDOUT WITH ({options})", writer)
+    finally:
+        cursor.close()
+
+    if cursor.rowcount >= 0:
+        return cursor.rowcount
+    return writer.writes - int(header)
+
+
+class _CopyCursor:
+    """A DBAPI cursor which supports COPY (i.e. psycopg2's), along with its dialect."""
+
+    def __init__(self, cursor, dialect):
+        self.cursor = cursor
+        self.dialect = dialect
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+
+class _CountingWriter:
+    def __init__(self, file):
+        self.file = file
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return self.file.write(data)
+
+
+def _connection(session, **bind_arguments):
+    """Produce the connection of `session` (sharing its transaction), or `session` itself."""
+    if callable(getattr(session, "connection", None)):
+        return session.connection(bind_arguments=bind_arguments)
+    return session
+
+
+def _copy_cursor(connection) -> Optional[_CopyCursor]:
+    """Produce a COPY-capable cursor on `connection`, if it supports one."""
+    if connection.dialect.name != "postgresql":
+        return None
+
+    cursor = connection.connection.cursor()
+    if not hasattr(cursor, "copy_expert"):
+        cursor.close()
+        return None
+    return _CopyCursor(cursor, connection.dialect)
+
+
+def _copy_value(column, value):
+    if value is None:
+        return None
+
+    if isinstance(column.type, sqlalchemy.types.JSON):
+        return json.dumps(value)
+
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\x" + bytes(value).hex()
+
+    if isinstance(value, enum.Enum) and isinstance(column.type, sqlalchemy.types.Enum):
+        return value.name
+
+    return value
+
+
+def _copy_line(values) -> str:
+    """Format a CSV line for COPY, in which only an unquoted empty field is NULL.
+
+    Every other value is quoted, such that empty strings remain empty strings.
+    """
+    fields = (
+        "" if value is None else '"' + str(value).replace('"', '""') + '"' for value in values
+    )
+    return ",".join(fields) + "\n"
+
+
+def _statement(query):
+    if isinstance(query, sqlalchemy.orm.Query):
+        return query.statement
+    if isinstance(query, sqlalchemy.sql.Select):
+        return query
+    return sqlalchemy.select(getattr(query, "__table__", query))
+
+
+def _export(connection, statement, file: IO[str], *, header: bool, chunk_size: int) -> int:
+    # Executed on the connection, rather than the session, to produce rows rather than objects.
+    result = connection.execute(statement.execution_options(stream_results=True))
+    writer = csv.writer(file)
+    if header:
+        writer.writerow(result.keys())
+
+    count = 0
+    for partition in result.partitions(chunk_size):
+        writer.writerows(partition)
+        count += len(partition)
+    return count
@@ -0,0 +1,188 @@
+import logging
+import os
+import threading
+import weakref
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import sqlalchemy
+
+log = logging.getLogger(__name__)
+
+
+def make_url(config: Mapping) -> sqlalchemy.engine.url.URL:
+    """Produce a :class:`sqlalchemy.engine.url.URL` from a dict-like set of its options."""
+    url_cls = sqlalchemy.engine.url.URL
+    if hasattr(url_cls, "create"):
+        url_cls = url_cls.create  # type: ignore
+
+    return url_cls(**dict(config))
+
+
+class EngineRegistry:
+    """Cache engines (and therefore their connection pools) by url and engine kwargs.
+
+    Any number of calls for the same database configuration share a single engine, rather
+    than each producing a new connection pool.
+
+    After an :func:`os.fork`, the child process discards (without closing) the pooled
+    connections it inherited, which remain owned by the parent.
+
+    Examples:
+        >>> registry = EngineRegistry()
+        >>> engine = registry.get({"drivername": "sqlite", "database": "foo.db"})
+        >>> engine is registry.get({"drivername": "sqlite", "database": "foo.db"})
+        True
+        >>> registry.status()
+        [{'url': 'sqlite:///foo.db', 'engine_kwargs': {}, 'pool': '...'}]
+        >>> registry.dispose()
+        >>> registry.status()
+        []
+    """
+
+    def __init__(self) -> None:
+        self._engines: Dict[Tuple, Tuple[sqlalchemy.engine.Engine, Dict]] = {}
+        self._lock = threading.Lock()
+
+        if hasattr(os, "register_at_fork"):
+            ref = weakref.ref(self)
+
+            def after_fork():
+                registry = ref()
+                if registry is not None:
+                    registry.reset_after_fork()
+
+            os.register_at_fork(after_in_child=after_fork)
+
+    def get(
+        self, config: Mapping, *, engine_kwargs: Optional[Dict] = None
+    ) -> sqlalchemy.engine.Engine:
+        """Return the engine for the given `config`, creating it if it does not already exist.
+
+        Args:
+            config: The dict-like set of options to :class:`sqlalchemy.engine.url.URL`
+            engine_kwargs: Optional kwargs to pass through to the :func:`sqlalchemy.create_engine`
+        """
+        url = make_url(config)
+        engine_kwargs = engine_kwargs or {}
+
+        # Each connection to an in-memory sqlite database is a distinct database, sharing
+        # an engine would silently alias otherwise independent databases.
+        if _is_memory_sqlite(url):
+            return sqlalchemy.create_engine(url, **engine_kwargs)
+
+        key = _make_key(url, engine_kwargs)
+
+        entry = self._engines.get(key)
+        if entry is None:
+            with self._lock:
+                entry = self._engines.get(key)
+                if entry is None:
+                    log.debug("Creating engine for %r", url)
+                    engine = sqlalchemy.create_engine(url, **engine_kwargs)
+                    entry = self._engines[key] = (engine, engine_kwargs)
+
+        return entry[0]
+
+    def engines(self) -> List[sqlalchemy.engine.Engine]:
+        """Return all currently registered engines."""
+        return [engine for engine, _ in self._engines.values()]
+
+    def status(self) -> List[Dict]:
+        """Describe the registered engines, and the state of their pools."""
+        return [
+            {
+                "url": repr(engine.url),
+                "engine_kwargs": engine_kwargs,
+                "pool": engine.pool.status(),
+            }
+            for engine, engine_kwargs in self._engines.values()
+        ]
+
+    def dispose(self, config: Optional[Mapping] = None, *, engine_kwargs: Optional[Dict] = None):
+        """Dispose of and unregister engines.
+
+        Args:
+            config: If supplied, only the engine matching this `config` (and `engine_kwargs`)
+                is disposed. Otherwise, all engines are disposed.
+            engine_kwargs: The `engine_kwargs` the engine was created with.
+        """
+        with self._lock:
+            if config is None:
+                entries = list(self._engines.values())
+                self._engines.clear()
+            else:
+                key = _make_key(make_url(config), engine_kwargs or {})
+                entry = self._engines.pop(key, None)
+                entries = [entry] if entry else []
+
+        for engine, _ in entries:
+            engine.dispose()
+
+    def reset_after_fork(self):
+        """Replace the pools of all engines, without closing the parent's connections."""
+        self._lock = threading.Lock()
+        for engine, _ in self._engines.values():
+            _dispose_without_close(engine)
+
+
+def _dispose_without_close(engine):
+    try:
+        engine.dispose(close=False)
+    except TypeError:  # pragma: nocover
+        # SQLAlchemy < 1.4.33 has no `close` argument, so the pool is replaced directly.
+        engine.pool = engine.pool.recreate()
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _make_key(url, engine_kwargs) -> Tuple:
+    return (url.render_as_string(hide_password=False), _freeze(engine_kwargs))
+
+
+def _freeze(value):
+    """Produce a hashable equivalent of (potentially nested) engine kwargs."""
+    if isinstance(value, Mapping):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+
+    try:
+        hash(value)
+    except TypeError:
+        # Unhashable values can only be matched by identity.
+        return ("id", id(value))
+    return value
+
+
+default_registry = EngineRegistry()
+
+
+def create_engine(
+    config: Mapping,
+    *,
+    engine_kwargs: Optional[Dict] = None,
+    registry: Optional[EngineRegistry] = default_registry,
+) -> sqlalchemy.engine.Engine:
+    """Obtain an engine from `registry`, or create an unshared one if `registry` is :code:`None`."""
+    if registry is None:
+        return sqlalchemy.create_engine(make_url(config), **(engine_kwargs or {}))
+    return registry.get(config, engine_kwargs=engine_kwargs)
+
+
+def get_engine(config: Mapping, *, engine_kwargs: Optional[Dict] = None):
+    """Return the process-wide shared engine for the given `config`.
+
+    See :class:`EngineRegistry`.
+    """
+    return default_registry.get(config, engine_kwargs=engine_kwargs)
+
+
+def dispose_engines():
+    """Dispose of all process-wide shared engines."""
+    default_registry.dispose()
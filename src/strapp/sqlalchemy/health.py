@@ -0,0 +1,305 @@
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+from typing import Callable, Dict, List, Optional
+
+import sqlalchemy
+from sqlalchemy.util.queue import Queue
+
+from strapp.sqlalchemy.pool import _call, _warn_already_configured
+
+log = logging.getLogger(__name__)
+
+# The connection record `info` key holding the time after which the connection is recycled.
+RECYCLE_AT_KEY = "strapp_recycle_at"
+
+_healths: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+class PoolHealth:
+    """Manage the health of an engine's pooled connections.
+
+    Prefer :func:`configure_pool_health` to constructing this directly.
+    """
+
+    # The arguments given to :func:`configure_pool_health`, to detect conflicting reconfiguration.
+    _kwargs: Dict = {}
+
+    def __init__(
+        self,
+        engine,
+        *,
+        recycle: Optional[float] = None,
+        recycle_jitter: float = 0.1,
+        check_interval: Optional[float] = None,
+        gauge: Optional[Callable] = None,
+        increment: Optional[Callable] = None,
+        tags: Optional[List[str]] = None,
+        prefix: str = "sqlalchemy.pool",
+    ):
+        # Weakly referenced, as the health is the value of a weak-keyed mapping upon the engine,
+        # which would otherwise never be collected.
+        self._engine = weakref.ref(engine)
+        self.recycle = recycle
+        self.recycle_jitter = recycle_jitter
+        self.check_interval = check_interval
+        self.gauge = gauge
+        self.increment = increment
+        self.tags = tags
+        self.prefix = prefix
+
+        self.warm_up_duration: Optional[float] = None
+        self.checks = 0
+        self.invalidated = 0
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        if recycle is not None:
+            sqlalchemy.event.listen(engine, "connect", self._on_connect)
+            sqlalchemy.event.listen(engine, "checkout", self._on_checkout)
+
+    @property
+    def engine(self):
+        return self._engine()
+
+    def warm_up(self, size: Optional[int] = None) -> int:
+        """Open `size` connections (by default, the pool's size), and return them to the pool.
+
+        Connections are otherwise only opened on demand, so the first requests after a deploy
+        would each pay for connection establishment.
+
+        Returns:
+            The number of connections opened. The time taken is recorded as
+            :attr:`warm_up_duration`, and reported as the `warm_up_ms` gauge.
+        """
+        pool_size = _call(self.engine.pool, "size")
+        if pool_size is None:
+            log.debug("Not warming up %r, as its pool has no size", self.engine.url)
+            return 0
+
+        # Connections beyond the pool's size would be discarded upon being returned.
+        count = pool_size if size is None else min(size, pool_size)
+
+        start = time.perf_counter()
+        connections = []
+        try:
+            for _ in range(count):
+                connections.append(self.engine.pool.connect())
+        finally:
+            for connection in connections:
+                connection.close()
+
+        self.warm_up_duration = time.perf_counter() - start
+        duration_ms = self.warm_up_duration * 1000
+        log.info("Warmed up %s connections to %r in %.1fms", count, self.engine.url, duration_ms)
+        if self.gauge:
+            self.gauge(f"{self.prefix}.warm_up_ms", duration_ms, tags=self.tags)
+        return count
+
+    def check(self) -> int:
+        """Ping each idle connection in the pool, invalidating those which are no longer alive.
+
+        Invalidated connections are replaced when next checked out, rather than failing the
+        request which checks them out.
+
+        Idle connections are taken from the pool one at a time, only for the duration of their
+        ping, rather than being checked out. Concurrent requests are therefore not starved of
+        connections, and neither checkout events (i.e. pool instrumentation and recycling) nor
+        pre-ping are triggered.
+
+        Returns:
+            The number of connections invalidated.
+        """
+        engine = self.engine
+        if engine is None:
+            # The engine has been collected, along with its pool.
+            return 0
+
+        pool = engine.pool
+        # The idle connection records of a :class:`sqlalchemy.pool.QueuePool`.
+        queue = getattr(pool, "_pool", None)
+        records = []
+        if isinstance(queue, Queue):
+            with queue.mutex:
+                records = list(queue.queue)
+
+        invalidated = 0
+        for record in records:
+            if not _take_idle(queue, record):
+                # Checked out since, so known to be in use.
+                continue
+
+            try:
+                if not self._ping(record.dbapi_connection):
+                    record.invalidate()
+                    invalidated += 1
+            finally:
+                _return_idle(queue, record)
+
+        self.checks += 1
+        self.invalidated += invalidated
+        if invalidated:
+            log.info("Invalidated %s dead connections to %r", invalidated, engine.url)
+            if self.increment:
+                self.increment(f"{self.prefix}.invalidated", invalidated, tags=self.tags)
+        return invalidated
+
+    def start(self):
+        """Start checking the pool every `check_interval` seconds, in a daemon thread."""
+        if self.check_interval is None:
+            raise ValueError("A `check_interval` is required to start health checks")
+
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=_run_checks, args=(weakref.ref(self), self._stop), daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background health checks, if started."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def reset_after_fork(self):
+        """Restart the background health checks in a forked child, whose threads did not survive."""
+        if self._thread is not None:
+            self._thread = None
+            self._stop = threading.Event()
+            self.start()
+
+    def _ping(self, dbapi_connection) -> bool:
+        if dbapi_connection is None:
+            # Already invalidated, and reconnected upon its next checkout.
+            return True
+        try:
+            return self.engine.dialect.do_ping(dbapi_connection) is not False
+        except Exception:
+            return False
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        # Jittered, such that connections opened together (i.e. by `warm_up`) are not all
+        # recycled together.
+        jitter = 1 - self.recycle_jitter * random.random()  # nosec
+        connection_record.info[RECYCLE_AT_KEY] = time.monotonic() + self.recycle * jitter
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        recycle_at = connection_record.info.get(RECYCLE_AT_KEY)
+        if recycle_at is not None and time.monotonic() >= recycle_at:
+            # The pool replaces the connection, and retries the checkout.
+            raise sqlalchemy.exc.DisconnectionError("Recycling connection")
+
+
+def configure_pool_health(engine, *, warm_up: Optional[int] = None, **kwargs) -> PoolHealth:
+    """Manage the health of an `engine`'s pooled connections.
+
+    Configuring an already configured engine returns the existing :class:`PoolHealth`
+    (although `warm_up` is performed again), warning if it was configured with different
+    arguments (which are not applied).
+
+    Args:
+        engine: The engine whose pool should be managed.
+        warm_up: When supplied, this many connections (up to the pool's size) are opened
+            immediately, see :meth:`PoolHealth.warm_up`.
+        recycle: When supplied, connections are replaced (upon checkout) once they are
+            roughly this many seconds old, i.e. before a server or proxy's idle timeout.
+        recycle_jitter: The fraction of `recycle` by which each connection's age limit is
+            randomly reduced.
+        check_interval: When supplied, idle connections are pinged every this many seconds
+            (see :meth:`PoolHealth.check`), in a background thread.
+        gauge: Optional callable `(metric, value, tags=None)`, i.e. :func:`strapp.datadog.gauge`.
+            Receives the warm-up time, in milliseconds.
+        increment: Optional callable `(metric, value, tags=None)`, i.e.
+            :func:`strapp.datadog.increment`. Receives the number of invalidated connections.
+        tags: Optional tags to attach to every emitted metric.
+        prefix: The prefix of every emitted metric name.
+
+    Examples:
+        >>> engine = sqlalchemy.create_engine("sqlite://", poolclass=sqlalchemy.pool.QueuePool)
+        >>> health = configure_pool_health(engine, warm_up=3, recycle=3600)
+        >>> engine.pool.checkedin()
+        3
+        >>> health.check()
+        0
+    """
+    health = _healths.get(engine)
+    if health is None:
+        health = _healths[engine] = PoolHealth(engine, **kwargs)
+        health._kwargs = kwargs
+        if health.check_interval is not None:
+            health.start()
+    elif kwargs != health._kwargs:
+        _warn_already_configured(engine, "pool health configuration")
+
+    if warm_up:
+        health.warm_up(warm_up)
+    return health
+
+
+def get_pool_health(engine) -> Optional[PoolHealth]:
+    """Return the :class:`PoolHealth` of an `engine`, if it has been configured."""
+    return _healths.get(engine)
+
+
+def _take_idle(queue, record) -> bool:
+    """Remove the connection `record` from the `queue` of idle connections, if still idle."""
+    with queue.mutex:
+        try:
+            queue.queue.remove(record)
+        except ValueError:
+            return False
+        queue.not_full.notify()
+    return True
+
+
+def _return_idle(queue, record):
+    """Restore a connection `record` taken by :func:`_take_idle` to the `queue`.
+
+    The record is appended directly, even should connections opened (as overflow) in the
+    meantime have filled the queue, as the pool still counts the record as one of its own.
+    """
+    with queue.mutex:
+        queue.queue.append(record)
+        queue.not_empty.notify()
+
+
+def _run_checks(ref, stop: threading.Event):
+    """Check the pool of a (weakly referenced) :class:`PoolHealth` until stopped or collected."""
+    while True:
+        health = ref()
+        if health is None:
+            return
+
+        # Jittered, such that many processes do not check in lockstep.
+        interval = health.check_interval * (1 + 0.1 * random.random())  # nosec
+        del health
+
+        if stop.wait(interval):
+            return
+
+        health = ref()
+        if health is None:
+            return
+
+        try:
+            health.check()
+        except Exception:
+            log.exception("Connection pool health check failed")
+        del health
+
+
+def _reset_after_fork():
+    for health in list(_healths.values()):
+        health.reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
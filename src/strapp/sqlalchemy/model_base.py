@@ -1,49 +1,120 @@
 from __future__ import annotations
 
 import operator
+import weakref
 from datetime import datetime
-from typing import Optional, Type
+from typing import Any, Callable, Optional, Tuple, Type, Union
 
 import sqlalchemy
 from sqlalchemy.orm import declarative_base as sqlalchemy_declarative_base
 from sqlalchemy.orm import DeclarativeMeta as SQLAlchemyDeclarativeMeta
 from sqlalchemy.orm import Mapped
 
+from strapp.sqlalchemy.bulk import BulkOperations
+from strapp.sqlalchemy.partitions import partition_table
+from strapp.sqlalchemy.serialize import Serializable
+from strapp.sqlalchemy.timestamps import server_updated_at_column
 
-def repr_fn(instance):
+
+def make_repr_fn(max_length: Optional[int] = None) -> Callable[[Any], str]:
     """Define a generic repr function for sqlalchemy models.
 
+    The columns (and whether they are deferred) of each model class are looked up once, upon
+    the first `repr` of an instance of that class, rather than on every call.
+
     Args:
-        instance: The to generate the `repr` of.
+        max_length: If supplied, the `repr` of each individual value is truncated to at most
+            this many characters (followed by "...").
+
+    Examples:
+        >>> Base = declarative_base(repr=make_repr_fn(max_length=5))
+        >>> class Example(Base):
+        ...     __tablename__ = 'example'
+        ...     id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+        ...     name = sqlalchemy.Column(sqlalchemy.types.Unicode())
+        >>> Example(id=1, name="abcdefgh")
+        Example(id=1, name='abcd...)
     """
-    cls = instance.__class__
-    class_name = cls.__name__
-    state = sqlalchemy.inspect(cls)
+    plans: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def repr_fn(instance):
+        cls = instance.__class__
+        plan = plans.get(cls)
+        if plan is None:
+            plan = plans[cls] = _repr_plan(cls)
+
+        # Loaded values are read directly from the instance's `__dict__`, bypassing the
+        # (comparatively slow) instrumented attribute access.
+        loaded = instance.__dict__
+        repr_attrs_list = []
+        for attr, prefix, getter in plan:
+            if getter is None:
+                repr_attrs_list.append(prefix + "<not loaded>")
+                continue
+
+            value = repr(loaded[attr] if attr in loaded else getter(instance))
+            if max_length is not None and len(value) > max_length:
+                value = value[:max_length] + "..."
+            repr_attrs_list.append(prefix + value)
+
+        return f"{cls.__name__}({', '.join(repr_attrs_list)})"
 
-    repr_attrs_list = []
-    for attr in state.columns.keys():
-        value = "<not loaded>"
-        if not state.attrs[attr].deferred:
-            value = repr(getattr(instance, attr))
-        repr_attrs_list.append(f"{attr}={value}")
+    return repr_fn
 
-    repr_attrs = ", ".join(repr_attrs_list)
-    return f"{class_name}({repr_attrs})"
 
+# The default `__repr__` of :func:`declarative_base` models.
+repr_fn = make_repr_fn()
 
-def __init_subclass__(cls, created_at=False, updated_at=False, deleted_at=False, **kwargs):
+
+def _repr_plan(cls) -> Tuple[Tuple[str, str, Optional[Callable[[Any], Any]]], ...]:
+    """Produce the (attr, "<attr>=", getter) triples of a model's `repr`.
+
+    Deferred columns are given no getter, in order to avoid loading them.
+    """
+    state = sqlalchemy.inspect(cls)
+    return tuple(
+        (attr, f"{attr}=", None if state.attrs[attr].deferred else operator.attrgetter(attr))
+        for attr in state.columns.keys()
+    )
+
+
+def __init_subclass__(
+    cls, created_at=False, updated_at=False, deleted_at=False, partitioned=None, **kwargs
+):
     super(cls).__init_subclass__(**kwargs)
 
     # SQLAlchemy before 1.4.0 only work with the init_subclass strategy,
     # requiring use of `setattr`.
-    _set_attrs(cls, created_at=created_at, updated_at=updated_at, deleted_at=deleted_at, op=setattr)
+    _set_attrs(
+        cls,
+        created_at=created_at,
+        updated_at=updated_at,
+        deleted_at=deleted_at,
+        partitioned=partitioned,
+        op=setattr,
+    )
 
 
 class DeclarativeMeta(SQLAlchemyDeclarativeMeta):
     """Wrap sqlalchemy declarative meta to allow for extra kwargs."""
 
+    def __new__(mcs, classname, bases, dict_, **kwargs):
+        # Soft-deletable models are marked as such, in order for criteria to target them
+        # (see :mod:`strapp.sqlalchemy.soft_delete`).
+        if kwargs.get("deleted_at") and not any(issubclass(base, DeletedAt) for base in bases):
+            bases = (*bases, DeletedAt)
+        return super().__new__(mcs, classname, bases, dict_, **kwargs)
+
     def __init__(
-        cls, classname, bases, dict_, created_at=False, updated_at=False, deleted_at=False, **kwargs
+        cls,
+        classname,
+        bases,
+        dict_,
+        created_at=False,
+        updated_at=False,
+        deleted_at=False,
+        partitioned=None,
+        **kwargs,
     ):
         # SQLAlchemy 1.4.0 and later only work with the metaclass init strategy,
         # requiring use of `setitem`.
@@ -52,31 +123,55 @@ class DeclarativeMeta(SQLAlchemyDeclarativeMeta):
             created_at=created_at,
             updated_at=updated_at,
             deleted_at=deleted_at,
+            partitioned=partitioned,
             op=operator.setitem,
         )
         super().__init__(classname, bases, dict_)
 
+        table = cls.__dict__.get("__table__")
+        if getattr(cls, "__partial_indexes__", False) and table is not None:
+            make_partial_indexes(table)
+        if partitioned and table is not None:
+            partition_table(table, partitioned)
+
     @classmethod
-    def __init_subclass__(cls, created_at=False, updated_at=False, deleted_at=False, **kwargs):
+    def __init_subclass__(
+        cls, created_at=False, updated_at=False, deleted_at=False, partitioned=None, **kwargs
+    ):
         super().__init_subclass__(**kwargs)
 
 
 def declarative_base(
-    base: Optional[Type[SQLAlchemyDeclarativeMeta]] = None, *, repr=True, metadata=None
+    base: Optional[Type[SQLAlchemyDeclarativeMeta]] = None,
+    *,
+    repr: Union[bool, Callable[[Any], str]] = True,
+    metadata=None,
+    partial_indexes: bool = False,
 ) -> DeclarativeMeta:
     """Define a declarative base class.
 
     Args:
         base: Optional alternative base, one will be created if omitted.
-        repr: If True, automatically define a `__repr__` method.
+        repr: If True, automatically define a `__repr__` method. Alternatively, a custom
+            `__repr__` function, i.e. :code:`make_repr_fn(max_length=50)` to truncate long values.
         metadata: Passthrough argument to the `declarative_base` function.
+        partial_indexes: If True, the indexes and unique constraints of `deleted_at` models
+            only cover live rows (see :func:`make_partial_indexes`). Individual models can
+            override this with a :code:`__partial_indexes__` class attribute.
 
     Additionally, subclasses of the resultant `Base` accept the following class
     definition options:
 
         * created_at: True/False
-        * updated_at: True/False
+        * updated_at: True/False/"server". "server" maintains the column in the database
+          (by trigger) rather than in Python, see :mod:`strapp.sqlalchemy.timestamps`.
         * deleted_at: True/False
+        * partitioned: None/"day"/"week"/"month"/"year". Range partitions the table by
+          `created_at` (on postgresql), see :mod:`strapp.sqlalchemy.partitions`.
+
+    The resultant `Base` (and therefore its subclasses) also provides the class-level
+    :meth:`bulk_insert` and :meth:`bulk_upsert` operations, see :mod:`strapp.sqlalchemy.bulk`,
+    and the :meth:`to_dict`/:meth:`to_dicts` serializers, see :mod:`strapp.sqlalchemy.serialize`.
 
     Examples:
         >>> Base = declarative_base()
@@ -94,15 +189,20 @@ def declarative_base(
     dict_ = dict(
         __abstract__=True,
         __init_subclass__=__init_subclass__,
+        __partial_indexes__=partial_indexes,
     )
 
-    if repr:
+    if repr is True:
         dict_["__repr__"] = repr_fn
+    elif repr:
+        dict_["__repr__"] = repr
 
-    return DeclarativeMeta("Base", (base_,), dict_)
+    return DeclarativeMeta("Base", (base_, BulkOperations, Serializable), dict_)
 
 
-def _set_attrs(dict_, created_at=False, updated_at=False, deleted_at=False, op=setattr):
+def _set_attrs(
+    dict_, created_at=False, updated_at=False, deleted_at=False, partitioned=None, op=setattr
+):
     """Assign created_at/updated_at/deleted_at to the database model.
 
     Different versions of SQLAlchemy require different strategies of setting
@@ -120,7 +220,9 @@ def _set_attrs(dict_, created_at=False, updated_at=False, deleted_at=False, op=s
             ),
         )
 
-    if updated_at:
+    if updated_at == "server":
+        op(dict_, "updated_at", server_updated_at_column())
+    elif updated_at:
         op(
             dict_,
             "updated_at",
@@ -139,6 +241,54 @@ def _set_attrs(dict_, created_at=False, updated_at=False, deleted_at=False, op=s
         )
 
 
+def make_partial_indexes(table: sqlalchemy.Table):
+    """Restrict a soft-deletable `table`'s indexes and unique constraints to live rows.
+
+    Each index gains a :code:`WHERE deleted_at IS NULL` clause, and each unique constraint is
+    replaced by an equivalent partial unique index (unique constraints cannot be partial). Live
+    row queries thereby remain index-only as soft-deleted rows accumulate, and the values of
+    soft-deleted rows can be reused.
+
+    Indexes which already have a `WHERE` clause, and indexes solely of `deleted_at`, are left
+    as-is. Calling this more than once (i.e. for single table inheritance) is harmless.
+
+    Examples:
+        >>> Base = declarative_base(partial_indexes=True)
+        >>> class Example(Base, deleted_at=True):
+        ...     __tablename__ = 'example'
+        ...     id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+        ...     email = sqlalchemy.Column(sqlalchemy.types.Unicode(), unique=True)
+
+        >>> from sqlalchemy.dialects import postgresql
+        >>> [index] = Example.__table__.indexes
+        >>> print(sqlalchemy.schema.CreateIndex(index).compile(dialect=postgresql.dialect()))
+        CREATE UNIQUE INDEX ix_example_email ON example (email) WHERE deleted_at IS NULL
+    """
+    if "deleted_at" not in table.c:
+        return
+
+    where = table.c.deleted_at.is_(None)
+
+    for constraint in list(table.constraints):
+        if not isinstance(constraint, sqlalchemy.UniqueConstraint):
+            continue
+
+        table.constraints.remove(constraint)
+        name = constraint.name
+        sqlalchemy.Index(name, *constraint.columns, unique=True, _table=table)  # type: ignore
+
+    for index in table.indexes:
+        if [column.name for column in index.columns] == ["deleted_at"]:
+            continue
+
+        options = index.dialect_options
+        if options["postgresql"]["where"] is not None or options["sqlite"]["where"] is not None:
+            continue
+
+        options["postgresql"]["where"] = where
+        options["sqlite"]["where"] = where
+
+
 class CreatedAt:
     """A stub class purely used for type-checking."""
 
@@ -152,6 +302,12 @@ class UpdatedAt:
 
 
 class DeletedAt:
-    """A stub class purely used for type-checking."""
+    """Mixed into `deleted_at` models, for type-checking and soft-delete criteria.
 
-    deleted_at: Mapped[Optional[datetime]]
+    Models which define their own `deleted_at` column can inherit from this directly, in order
+    to opt into :mod:`strapp.sqlalchemy.soft_delete`.
+    """
+
+    deleted_at: Mapped[Optional[datetime]] = sqlalchemy.Column(  # type: ignore
+        sqlalchemy.types.DateTime(timezone=True), nullable=True
+    )
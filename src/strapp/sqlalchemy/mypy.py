@@ -4,6 +4,7 @@ import sqlalchemy.ext.mypy.apply
 import sqlalchemy.ext.mypy.decl_class
 import sqlalchemy.ext.mypy.plugin
 import sqlalchemy.ext.mypy.util
+from mypy.mro import calculate_mro
 from mypy.nodes import (
     ArgKind,
     AssignmentStmt,
@@ -27,34 +28,59 @@ class StrappSqlalchemyPlugin(Plugin):
 
     def get_base_class_hook(self, fullname: str) -> Optional[Callable[[ClassDefContext], None]]:
         sym = self.lookup_fully_qualified(fullname)
-
-        if (
-            sym
-            and isinstance(sym.node, TypeInfo)
-            and sqlalchemy.ext.mypy.util.has_declarative_base(sym.node)
-        ):
+        if sym and isinstance(sym.node, TypeInfo) and _is_declarative(sym.node):
             return _base_cls_hook
-
         return None
 
 
+def _is_declarative(info: TypeInfo) -> bool:
+    """Whether `info` is declarative.
+
+    mypy asks for the hook of every base of every class, i.e. `Base` once per model, so the
+    result is memoized in the class' metadata. Unlike a memo upon the plugin, it is discarded
+    along with the class when mypy re-analyzes it (i.e. under dmypy).
+    """
+    metadata = info.metadata.setdefault("strapp", {})
+    declarative = metadata.get("declarative")
+    if declarative is None:
+        declarative = sqlalchemy.ext.mypy.util.has_declarative_base(info)
+
+        # A class whose MRO has not been calculated yet (i.e. it has been deferred) may yet
+        # turn out to be declarative.
+        if declarative or info.mro:
+            metadata["declarative"] = declarative
+    return declarative
+
+
 def _dynamic_class_hook(ctx: DynamicClassDefContext) -> None:
     """Generate a TypedBase class when the declarative_base() is called."""
     sqlalchemy.ext.mypy.plugin._dynamic_class_hook(ctx)  # type: ignore
 
+    # Our `declarative_base` additionally mixes in the bulk operations and serializers.
+    sym = ctx.api.lookup_qualified(ctx.name, ctx.call)
+    mixins = [
+        ctx.api.named_type_or_none("strapp.sqlalchemy.bulk.BulkOperations"),
+        ctx.api.named_type_or_none("strapp.sqlalchemy.serialize.Serializable"),
+    ]
+    if sym and isinstance(sym.node, TypeInfo) and all(mixins):
+        info = sym.node
+        info.bases = [base for base in info.bases if base.type.fullname != "builtins.object"]
+        info.bases.extend(mixin for mixin in mixins if mixin)
+        info.mro = []
+        calculate_mro(info)
+
 
 def _base_cls_hook(ctx: ClassDefContext) -> None:
     api = ctx.api
     cls = ctx.cls
 
-    if cls.keywords.get("created_at"):
-        make_dt_assignment(api, cls, "created_at", "CreatedAt")
-
-    if cls.keywords.get("updated_at"):
-        make_dt_assignment(api, cls, "updated_at", "UpdatedAt")
-
-    if cls.keywords.get("deleted_at"):
-        make_dt_assignment(api, cls, "deleted_at", "DeletedAt")
+    for name, base_cls_name in [
+        ("created_at", "CreatedAt"),
+        ("updated_at", "UpdatedAt"),
+        ("deleted_at", "DeletedAt"),
+    ]:
+        if cls.keywords.get(name) and not _is_plugin_generated(cls, name):
+            make_dt_assignment(api, cls, name, base_cls_name)
 
     # Reexecute the default sqlalchemy handling code, if we get executed it seems
     # to not run theirs(?)
@@ -62,6 +88,12 @@ def _base_cls_hook(ctx: ClassDefContext) -> None:
     sqlalchemy.ext.mypy.decl_class.scan_declarative_assignments_and_apply_types(ctx.cls, ctx.api)
 
 
+def _is_plugin_generated(cls, name) -> bool:
+    """Whether `name` was already generated, by an earlier pass over the (deferred) class."""
+    sym = cls.info.names.get(name)
+    return bool(sym and sym.plugin_generated)
+
+
 def make_dt_assignment(api, cls, name, base_cls_name):
     """Create a stub column assignment for mypy/sqlalchemy to pick up.
 
@@ -85,21 +117,25 @@ def make_dt_assignment(api, cls, name, base_cls_name):
 
     statement = AssignmentStmt(
         lvalues=[name_expr],
-        rvalue=CallExpr(
-            callee=MemberExpr(expr=NameExpr("sqlalchemy"), name="Column"),
-            args=[
-                CallExpr(
-                    callee=MemberExpr(
-                        expr=MemberExpr(expr=NameExpr("sqlalchemy"), name="types"),
-                        name="DateTime",
-                    ),
-                    args=[],
-                    arg_kinds=[],
-                    arg_names=[],
-                )
-            ],
-            arg_kinds=[ArgKind.ARG_POS],
-            arg_names=[None],
+        # Wrapped as the sqlalchemy plugin wraps columns, as `Column[DateTime]` would otherwise
+        # be checked against the `Mapped[datetime]` annotation (should the class be deferred).
+        rvalue=sqlalchemy.ext.mypy.util.expr_to_mapped_constructor(
+            CallExpr(
+                callee=MemberExpr(expr=NameExpr("sqlalchemy"), name="Column"),
+                args=[
+                    CallExpr(
+                        callee=MemberExpr(
+                            expr=MemberExpr(expr=NameExpr("sqlalchemy"), name="types"),
+                            name="DateTime",
+                        ),
+                        args=[],
+                        arg_kinds=[],
+                        arg_names=[],
+                    )
+                ],
+                arg_kinds=[ArgKind.ARG_POS],
+                arg_names=[None],
+            )
         ),
         type=type_,
     )
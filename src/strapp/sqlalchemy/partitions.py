@@ -0,0 +1,264 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence, Tuple
+
+import sqlalchemy.orm
+from sqlalchemy.ext.compiler import compiles
+
+# The `Table.info` key holding the partition interval of a partitioned table.
+PARTITION_INFO_KEY = "strapp_partition_interval"
+
+PARTITION_BY = "RANGE (created_at)"
+
+INTERVALS = ("day", "week", "month", "year")
+
+_name_formats = {"day": "%Y%m%d", "week": "%Y%m%d", "month": "%Y%m", "year": "%Y"}
+
+
+def partition_table(table: sqlalchemy.Table, interval: str):
+    """Range partition a `table` by its `created_at` column, one partition per `interval`.
+
+    Only affects postgresql, where the table is created with :code:`PARTITION BY RANGE
+    (created_at)`, and `created_at` is added to its primary key (which postgresql requires
+    of the partition key). Elsewhere the table is created as normal.
+
+    Prefer the :code:`partitioned="month"` (etc) model option to using this directly.
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"partition interval must be one of {INTERVALS}, not {interval!r}")
+
+    if "created_at" not in table.c:
+        raise ValueError(f"Partitioned table {table.name} requires a `created_at` column")
+
+    table.dialect_kwargs["postgresql_partition_by"] = PARTITION_BY
+    table.info[PARTITION_INFO_KEY] = interval
+
+
+def partition_bounds(interval: str, at: datetime) -> Tuple[datetime, datetime]:
+    """Produce the (inclusive) lower and (exclusive) upper bounds of the partition containing `at`.
+
+    Naive datetimes are assumed to be UTC. Weeks begin on Monday.
+
+    Examples:
+        >>> lower, upper = partition_bounds("month", datetime(2020, 12, 15))
+        >>> lower.date(), upper.date()
+        (datetime.date(2020, 12, 1), datetime.date(2021, 1, 1))
+    """
+    at = _utc(at).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    if interval == "day":
+        lower = at
+    elif interval == "week":
+        lower = at - timedelta(days=at.weekday())
+    elif interval == "month":
+        lower = at.replace(day=1)
+    elif interval == "year":
+        lower = at.replace(month=1, day=1)
+    else:
+        raise ValueError(f"partition interval must be one of {INTERVALS}, not {interval!r}")
+
+    return lower, _next(interval, lower)
+
+
+def partition_name(table_name: str, interval: str, lower: datetime) -> str:
+    """Name the partition of a table beginning at `lower`, i.e. :code:`events_p202001`."""
+    return f"{table_name}_p{lower.strftime(_name_formats[interval])}"
+
+
+def create_partition_ddl(
+    table_name: str, interval: str, lower: datetime, *, schema: Optional[str] = None
+) -> str:
+    """Produce the statement which creates the partition of a table beginning at `lower`.
+
+    Examples:
+        >>> print(create_partition_ddl("events", "month", datetime(2020, 1, 1)))
+        CREATE TABLE IF NOT EXISTS events_p202001 PARTITION OF events
+        FOR VALUES FROM ('2020-01-01T00:00:00+00:00') TO ('2020-02-01T00:00:00+00:00')
+    """
+    lower = _utc(lower)
+    upper = _next(interval, lower)
+    name = _qualified(partition_name(table_name, interval, lower), schema)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {_qualified(table_name, schema)}\n"
+        f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+    )
+
+
+def plan_partitions(
+    table_name: str,
+    interval: str,
+    existing: Sequence[str],
+    *,
+    now: Optional[datetime] = None,
+    premake: int = 3,
+    retention: Optional[timedelta] = None,
+) -> Tuple[List[datetime], List[str]]:
+    """Determine which partitions of a table to create, and which to drop.
+
+    Returns:
+        The lower bounds of the partitions to create (the current partition, and the following
+        `premake` partitions, which do not already exist), and the names of the `existing`
+        partitions to drop (those whose entire range is older than `retention`).
+
+    Examples:
+        >>> existing = ["events_p202001", "events_p202002", "events_p202003"]
+        >>> create, drop = plan_partitions(
+        ...     "events", "month", existing, now=datetime(2020, 3, 15), premake=1,
+        ...     retention=timedelta(days=30),
+        ... )
+        >>> [partition_name("events", "month", lower) for lower in create]
+        ['events_p202004']
+        >>> drop
+        ['events_p202001']
+    """
+    now = _utc(now or datetime.now(timezone.utc))
+
+    create = []
+    lower, _ = partition_bounds(interval, now)
+    for _ in range(premake + 1):
+        if partition_name(table_name, interval, lower) not in existing:
+            create.append(lower)
+        lower = _next(interval, lower)
+
+    drop = []
+    if retention is not None:
+        cutoff = now - retention
+        for name in existing:
+            start = _parse_name(table_name, interval, name)
+            if start is not None and _next(interval, start) <= cutoff:
+                drop.append(name)
+
+    return create, sorted(drop)
+
+
+def list_partitions(connection, table_name: str, *, schema: Optional[str] = None) -> List[str]:
+    """List the names of the existing partitions of a (postgresql) table."""
+    query = sqlalchemy.text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "JOIN pg_namespace ON pg_namespace.oid = parent.relnamespace "
+        "WHERE parent.relname = :table "
+        "AND pg_namespace.nspname = coalesce(:schema, current_schema())"
+    ).bindparams(table=table_name, schema=schema)
+    return sorted(row[0] for row in connection.execute(query))
+
+
+def maintain_partitions(
+    connection,
+    model,
+    *,
+    premake: int = 3,
+    retention: Optional[timedelta] = None,
+    now: Optional[datetime] = None,
+) -> Tuple[List[str], List[str]]:
+    """Pre-create the upcoming partitions of a partitioned model, and drop expired partitions.
+
+    Intended to be run periodically (i.e. daily), such that partitions always exist ahead of
+    the rows inserted into them. Dropping an expired partition is a near-instant, metadata-only
+    operation, unlike deleting its rows.
+
+    Args:
+        connection: A postgresql connection (or session).
+        model: The partitioned model (or its table).
+        premake: The number of partitions after the current one to ensure exist.
+        retention: If supplied, partitions whose entire range is older than this are dropped.
+        now: The current time, defaulting to :code:`datetime.now(timezone.utc)`.
+
+    Returns:
+        The names of the partitions which were created, and dropped.
+    """
+    table = getattr(model, "__table__", model)
+    interval = table.info.get(PARTITION_INFO_KEY)
+    if interval is None:
+        raise ValueError(f"{table.name} is not partitioned")
+
+    dialect = _dialect_name(connection)
+    if dialect != "postgresql":
+        raise NotImplementedError(f"Partitioned tables are not supported for {dialect}")
+
+    existing = list_partitions(connection, table.name, schema=table.schema)
+    create, drop = plan_partitions(
+        table.name, interval, existing, now=now, premake=premake, retention=retention
+    )
+
+    created = []
+    for lower in create:
+        ddl = create_partition_ddl(table.name, interval, lower, schema=table.schema)
+        connection.execute(sqlalchemy.text(ddl))
+        created.append(partition_name(table.name, interval, lower))
+
+    for name in drop:
+        connection.execute(sqlalchemy.text(f"DROP TABLE {_qualified(name, table.schema)}"))
+
+    return created, drop
+
+
+@compiles(sqlalchemy.PrimaryKeyConstraint, "postgresql")
+def _compile_primary_key(constraint, compiler, **kw):
+    """Add `created_at` to the primary key of a partitioned table, in its DDL alone.
+
+    The model's primary key is left as-is, such that elsewhere (i.e. sqlite) an integer `id`
+    remains an autoincrementing primary key of its own.
+    """
+    table = constraint.table
+    if (
+        len(constraint) == 0
+        or table.dialect_options["postgresql"]["partition_by"] != PARTITION_BY
+        or "created_at" in constraint.columns
+    ):
+        return compiler.visit_primary_key_constraint(constraint, **kw)
+
+    # Mirrors `DDLCompiler.visit_primary_key_constraint`.
+    text = ""
+    if constraint.name is not None:
+        name = compiler.preparer.format_constraint(constraint)
+        if name is not None:
+            text += f"CONSTRAINT {name} "
+
+    columns = (
+        constraint.columns_autoinc_first if constraint._implicit_generated else constraint.columns
+    )
+    names = [column.name for column in columns] + ["created_at"]
+    text += f"PRIMARY KEY ({', '.join(compiler.preparer.quote(name) for name in names)})"
+    return text + compiler.define_constraint_deferrability(constraint)
+
+
+def _dialect_name(connection) -> str:
+    if isinstance(connection, sqlalchemy.orm.Session):
+        return connection.get_bind().dialect.name
+    return connection.dialect.name
+
+
+def _next(interval: str, lower: datetime) -> datetime:
+    if interval == "day":
+        return lower + timedelta(days=1)
+    if interval == "week":
+        return lower + timedelta(days=7)
+    if interval == "month":
+        return lower.replace(year=lower.year + lower.month // 12, month=lower.month % 12 + 1)
+    return lower.replace(year=lower.year + 1)
+
+
+def _parse_name(table_name: str, interval: str, name: str) -> Optional[datetime]:
+    prefix = f"{table_name}_p"
+    if not name.startswith(prefix):
+        return None
+
+    _, _, suffix = name.partition(prefix)
+    try:
+        lower = datetime.strptime(suffix, _name_formats[interval])
+    except ValueError:
+        return None
+    return lower.replace(tzinfo=timezone.utc)
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _qualified(table_name: str, schema: Optional[str]) -> str:
+    if schema is None:
+        return table_name
+    return f"{schema}.{table_name}"
@@ -0,0 +1,275 @@
+import bisect
+import logging
+import threading
+import time
+import traceback
+import warnings
+import weakref
+from typing import Callable, Dict, List, Optional, Sequence
+
+import sqlalchemy
+
+log = logging.getLogger(__name__)
+
+# Upper bounds (in milliseconds) of the checkout wait histogram buckets.
+DEFAULT_BUCKETS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+_instrumentations: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+class Histogram:
+    """A minimal, thread-safe, fixed-bucket histogram of durations (in milliseconds)."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += value
+            if value > self.max:
+                self.max = value
+
+    def snapshot(self) -> Dict:
+        labels = [f"le_{bucket}" for bucket in self.buckets] + ["le_inf"]
+        with self._lock:
+            return {
+                "count": self.count,
+                "total_ms": self.total,
+                "max_ms": self.max,
+                "buckets": dict(zip(labels, self.counts)),
+            }
+
+
+class PoolInstrumentation:
+    """Record connection pool behavior for an engine.
+
+    Prefer :func:`instrument_pool` to constructing this directly.
+    """
+
+    # The arguments given to :func:`instrument_pool`, to detect conflicting reconfiguration.
+    _kwargs: Dict = {}
+
+    def __init__(
+        self,
+        engine,
+        *,
+        increment: Optional[Callable] = None,
+        gauge: Optional[Callable] = None,
+        histogram: Optional[Callable] = None,
+        tags: Optional[List[str]] = None,
+        prefix: str = "sqlalchemy.pool",
+        long_held_threshold: Optional[float] = None,
+        on_long_held: Optional[Callable[[float, List[str]], None]] = None,
+        stack_limit: int = 20,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        # Weakly referenced, as the instrumentation is the value of a weak-keyed mapping
+        # upon the engine, which would otherwise never be collected.
+        self._engine = weakref.ref(engine)
+        self.increment = increment
+        self.gauge = gauge
+        self.histogram = histogram
+        self.tags = tags
+        self.prefix = prefix
+        self.long_held_threshold = long_held_threshold
+        self.on_long_held = on_long_held
+        self.stack_limit = stack_limit
+
+        self.checkout_wait = Histogram(buckets)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.long_held_count = 0
+
+        self._held: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+
+        sqlalchemy.event.listen(engine, "checkout", self._on_checkout)
+        sqlalchemy.event.listen(engine, "checkin", self._on_checkin)
+        sqlalchemy.event.listen(engine, "engine_disposed", self._on_disposed)
+        self._wrap_pool(engine.pool)
+
+    @property
+    def engine(self):
+        return self._engine()
+
+    def _wrap_pool(self, pool):
+        """Time how long each checkout waits on the pool, and track pool occupancy.
+
+        SQLAlchemy offers no event before a checkout begins, nor after a connection has been
+        returned to the pool, so the pool's internal `_do_get`/`_do_return_conn` are wrapped
+        instead.
+        """
+        do_get = pool._do_get
+        do_return_conn = pool._do_return_conn
+
+        def _do_get():
+            start = time.perf_counter()
+            try:
+                return do_get()
+            except sqlalchemy.exc.TimeoutError:
+                with self._lock:
+                    self.checkout_timeouts += 1
+                self._increment("checkout_timeout")
+                raise
+            finally:
+                wait_ms = (time.perf_counter() - start) * 1000
+                self.checkout_wait.observe(wait_ms)
+                if self.histogram:
+                    self.histogram(f"{self.prefix}.checkout_wait", wait_ms, tags=self.tags)
+                self._emit_gauges()
+
+        def _do_return_conn(record):
+            do_return_conn(record)
+            self._emit_gauges()
+
+        pool._do_get = _do_get
+        pool._do_return_conn = _do_return_conn
+
+    def _on_disposed(self, engine):
+        # Disposal replaces the pool, which must be re-instrumented.
+        self._held.clear()
+        self._wrap_pool(engine.pool)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+
+        stack = None
+        if self.long_held_threshold is not None:
+            stack = traceback.format_stack(limit=self.stack_limit)[:-1]
+        self._held[id(connection_record)] = (time.perf_counter(), stack)
+
+        self._increment("checkout")
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        held = self._held.pop(id(connection_record), None)
+        if held is not None and self.long_held_threshold is not None:
+            start, stack = held
+            duration = time.perf_counter() - start
+            if duration >= self.long_held_threshold:
+                self._report_long_held(duration, stack)
+
+    def _report_long_held(self, duration, stack):
+        with self._lock:
+            self.long_held_count += 1
+        self._increment("long_held")
+
+        if self.on_long_held:
+            self.on_long_held(duration, stack)
+        else:
+            log.warning("Connection held for %.3fs, checked out at:\n%s", duration, "".join(stack))
+
+    def _increment(self, name):
+        if self.increment:
+            self.increment(f"{self.prefix}.{name}", tags=self.tags)
+
+    def _emit_gauges(self):
+        if not self.gauge:
+            return
+
+        for name, value in self.pool_state().items():
+            if value is not None:
+                self.gauge(f"{self.prefix}.{name}", value, tags=self.tags)
+
+    def pool_state(self) -> Dict[str, Optional[int]]:
+        """Return the in-use/idle/overflow counts of the pool, where the pool tracks them."""
+        pool = self.engine.pool
+        return {
+            "in_use": _call(pool, "checkedout"),
+            "idle": _call(pool, "checkedin"),
+            "overflow": _call(pool, "overflow"),
+            "size": _call(pool, "size"),
+        }
+
+    def long_held(self) -> List[Dict]:
+        """Describe currently checked out connections held for longer than the threshold."""
+        if self.long_held_threshold is None:
+            return []
+
+        now = time.perf_counter()
+        return [
+            {"duration": now - start, "stack": stack}
+            for start, stack in list(self._held.values())
+            if now - start >= self.long_held_threshold
+        ]
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "long_held": self.long_held_count,
+            }
+        return {**counts, "checkout_wait": self.checkout_wait.snapshot(), **self.pool_state()}
+
+
+def instrument_pool(engine, **kwargs) -> PoolInstrumentation:
+    """Instrument the connection pool of an `engine`.
+
+    Instrumenting an already instrumented engine returns the existing instrumentation, warning
+    if it was instrumented with different arguments (which are not applied).
+
+    Args:
+        engine: The engine whose pool should be instrumented.
+        increment: Optional callable `(metric, tags=None)`, i.e. :func:`strapp.datadog.increment`.
+        gauge: Optional callable `(metric, value, tags=None)`, i.e. :func:`strapp.datadog.gauge`.
+        histogram: Optional callable `(metric, value, tags=None)`, i.e.
+            :func:`strapp.datadog.histogram`. Receives checkout wait times in milliseconds.
+        tags: Optional tags to attach to every emitted metric.
+        prefix: The prefix of every emitted metric name.
+        long_held_threshold: When set, connections checked in after being held for at least
+            this many seconds are reported, along with the stack which checked them out.
+        on_long_held: Optional callable `(duration, stack)`, called for long-held connections.
+            Defaults to logging a warning.
+        stack_limit: The maximum number of stack frames to capture per checkout.
+        buckets: The checkout wait histogram bucket upper bounds, in milliseconds.
+
+    Examples:
+        >>> from strapp import datadog
+        >>> engine = sqlalchemy.create_engine("sqlite://")
+        >>> instrumentation = instrument_pool(
+        ...     engine,
+        ...     increment=datadog.increment,
+        ...     gauge=datadog.gauge,
+        ...     histogram=datadog.histogram,
+        ...     long_held_threshold=30,
+        ... )
+        >>> with engine.connect():
+        ...     pass
+        >>> instrumentation.snapshot()["checkouts"]
+        1
+    """
+    instrumentation = _instrumentations.get(engine)
+    if instrumentation is None:
+        instrumentation = _instrumentations[engine] = PoolInstrumentation(engine, **kwargs)
+        instrumentation._kwargs = kwargs
+    elif kwargs != instrumentation._kwargs:
+        _warn_already_configured(engine, "pool instrumentation")
+    return instrumentation
+
+
+def get_pool_instrumentation(engine) -> Optional[PoolInstrumentation]:
+    """Return the :class:`PoolInstrumentation` of an `engine`, if it has been instrumented."""
+    return _instrumentations.get(engine)
+
+
+def _warn_already_configured(engine, what):
+    warnings.warn(
+        f"{engine!r} already has a {what}, with different arguments which are ignored",
+        stacklevel=3,
+    )
+
+
+def _call(pool, method):
+    fn = getattr(pool, method, None)
+    if not callable(fn):
+        return None
+    return fn()
@@ -0,0 +1,317 @@
+import contextvars
+import functools
+import logging
+import re
+import sys
+import threading
+import time
+import warnings
+import weakref
+from typing import Callable, Dict, List, Optional, Union
+
+import sqlalchemy
+
+log = logging.getLogger(__name__)
+
+_instrumentations: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+_current_unit: "contextvars.ContextVar[Optional[UnitOfWork]]" = contextvars.ContextVar(
+    "strapp_unit_of_work", default=None
+)
+
+# Modules whose frames are skipped when determining the call site of a statement.
+_internal_modules = ("sqlalchemy.", "strapp.sqlalchemy.", "contextlib")
+
+
+class RepeatedStatementWarning(UserWarning):
+    """A near-identical statement was executed too many times within one unit of work."""
+
+
+class RepeatedStatementError(Exception):
+    """Near-identical statements were executed too many times within one unit of work."""
+
+
+class UnitOfWork:
+    """Count the statements executed by instrumented engines within a logical unit of work.
+
+    Prefer :func:`unit_of_work` to constructing this directly.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.statements = 0
+        self.counts: Dict[str, int] = {}
+        self.violations: List[str] = []
+
+        self._instrumentations: List["StatementInstrumentation"] = []
+        self._token: Optional[contextvars.Token] = None
+
+    def __enter__(self):
+        self._token = _current_unit.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if self._token is not None:
+            _current_unit.reset(self._token)
+            self._token = None
+
+        for instrumentation in self._instrumentations:
+            instrumentation._finish_unit(self)
+
+        # Don't obscure an exception which is already being raised.
+        if self.violations and exc_type is None:
+            raise RepeatedStatementError("\n".join(self.violations))
+
+    def _record(self, instrumentation, statement):
+        if instrumentation not in self._instrumentations:
+            self._instrumentations.append(instrumentation)
+
+        self.statements += 1
+
+        key = _normalize(statement)
+        count = self.counts[key] = self.counts.get(key, 0) + 1
+
+        limit = instrumentation.repeat_limit
+        if limit is not None and count == limit + 1:
+            instrumentation._report_repeated(self, key, count)
+
+
+def unit_of_work(name: str) -> UnitOfWork:
+    """Count the statements executed within the block (i.e. a request, message or command).
+
+    Statement counts and repeated statements are only recorded for instrumented engines (see
+    :func:`instrument_statements`). Units of work are tracked per thread/task.
+
+    Examples:
+        >>> engine = sqlalchemy.create_engine("sqlite://")
+        >>> _ = instrument_statements(engine)
+        >>> with unit_of_work("example") as unit, engine.connect() as conn:
+        ...     for i in range(3):
+        ...         _ = conn.execute(sqlalchemy.text(f"select {i}"))
+        >>> unit.statements
+        3
+        >>> unit.counts
+        {'select ?': 3}
+    """
+    return UnitOfWork(name)
+
+
+def current_unit_of_work() -> Optional[UnitOfWork]:
+    """Return the innermost active :class:`UnitOfWork`, if any."""
+    return _current_unit.get()
+
+
+class StatementInstrumentation:
+    """Record the statements executed by an engine.
+
+    Prefer :func:`instrument_statements` to constructing this directly.
+    """
+
+    # The arguments given to :func:`instrument_statements`, to detect conflicting reconfiguration.
+    _kwargs: Dict = {}
+
+    def __init__(
+        self,
+        engine,
+        *,
+        slow_threshold: Optional[float] = None,
+        log_parameters: bool = True,
+        max_parameters_length: int = 1000,
+        repeat_limit: Optional[int] = None,
+        on_repeat: Union[str, Callable] = "warn",
+        increment: Optional[Callable] = None,
+        histogram: Optional[Callable] = None,
+        tags: Optional[List[str]] = None,
+        prefix: str = "sqlalchemy.statement",
+    ):
+        if not callable(on_repeat) and on_repeat not in ("warn", "raise"):
+            raise ValueError(f"on_repeat must be 'warn', 'raise' or a callable, not {on_repeat!r}")
+
+        # Weakly referenced, as the instrumentation is the value of a weak-keyed mapping
+        # upon the engine, which would otherwise never be collected.
+        self._engine = weakref.ref(engine)
+        self.slow_threshold = slow_threshold
+        self.log_parameters = log_parameters
+        self.max_parameters_length = max_parameters_length
+        self.repeat_limit = repeat_limit
+        self.on_repeat = on_repeat
+        self.increment = increment
+        self.histogram = histogram
+        self.tags = tags
+        self.prefix = prefix
+
+        self.statements = 0
+        self.slow_statements = 0
+        self.repeated_statements = 0
+        self._lock = threading.Lock()
+
+        sqlalchemy.event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        sqlalchemy.event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        sqlalchemy.event.listen(engine, "handle_error", self._handle_error)
+
+    @property
+    def engine(self):
+        return self._engine()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("strapp_statement_start", []).append((time.perf_counter(), context))
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start, _ = conn.info["strapp_statement_start"].pop()
+        duration = time.perf_counter() - start
+        with self._lock:
+            self.statements += 1
+
+        if self.histogram:
+            self.histogram(f"{self.prefix}.duration", duration * 1000, tags=self.tags)
+
+        if self.slow_threshold is not None and duration >= self.slow_threshold:
+            self._report_slow(statement, parameters, duration)
+
+        unit = _current_unit.get()
+        if unit is not None:
+            unit._record(self, statement)
+
+    def _handle_error(self, exception_context):
+        # A failed statement never reaches `after_cursor_execute`. Errors may also occur before
+        # `before_cursor_execute`, hence matching upon the execution context.
+        conn = exception_context.connection
+        starts = conn.info.get("strapp_statement_start") if conn is not None else None
+        if starts and starts[-1][1] is exception_context.execution_context:
+            starts.pop()
+
+    def _report_slow(self, statement, parameters, duration):
+        with self._lock:
+            self.slow_statements += 1
+        self._increment("slow")
+
+        suffix = ""
+        if self.log_parameters:
+            suffix = f"\nparameters: {_truncate(repr(parameters), self.max_parameters_length)}"
+
+        log.warning(
+            "Slow statement (%.1fms) at %s:\n%s%s", duration * 1000, _call_site(), statement, suffix
+        )
+
+    def _report_repeated(self, unit: UnitOfWork, statement: str, count: int):
+        with self._lock:
+            self.repeated_statements += 1
+        self._increment("repeated")
+
+        call_site = _call_site()
+        if callable(self.on_repeat):
+            self.on_repeat(unit, statement, count, call_site)
+            return
+
+        message = (
+            f"Statement executed more than {self.repeat_limit} times within {unit.name!r} "
+            f"(a likely N+1 query), at {call_site}:\n{statement}"
+        )
+        if self.on_repeat == "raise":
+            unit.violations.append(message)
+        else:
+            warnings.warn(message, RepeatedStatementWarning)
+
+    def _finish_unit(self, unit: UnitOfWork):
+        if self.histogram:
+            tags = [*(self.tags or []), f"unit:{unit.name}"]
+            self.histogram(f"{self.prefix}.per_unit", unit.statements, tags=tags)
+
+    def _increment(self, name):
+        if self.increment:
+            self.increment(f"{self.prefix}.{name}", tags=self.tags)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "statements": self.statements,
+                "slow_statements": self.slow_statements,
+                "repeated_statements": self.repeated_statements,
+            }
+
+
+def instrument_statements(engine, **kwargs) -> StatementInstrumentation:
+    """Instrument the statements executed by an `engine`.
+
+    Instrumenting an already instrumented engine returns the existing instrumentation, warning
+    if it was instrumented with different arguments (which are not applied).
+
+    Args:
+        engine: The engine whose statements should be instrumented.
+        slow_threshold: When set, statements taking at least this many seconds are logged (as
+            warnings), along with their parameters and call site.
+        log_parameters: Whether to include the parameters of slow statements.
+        max_parameters_length: The maximum number of characters of parameters to log.
+        repeat_limit: When set, a normalized statement (see below) being executed more than
+            this many times within one :func:`unit_of_work` is reported, as a likely N+1 query.
+        on_repeat: How to report repeated statements. "warn" issues a
+            :class:`RepeatedStatementWarning` (which can be escalated to an error in tests, i.e.
+            through pytest's `filterwarnings`), "raise" raises a :class:`RepeatedStatementError`
+            upon exiting the unit of work. Alternatively, a callable
+            `(unit, statement, count, call_site)`.
+        increment: Optional callable `(metric, tags=None)`, i.e. :func:`strapp.datadog.increment`.
+        histogram: Optional callable `(metric, value, tags=None)`, i.e.
+            :func:`strapp.datadog.histogram`. Receives statement durations in milliseconds, and
+            the number of statements per unit of work.
+        tags: Optional tags to attach to every emitted metric.
+        prefix: The prefix of every emitted metric name.
+
+    Statements are normalized by replacing literals with placeholders and collapsing
+    placeholder lists (i.e. :code:`IN (?, ?, ?)`), such that statements which differ only by
+    their values are considered the same.
+
+    Examples:
+        >>> engine = sqlalchemy.create_engine("sqlite://")
+        >>> _ = instrument_statements(engine, repeat_limit=2, on_repeat="raise")
+        >>> with unit_of_work("example"), engine.connect() as conn:
+        ...     for i in range(3):
+        ...         _ = conn.execute(sqlalchemy.text(f"select {i}"))
+        Traceback (most recent call last):
+        ...
+        strapp.sqlalchemy.profiling.RepeatedStatementError: Statement executed more than 2 times...
+    """
+    instrumentation = _instrumentations.get(engine)
+    if instrumentation is None:
+        instrumentation = _instrumentations[engine] = StatementInstrumentation(engine, **kwargs)
+        instrumentation._kwargs = kwargs
+    elif kwargs != instrumentation._kwargs:
+        warnings.warn(
+            f"{engine!r} already has a statement instrumentation, with different arguments "
+            "which are ignored",
+            stacklevel=2,
+        )
+    return instrumentation
+
+
+def get_statement_instrumentation(engine) -> Optional[StatementInstrumentation]:
+    """Return the :class:`StatementInstrumentation` of an `engine`, if it has been instrumented."""
+    return _instrumentations.get(engine)
+
+
+_literal = re.compile(r"'(?:[^']|'')*'|(?<![$\w])\d+(?:\.\d+)?\b")
+_placeholder = r"(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)"
+_placeholder_list = re.compile(rf"\(\s*{_placeholder}(?:\s*,\s*{_placeholder})*\s*\)")
+_whitespace = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=1024)
+def _normalize(statement: str) -> str:
+    statement = _whitespace.sub(" ", statement.strip())
+    statement = _literal.sub("?", statement)
+    return _placeholder_list.sub("(?)", statement)
+
+
+def _call_site() -> str:
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if not module.startswith(_internal_modules):
+            return f"{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back  # type: ignore
+    return "<unknown>"
+
+
+def _truncate(value: str, length: int) -> str:
+    if len(value) <= length:
+        return value
+    return value[:length] + "..."
@@ -0,0 +1,151 @@
+import contextlib
+import itertools
+import time
+from typing import cast, Dict, Mapping, Optional, Sequence, Type
+
+import sqlalchemy.orm
+from sqlalchemy.sql import Select
+
+from strapp.sqlalchemy.engine import create_engine, default_registry, EngineRegistry
+from strapp.sqlalchemy.pool import instrument_pool
+
+
+class RoutingSession(sqlalchemy.orm.Session):
+    """Route writes to a primary engine and pure reads to replica engines.
+
+    Reads go to the primary rather than a replica when:
+
+    * The statement is anything other than a plain :code:`SELECT` (i.e. DML, :code:`SELECT ...
+      FOR UPDATE`, or textual SQL, whose intent cannot be known).
+    * The session has flushed during the current transaction (the replicas cannot observe
+      uncommitted changes).
+    * Within `sticky_seconds` of the session's last commit ("read your writes").
+    * Inside a :meth:`using_primary` block.
+
+    Replicas are selected round-robin.
+
+    The `sticky_seconds` window belongs to the session instance, so it does not outlive the
+    session: once a scoped session is `remove`-d (i.e. at the end of a request), the next
+    session reads from the replicas immediately. Use :meth:`using_primary` where reads must
+    observe writes made by an earlier session.
+
+    Prefer :func:`create_routing_session_cls` to constructing this directly.
+    """
+
+    def __init__(self, *, primary, replicas: Sequence = (), sticky_seconds: float = 0, **kwargs):
+        super().__init__(**kwargs)
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.sticky_seconds = sticky_seconds
+
+        self._counter = itertools.count()
+        self._force_primary = 0
+        self._wrote = False
+        self._sticky_until = 0.0
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._use_replica(clause):
+            index = next(self._counter) % len(self.replicas)
+            return self.replicas[index]
+        return self.primary
+
+    def _use_replica(self, clause) -> bool:
+        if not self.replicas or self._force_primary or self._wrote:
+            return False
+
+        # Both private attributes are absent from the sqlalchemy 1.4 stubs.
+        if getattr(self, "_flushing", False):
+            return False
+
+        if not isinstance(clause, Select) or getattr(clause, "_for_update_arg", None) is not None:
+            return False
+
+        return time.monotonic() >= self._sticky_until
+
+    @contextlib.contextmanager
+    def using_primary(self):
+        """Route all statements within the block to the primary.
+
+        Examples:
+            >>> Session = create_routing_session_cls({"drivername": "sqlite"})
+            >>> session = Session()
+            >>> with session.using_primary():
+            ...     session.execute(sqlalchemy.text("select 1")).scalar()
+            1
+        """
+        self._force_primary += 1
+        try:
+            yield self
+        finally:
+            self._force_primary -= 1
+
+
+@sqlalchemy.event.listens_for(RoutingSession, "after_flush")
+def _after_flush(session, flush_context):
+    session._wrote = True
+
+
+@sqlalchemy.event.listens_for(RoutingSession, "after_commit")
+def _after_commit(session):
+    if session._wrote and session.sticky_seconds:
+        session._sticky_until = time.monotonic() + session.sticky_seconds
+    session._wrote = False
+
+
+@sqlalchemy.event.listens_for(RoutingSession, "after_rollback")
+def _after_rollback(session):
+    session._wrote = False
+
+
+def create_routing_session_cls(
+    primary: Mapping,
+    replicas: Sequence[Mapping] = (),
+    *,
+    scopefunc=None,
+    engine_kwargs: Optional[Dict] = None,
+    registry: Optional[EngineRegistry] = default_registry,
+    pool_metrics: Optional[Mapping] = None,
+    sticky_seconds: float = 5,
+):
+    """Create a scoped session class whose sessions are :class:`RoutingSession`.
+
+    Args:
+        primary: The dict-like set of options to :class:`sqlalchemy.engine.url.URL`, for the
+            primary database.
+        replicas: Any number of dict-like sets of options for replica databases. With no replicas,
+            all statements go to the primary.
+        scopefunc: The optional `scopefunc` arg to :class:`sqlalchemy.orm.scoping.scoped_session`
+        engine_kwargs: Optional kwargs to pass through to the :func:`sqlalchemy.create_engine` call
+        registry: See :func:`strapp.sqlalchemy.create_session_cls`.
+        pool_metrics: See :func:`strapp.sqlalchemy.create_session_cls`.
+        sticky_seconds: After a session commits a write, its reads go to the primary for this
+            many seconds, so that they observe the write regardless of replication lag. This
+            only applies to the same session, see :class:`RoutingSession`.
+
+    Examples:
+        >>> Session = create_routing_session_cls(
+        ...     {"drivername": "sqlite", "database": "primary.db"},
+        ...     [{"drivername": "sqlite", "database": "replica.db"}],
+        ... )
+    """
+    primary_engine = create_engine(primary, engine_kwargs=engine_kwargs, registry=registry)
+    replica_engines = [
+        create_engine(replica, engine_kwargs=engine_kwargs, registry=registry)
+        for replica in replicas
+    ]
+
+    if pool_metrics is not None:
+        for engine in [primary_engine, *replica_engines]:
+            instrument_pool(engine, **pool_metrics)
+
+    return sqlalchemy.orm.scoping.scoped_session(
+        sqlalchemy.orm.session.sessionmaker(
+            # `get_bind` accepts the stubs' extra (private) arguments as `**kwargs`, which does
+            # not satisfy their session protocol.
+            class_=cast(Type[sqlalchemy.orm.session.Session], RoutingSession),
+            primary=primary_engine,
+            replicas=replica_engines,
+            sticky_seconds=sticky_seconds,
+        ),
+        scopefunc=scopefunc,
+    )
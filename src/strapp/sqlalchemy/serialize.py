@@ -0,0 +1,184 @@
+import operator
+import weakref
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import sqlalchemy
+
+Plan = Tuple[Tuple[str, Callable[[Any], Any], bool], ...]
+
+# The cached serialization plans of each model class, see `_plan`.
+_plans: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def to_dict(
+    instance, *, include: Optional[Iterable[str]] = None, exclude: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
+    """Produce a dict of the column values of a model `instance`, keyed by attribute name.
+
+    The columns (and whether they are deferred) of each model class are looked up once, and
+    cached per (class, `include`, `exclude`) combination. Loaded values are read directly from
+    the instance's `__dict__`. Deferred columns which have not been loaded are omitted (rather
+    than emitting a query per instance), unless they are explicitly named in `include`.
+
+    Args:
+        instance: A mapped instance.
+        include: If supplied, only these attributes are serialized, in column order.
+        exclude: If supplied, these attributes are omitted.
+
+    Raises:
+        ValueError: If `include` or `exclude` names an attribute which is not a column.
+
+    Examples:
+        >>> from strapp.sqlalchemy import declarative_base
+        >>> Base = declarative_base()
+        >>> class Foo(Base):
+        ...     __tablename__ = 'foo'
+        ...     id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+        ...     name = sqlalchemy.Column(sqlalchemy.types.Unicode())
+
+        >>> to_dict(Foo(id=1, name="foo"))
+        {'id': 1, 'name': 'foo'}
+        >>> Foo(id=1, name="foo").to_dict(exclude={"name"})
+        {'id': 1}
+    """
+    plan = _plan(instance.__class__, _frozen(include), _frozen(exclude))
+    return _serialize(instance, plan)
+
+
+def to_dicts(
+    instances: Iterable,
+    *,
+    include: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None,
+) -> List[Dict[str, Any]]:
+    """Produce the :func:`to_dict` of each of `instances`, in a single pass.
+
+    The plan of each class is looked up once for a run of instances of that class, rather than
+    per instance, so serializing (i.e.) the result of a query for a list endpoint costs little
+    more than reading each loaded value. The result is suitable for returning from a
+    :func:`strapp.flask.json_response` view.
+
+    Examples:
+        >>> from strapp.sqlalchemy import declarative_base
+        >>> Base = declarative_base()
+        >>> class Foo(Base):
+        ...     __tablename__ = 'foo'
+        ...     id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+        ...     name = sqlalchemy.Column(sqlalchemy.types.Unicode())
+
+        >>> Foo.to_dicts([Foo(id=1, name="a"), Foo(id=2, name="b")], include=["id"])
+        [{'id': 1}, {'id': 2}]
+    """
+    include_ = _frozen(include)
+    exclude_ = _frozen(exclude)
+
+    result = []
+    cls = None
+    plan: Plan = ()
+    classes = set()
+    for instance in instances:
+        if instance.__class__ is not cls:
+            cls = instance.__class__
+            classes.add(cls)
+            plan = _plan(cls, include_, exclude_, strict=False)
+        result.append(_serialize(instance, plan))
+
+    # Of a mix of classes, each name need only be a column of one of them.
+    if classes and (include_ or exclude_):
+        attrs = set().union(*(_columns(cls) for cls in classes))
+        _validate(" or ".join(sorted(cls.__name__ for cls in classes)), attrs, include_, exclude_)
+    return result
+
+
+class Serializable:
+    """Serialization methods, available on models built with :func:`declarative_base`."""
+
+    def to_dict(
+        self,
+        *,
+        include: Optional[Iterable[str]] = None,
+        exclude: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Any]:
+        """See :func:`strapp.sqlalchemy.serialize.to_dict`."""
+        return to_dict(self, include=include, exclude=exclude)
+
+    @classmethod
+    def to_dicts(
+        cls,
+        instances: Iterable,
+        *,
+        include: Optional[Iterable[str]] = None,
+        exclude: Optional[Iterable[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """See :func:`strapp.sqlalchemy.serialize.to_dicts`."""
+        return to_dicts(instances, include=include, exclude=exclude)
+
+
+def _serialize(instance, plan: Plan) -> Dict[str, Any]:
+    loaded = instance.__dict__
+    result = {}
+    for attr, getter, deferred in plan:
+        if attr in loaded:
+            result[attr] = loaded[attr]
+        elif not deferred:
+            # Expired (i.e. after a commit) attributes are refreshed, as with plain access.
+            result[attr] = getter(instance)
+    return result
+
+
+def _plan(
+    cls,
+    include: Optional[FrozenSet[str]],
+    exclude: Optional[FrozenSet[str]],
+    strict: bool = True,
+) -> Plan:
+    """Produce the (attr, getter, deferred) triples of a model's serialization.
+
+    Plans are cached per (class, `include`, `exclude`), such that serializing many instances
+    inspects the class once.
+    """
+    plans = _plans.get(cls)
+    if plans is None:
+        plans = _plans[cls] = {}
+
+    key = (include, exclude, strict)
+    plan = plans.get(key)
+    if plan is None:
+        plan = plans[key] = _build_plan(cls, include, exclude, strict)
+    return plan
+
+
+def _build_plan(
+    cls, include: Optional[FrozenSet[str]], exclude: Optional[FrozenSet[str]], strict: bool
+) -> Plan:
+    state = sqlalchemy.inspect(cls)
+    attrs = state.columns.keys()
+
+    if strict:
+        _validate(cls.__name__, set(attrs), include, exclude)
+
+    return tuple(
+        (
+            attr,
+            operator.attrgetter(attr),
+            bool(state.attrs[attr].deferred) and (include is None or attr not in include),
+        )
+        for attr in attrs
+        if (include is None or attr in include) and (exclude is None or attr not in exclude)
+    )
+
+
+def _columns(cls) -> List[str]:
+    return sqlalchemy.inspect(cls).columns.keys()
+
+
+def _validate(name: str, attrs, include, exclude):
+    unknown = ((include or frozenset()) | (exclude or frozenset())) - attrs
+    if unknown:
+        raise ValueError(f"{name} has no columns named {sorted(unknown)}")
+
+
+def _frozen(attrs: Optional[Iterable[str]]) -> Optional[FrozenSet[str]]:
+    if attrs is None:
+        return None
+    return frozenset(attrs)
@@ -3,21 +3,73 @@ from typing import Dict, Mapping, Optional
 
 import sqlalchemy.orm
 
+from strapp.sqlalchemy.cache import QueryCache
+from strapp.sqlalchemy.engine import create_engine, default_registry, EngineRegistry
+from strapp.sqlalchemy.health import configure_pool_health
+from strapp.sqlalchemy.pool import instrument_pool
+from strapp.sqlalchemy.profiling import instrument_statements
+from strapp.sqlalchemy.soft_delete import install_soft_delete
+
 log = logging.getLogger(__name__)
 
 
-def create_session_cls(config: Mapping, *, scopefunc=None, engine_kwargs: Optional[Dict] = None):
-    url_cls = sqlalchemy.engine.url.URL
-    if hasattr(url_cls, "create"):
-        url_cls = url_cls.create  # type: ignore
+def create_session_cls(
+    config: Mapping,
+    *,
+    scopefunc=None,
+    engine_kwargs: Optional[Dict] = None,
+    registry: Optional[EngineRegistry] = default_registry,
+    pool_metrics: Optional[Mapping] = None,
+    query_cache: Optional[QueryCache] = None,
+    statement_metrics: Optional[Mapping] = None,
+    soft_delete: bool = False,
+    pool_pre_ping: bool = False,
+    pool_health: Optional[Mapping] = None,
+):
+    """Create a :class:`sqlalchemy.orm.scoping.scoped_session` class.
 
-    url = url_cls(**dict(config))
-    engine = sqlalchemy.create_engine(url, **(engine_kwargs or {}))
+    Args:
+        config: The dict-like set of options to :class:`sqlalchemy.engine.url.URL`
+        scopefunc: The optional `scopefunc` arg to :class:`sqlalchemy.orm.scoping.scoped_session`
+        engine_kwargs: Optional kwargs to pass through to the :func:`sqlalchemy.create_engine` call
+        registry: The :class:`strapp.sqlalchemy.engine.EngineRegistry` from which to obtain
+            the engine. Defaults to a process-wide registry, so that repeated calls with the same
+            `config` and `engine_kwargs` share one connection pool. Supply :code:`None` to
+            always create a new engine.
+        pool_metrics: Optional kwargs to :func:`strapp.sqlalchemy.pool.instrument_pool`. When
+            supplied, the engine's connection pool is instrumented.
+        query_cache: An optional :class:`strapp.sqlalchemy.cache.QueryCache`, which caches the
+            results of queries marked with :func:`strapp.sqlalchemy.cache.cached` across sessions.
+        statement_metrics: Optional kwargs to
+            :func:`strapp.sqlalchemy.profiling.instrument_statements`. When supplied, the engine's
+            statements are instrumented (slow statement logging, and N+1 detection).
+        soft_delete: If True, soft-deleted rows (of `deleted_at` models) are excluded from ORM
+            queries, see :func:`strapp.sqlalchemy.soft_delete.install_soft_delete`.
+        pool_pre_ping: If True, each connection is tested (with a round trip) upon checkout,
+            and transparently replaced if dead. Equivalent to the `pool_pre_ping` engine kwarg.
+        pool_health: Optional kwargs to :func:`strapp.sqlalchemy.health.configure_pool_health`,
+            i.e. to pre-fill the pool at startup (`warm_up`), recycle connections with jitter,
+            or check idle connections in the background.
+    """
+    if pool_pre_ping:
+        engine_kwargs = {**(engine_kwargs or {}), "pool_pre_ping": True}
 
-    return sqlalchemy.orm.scoping.scoped_session(
-        sqlalchemy.orm.session.sessionmaker(bind=engine),
-        scopefunc=scopefunc,
-    )
+    engine = create_engine(config, engine_kwargs=engine_kwargs, registry=registry)
+    if pool_metrics is not None:
+        instrument_pool(engine, **pool_metrics)
+    if statement_metrics is not None:
+        instrument_statements(engine, **statement_metrics)
+    if pool_health is not None:
+        configure_pool_health(engine, **pool_health)
+
+    session_factory = sqlalchemy.orm.session.sessionmaker(bind=engine)
+    if soft_delete:
+        # Installed first, so that the query cache keys upon the filtered statement.
+        install_soft_delete(session_factory)
+    if query_cache is not None:
+        query_cache.install(session_factory)
+
+    return sqlalchemy.orm.scoping.scoped_session(session_factory, scopefunc=scopefunc)
 
 
 def create_session(
@@ -26,9 +78,10 @@ def create_session(
     scopefunc=None,
     dry_run: bool = False,
     verbosity: int = 0,
-    engine_kwargs: Optional[Dict] = None
+    engine_kwargs: Optional[Dict] = None,
+    savepoint: bool = False,
 ):
-    """Create a sqlalchemy session.
+    """Create a sqlalchemy session, with an engine (and connection pool) of its own.
 
     Args:
         config: The dict-like set of options to :class:`sqlalchemy.engine.url.URL`
@@ -37,12 +90,16 @@ def create_session(
         verbosity: Only applies to `dry_run` sessions, but when > 0 will log the state of the
             session on would-be commit operations
         engine_kwargs: Optional kwargs to pass through to the :func:`sqlalchemy.create_engine` call
+        savepoint: Only applies to `dry_run` sessions, see :class:`DryRunSession`.
     """
-    Session = create_session_cls(config, scopefunc=scopefunc, engine_kwargs=engine_kwargs)
+    # Unlike `create_session_cls`, each session gets an engine of its own, as it always has.
+    Session = create_session_cls(
+        config, scopefunc=scopefunc, engine_kwargs=engine_kwargs, registry=None
+    )
     session = Session()
 
     if dry_run:
-        session = DryRunSession(session, verbosity=verbosity)
+        session = DryRunSession(session, verbosity=verbosity, savepoint=savepoint)
 
     return session
 
@@ -59,10 +116,37 @@ def log_session_state(session):
 
 
 class DryRunSession:
-    def __init__(self, session, verbosity=0, log_at_verbosity=1):
+    """Wrap a session such that none of its changes are ever committed.
+
+    By default, `commit` only flushes. With `savepoint=True`, the whole session instead runs
+    inside one outer transaction: each `commit` flushes and releases a SAVEPOINT, and `rollback`
+    rolls back to the most recent one, mirroring the semantics of a real session.
+
+    Either way, everything is rolled back when the session is closed, or its context is
+    exited.
+
+    Examples:
+        >>> session = create_session({"drivername": "sqlite"}, dry_run=True, savepoint=True)
+        >>> _ = session.execute(sqlalchemy.text("create table foo (id integer)"))
+        >>> session.commit()
+        >>> _ = session.execute(sqlalchemy.text("insert into foo values (1)"))
+        >>> session.rollback()
+        >>> session.execute(sqlalchemy.text("select count(*) from foo")).scalar()
+        0
+        >>> session.close()
+    """
+
+    def __init__(self, session, verbosity=0, log_at_verbosity=1, savepoint=False):
         self.session = session
         self.verbosity = verbosity
         self.log_at_verbosity = log_at_verbosity
+        self.savepoint = savepoint
+
+        self._nested = None
+        self._closed = False
+
+        if savepoint:
+            self._begin_nested()
 
     def commit(self):
         if self.verbosity >= self.log_at_verbosity:
@@ -70,8 +154,59 @@ class DryRunSession:
 
         self.session.flush()
 
-    def __del__(self):
+        if self.savepoint:
+            self._nested.commit()
+            self._begin_nested()
+
+    def rollback(self):
+        if self.savepoint:
+            self._nested.rollback()
+            self._begin_nested()
+        else:
+            self.session.rollback()
+
+    def close(self):
+        """Roll back everything performed through the session, and close it."""
+        if self._closed:
+            return
+
+        self._closed = True
         self.session.rollback()
+        self.session.close()
+
+    def _begin_nested(self):
+        _begin(self.session.connection())
+        self._nested = self.session.begin_nested()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __del__(self):
+        # A fallback for sessions which are never closed, though its timing is not guaranteed.
+        try:
+            self.close()
+        except Exception:  # pragma: nocover
+            pass
 
     def __getattr__(self, attr):
         return getattr(self.session, attr)
+
+
+def _begin(connection):
+    """Ensure a sqlite connection is inside a transaction, ahead of its first SAVEPOINT.
+
+    The sqlite3 module only implicitly begins transactions ahead of DML, otherwise leaving the
+    SAVEPOINT as the outermost transaction, which its RELEASE would commit.
+    """
+    if connection.dialect.driver not in ("pysqlite", "aiosqlite"):
+        return
+
+    # aiosqlite's adapted connection wraps the (aiosqlite) connection which tracks transactions.
+    dbapi_connection = connection.connection.dbapi_connection
+    dbapi_connection = getattr(dbapi_connection, "_connection", dbapi_connection)
+
+    if not dbapi_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN")
@@ -0,0 +1,62 @@
+import sqlalchemy.orm
+
+from strapp.sqlalchemy.model_base import DeletedAt
+
+INCLUDE_DELETED_OPTION = "include_deleted"
+
+
+def install_soft_delete(session_factory):
+    """Exclude soft-deleted rows from the ORM queries of a :class:`sqlalchemy.orm.sessionmaker`.
+
+    Every model declared with `deleted_at=True` is filtered to :code:`deleted_at IS NULL`,
+    wherever it appears in a query (including joins, aliases and relationship loads). Queries
+    marked with :func:`include_deleted` are left unfiltered.
+
+    Objects already present in the session's identity map (i.e. through :meth:`Session.get`)
+    are returned as-is, and refreshing an object which has since been soft-deleted still works.
+
+    Examples:
+        >>> from datetime import datetime
+        >>> from strapp.sqlalchemy import create_session_cls, declarative_base
+        >>> Base = declarative_base()
+        >>> class Foo(Base, deleted_at=True):
+        ...     __tablename__ = 'foo'
+        ...     id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+        >>> Session = create_session_cls({"drivername": "sqlite"}, soft_delete=True)
+        >>> session = Session()
+        >>> Base.metadata.create_all(bind=session.connection())
+        >>> session.add_all([Foo(id=1), Foo(id=2, deleted_at=datetime.utcnow())])
+
+        >>> session.query(Foo).all()
+        [Foo(id=1, deleted_at=None)]
+        >>> include_deleted(session.query(Foo)).count()
+        2
+    """
+    sqlalchemy.event.listen(session_factory, "do_orm_execute", _exclude_deleted)
+
+
+def include_deleted(query):
+    """Mark a :class:`sqlalchemy.orm.Query` or :func:`sqlalchemy.select` to include deleted rows.
+
+    Equivalent to the :code:`include_deleted=True` execution option.
+    """
+    return query.execution_options(**{INCLUDE_DELETED_OPTION: True})
+
+
+def _exclude_deleted(execute_state):
+    # Relationship and column loads are skipped, because the criteria of the statement which
+    # produced their objects propagate to them.
+    if (
+        not execute_state.is_select
+        or execute_state.is_column_load
+        or execute_state.is_relationship_load
+        or execute_state.execution_options.get(INCLUDE_DELETED_OPTION, False)
+    ):
+        return
+
+    execute_state.statement = execute_state.statement.options(
+        sqlalchemy.orm.with_loader_criteria(
+            DeletedAt, lambda cls: cls.deleted_at.is_(None), include_aliases=True
+        )
+    )
@@ -0,0 +1,162 @@
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import sqlalchemy
+
+
+class QueryStream:
+    """Iterate over a query in keyset-paginated chunks.
+
+    Prefer :func:`stream` to constructing this directly.
+    """
+
+    def __init__(
+        self,
+        query,
+        *,
+        key: Optional[Sequence] = None,
+        chunk_size: int = 1000,
+        cursor: Optional[Tuple] = None,
+        expunge: bool = True,
+        yield_per: Optional[int] = None,
+    ):
+        self.query = query
+        self.key = list(key) if key is not None else _primary_key(query)
+        self.chunk_size = chunk_size
+        self.yield_per = yield_per or min(chunk_size, 1000)
+        self.cursor = cursor
+        self.expunge = expunge
+
+    def __iter__(self) -> Iterator:
+        """Yield the results one row at a time.
+
+        Each page is streamed from the database cursor `yield_per` rows at a time, and rows are
+        expunged as soon as the next row is requested.
+        """
+        session = self.query.session
+        while True:
+            count = 0
+            for row in self._page().yield_per(self.yield_per):
+                count += 1
+                self.cursor = self._key_of(row)
+                yield row
+
+                if self.expunge:
+                    _expunge(session, row)
+
+            if count < self.chunk_size:
+                return
+
+    def chunks(self) -> Iterator[List]:
+        """Yield the results, `chunk_size` rows at a time.
+
+        :attr:`cursor` holds the key of the last row of the most recently yielded chunk.
+        """
+        session = self.query.session
+        while True:
+            chunk = self._page().yield_per(self.yield_per).all()
+            if not chunk:
+                return
+
+            self.cursor = self._key_of(chunk[-1])
+            yield chunk
+
+            if self.expunge:
+                for row in chunk:
+                    _expunge(session, row)
+
+            if len(chunk) < self.chunk_size:
+                return
+
+    def _page(self):
+        query = self.query.order_by(None).order_by(*self.key)
+        if self.cursor is not None:
+            query = query.filter(_after(self.key, self.cursor))
+        return query.limit(self.chunk_size)
+
+    def _key_of(self, row) -> Tuple:
+        if isinstance(row, sqlalchemy.engine.Row):
+            return tuple(row._mapping[column] for column in self.key)
+        return tuple(getattr(row, column.key) for column in self.key)
+
+
+def stream(
+    query,
+    *,
+    key: Optional[Sequence] = None,
+    chunk_size: int = 1000,
+    cursor: Optional[Tuple] = None,
+    expunge: bool = True,
+    yield_per: Optional[int] = None,
+) -> QueryStream:
+    """Stream the results of a (potentially very large) ORM query, using keyset pagination.
+
+    Rather than :code:`OFFSET` (whose cost grows with each page) or loading the whole result,
+    each chunk is fetched with :code:`WHERE key > <last key> ORDER BY key LIMIT chunk_size`,
+    which is a cheap index range scan for an indexed `key`.
+
+    Args:
+        query: The :class:`sqlalchemy.orm.Query` to stream. Any existing ordering is replaced.
+        key: The columns to paginate by, which must uniquely identify a row, i.e.
+            :code:`[Model.created_at, Model.id]`. Defaults to the primary key of the query's
+            first entity.
+        chunk_size: The number of rows fetched per query (i.e. per page).
+        cursor: The key of the last row processed by a previous stream (see
+            :attr:`QueryStream.cursor`), in order to resume after it.
+        expunge: When :code:`True`, the ORM objects of each chunk are expunged from the session
+            once they have been processed (i.e. the next row or chunk is requested), keeping the
+            identity map (and memory) small. Changes made to processed objects must be flushed
+            before moving on.
+        yield_per: The number of rows buffered from the database cursor at a time, within each
+            page. Defaults to `chunk_size`, up to 1000.
+
+    Examples:
+        >>> from strapp.sqlalchemy import create_session, declarative_base
+        >>> Base = declarative_base()
+        >>> class Foo(Base):
+        ...     __tablename__ = 'foo'
+        ...     id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+        >>> session = create_session({"drivername": "sqlite"})
+        >>> Base.metadata.create_all(bind=session.connection())
+        >>> Foo.bulk_insert(session, [{"id": i} for i in range(1, 6)])
+        5
+
+        >>> rows = stream(session.query(Foo), chunk_size=2)
+        >>> [foo.id for foo in rows]
+        [1, 2, 3, 4, 5]
+
+        Streams can be resumed from the `cursor` of an earlier stream.
+
+        >>> rows = stream(session.query(Foo), chunk_size=2)
+        >>> next(rows.chunks())
+        [Foo(id=1), Foo(id=2)]
+        >>> rows.cursor
+        (2,)
+        >>> [foo.id for foo in stream(session.query(Foo), cursor=rows.cursor)]
+        [3, 4, 5]
+    """
+    return QueryStream(
+        query,
+        key=key,
+        chunk_size=chunk_size,
+        cursor=cursor,
+        expunge=expunge,
+        yield_per=yield_per,
+    )
+
+
+def _primary_key(query) -> List:
+    entity = query.column_descriptions[0]["entity"]
+    mapper = sqlalchemy.inspect(entity)
+    return [mapper.get_property_by_column(column).class_attribute for column in mapper.primary_key]
+
+
+def _expunge(session, row):
+    if not isinstance(row, sqlalchemy.engine.Row) and row in session:
+        session.expunge(row)
+
+
+def _after(key, cursor):
+    if len(key) == 1:
+        return key[0] > cursor[0]
+    return sqlalchemy.tuple_(*key) > sqlalchemy.tuple_(*cursor)
@@ -0,0 +1,193 @@
+import contextlib
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Callable, Dict, Hashable, Mapping, Optional
+
+import sqlalchemy.orm
+
+from strapp.sqlalchemy.engine import create_engine, EngineRegistry
+
+# The tenant of the current context, see :func:`tenant`.
+current_tenant: ContextVar[Optional[Hashable]] = ContextVar("strapp_tenant", default=None)
+
+
+class NoTenantError(LookupError):
+    """Raised upon creating a tenant session outside of the context of any tenant."""
+
+
+@contextlib.contextmanager
+def tenant(key: Hashable):
+    """Set the tenant of the current context (thread, or asyncio task) for the block.
+
+    Examples:
+        >>> with tenant("foo"):
+        ...     current_tenant.get()
+        'foo'
+        >>> current_tenant.get() is None
+        True
+    """
+    token = current_tenant.set(key)
+    try:
+        yield key
+    finally:
+        current_tenant.reset(token)
+
+
+class TenantRouter:
+    """Produce sessions bound to the database (and schema) of the current tenant.
+
+    Prefer :func:`create_tenant_session_cls` to constructing this directly.
+    """
+
+    def __init__(
+        self,
+        config: Mapping,
+        *,
+        schema: Optional[Callable[[Hashable], Optional[str]]] = None,
+        database: Optional[Callable[[Hashable], Optional[Mapping]]] = None,
+        max_tenants: int = 128,
+        engine_kwargs: Optional[Dict] = None,
+        registry: Optional[EngineRegistry] = None,
+    ):
+        self.config = config
+        self.schema = schema
+        self.database = database
+        self.max_tenants = max_tenants
+        self.engine_kwargs = engine_kwargs
+        self.registry = registry if registry is not None else EngineRegistry()
+
+        self._sessionmakers: OrderedDict = OrderedDict()
+        # The engines the router created for tenant-specific databases, and their configs.
+        self._owned: Dict[sqlalchemy.engine.Engine, Mapping] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, **kwargs) -> sqlalchemy.orm.Session:
+        """Create a session for the current tenant."""
+        key = current_tenant.get()
+        if key is None:
+            raise NoTenantError("No tenant is set, see `strapp.sqlalchemy.tenancy.tenant`")
+        return self.sessionmaker(key)(**kwargs)
+
+    def sessionmaker(self, key: Hashable) -> sqlalchemy.orm.sessionmaker:
+        """Return the (cached) sessionmaker of the tenant `key`.
+
+        The least recently used tenants are evicted beyond `max_tenants`. The engine of a
+        tenant-specific database is disposed once no cached tenant uses it, provided the router
+        created it. Engines of the default `config`, or which were already registered (i.e. in
+        use by other sessions of a shared `registry`), are never disposed.
+
+        Engines are created (and disposed) under the router's lock, such that a database's
+        engine is never disposed while a concurrently created tenant is being bound to it.
+        """
+        with self._lock:
+            entry = self._sessionmakers.get(key)
+            if entry is not None:
+                self._sessionmakers.move_to_end(key)
+                return entry[0]
+
+            config = self.database(key) if self.database else None
+            if config == self.config:
+                config = None
+
+            registered = set(self.registry.engines())
+            engine = create_engine(
+                config or self.config, engine_kwargs=self.engine_kwargs, registry=self.registry
+            )
+            if config and engine not in registered:
+                self._owned[engine] = config
+
+            # Option engines share the pool of the engine they derive from, so tenants in
+            # different schemas of the same database share one pool.
+            schema = self.schema(key) if self.schema else None
+            bind = engine
+            if schema is not None:
+                bind = engine.execution_options(schema_translate_map={None: schema})
+
+            session_factory = sqlalchemy.orm.sessionmaker(bind=bind)
+            self._sessionmakers[key] = (session_factory, engine)
+
+            evicted = []
+            while len(self._sessionmakers) > self.max_tenants:
+                _, (_, evicted_engine) = self._sessionmakers.popitem(last=False)
+                evicted.append(evicted_engine)
+
+            in_use = {engine for _, engine in self._sessionmakers.values()}
+            for evicted_engine in evicted:
+                if evicted_engine in self._owned and evicted_engine not in in_use:
+                    owned_config = self._owned.pop(evicted_engine)
+                    self.registry.dispose(owned_config, engine_kwargs=self.engine_kwargs)
+
+        return session_factory
+
+    def tenants(self):
+        """Return the keys of the cached tenants, from least to most recently used."""
+        with self._lock:
+            return list(self._sessionmakers)
+
+    def dispose(self):
+        """Evict every tenant, and dispose of the engines of the router's registry."""
+        with self._lock:
+            self._sessionmakers.clear()
+            self._owned.clear()
+        self.registry.dispose()
+
+
+def create_tenant_session_cls(
+    config: Mapping,
+    *,
+    schema: Optional[Callable[[Hashable], Optional[str]]] = None,
+    database: Optional[Callable[[Hashable], Optional[Mapping]]] = None,
+    max_tenants: int = 128,
+    scopefunc=None,
+    engine_kwargs: Optional[Dict] = None,
+    registry: Optional[EngineRegistry] = None,
+):
+    """Create a scoped session class, whose sessions belong to the current :func:`tenant`.
+
+    Rather than an engine (and pool) per tenant, each physical database has one engine,
+    shared by every tenant within it. Tenants are mapped to their schema with a
+    :code:`schema_translate_map` (of tables without an explicit schema), and the sessionmaker
+    of each tenant is cached (up to `max_tenants`, evicting the least recently used).
+
+    Sessions are scoped per tenant (as well as per thread, or `scopefunc`), so switching tenant
+    produces a different session. As usual, `remove` the session at the end of each request.
+
+    Args:
+        config: The dict-like set of options to :class:`sqlalchemy.engine.url.URL`, of the
+            database of tenants without a `database` of their own.
+        schema: Optional callable producing the schema of a tenant key.
+        database: Optional callable producing the config of a tenant's database, or
+            :code:`None` to use `config`.
+        max_tenants: The maximum number of tenants whose sessionmakers are cached.
+        scopefunc: The optional `scopefunc` arg to :class:`sqlalchemy.orm.scoping.scoped_session`
+        engine_kwargs: Optional kwargs to pass through to the :func:`sqlalchemy.create_engine` call
+        registry: The :class:`strapp.sqlalchemy.engine.EngineRegistry` from which to obtain
+            engines. Defaults to a registry private to the session class, such that evicted
+            tenant databases can be disposed.
+
+    Examples:
+        >>> Session = create_tenant_session_cls(
+        ...     {"drivername": "sqlite"}, schema=lambda tenant: f"tenant_{tenant}"
+        ... )
+        >>> with tenant("foo"):
+        ...     session = Session()
+        ...     session.get_bind().get_execution_options()["schema_translate_map"]
+        {None: 'tenant_foo'}
+    """
+    router = TenantRouter(
+        config,
+        schema=schema,
+        database=database,
+        max_tenants=max_tenants,
+        engine_kwargs=engine_kwargs,
+        registry=registry,
+    )
+
+    if scopefunc is None:
+        scopefunc = threading.get_ident
+
+    def _scopefunc():
+        return (current_tenant.get(), scopefunc())
+
+    return sqlalchemy.orm.scoping.scoped_session(router, scopefunc=_scopefunc)
@@ -1,7 +1,21 @@
 import functools
-from collections import namedtuple
+import itertools
+import weakref
+from collections import Counter, namedtuple
+from typing import Optional, Union
 
 import sqlalchemy
+import sqlalchemy.orm
+
+from strapp.sqlalchemy.session import DryRunSession
+
+# The metadata whose tables have been created, per engine, by `create_savepoint_fixture`.
+_created_metadata: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+# The cached comparison plans of each model class, see `_comparison_plan`.
+_comparison_plans: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+_missing = object()
 
 
 def assert_equals(instance, other, include=None, exclude=None):
@@ -29,26 +43,163 @@ def assert_equals_factory(include=None, exclude=None):
     return _assert_equals
 
 
+def assert_rows_equal(
+    rows, expected, *, ordered=False, include=None, exclude=None, max_diffs: int = 10
+):
+    """Assert that a collection of model instances matches the `expected` rows.
+
+    Each instance is collected as in :func:`assert_equals` (the `expected` rows may be
+    instances, or comparable tuples of their columns in alphabetical order), using a comparison
+    plan cached per model class. Unordered comparisons match rows as a multiset, rather than
+    pairwise.
+
+    Upon failure, only the mismatching rows are reported: by index, when `ordered`; otherwise as
+    the unexpected and missing rows. Unexpected and missing rows which share a primary key are
+    reported as the columns which differ.
+
+    Args:
+        rows: The actual model instances, i.e. the result of a query.
+        expected: The expected instances or tuples.
+        ordered: Whether the rows must additionally be in the same order.
+        include: The set of columns to include
+        exclude: The set of columns to exclude
+        max_diffs: The maximum number of mismatching rows to report.
+
+    Examples:
+        >>> from strapp.sqlalchemy import declarative_base
+        >>> Base = declarative_base()
+        >>> class Foo(Base):
+        ...     __tablename__ = 'foo'
+        ...     id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+        ...     name = sqlalchemy.Column(sqlalchemy.types.Unicode())
+
+        >>> rows = [Foo(id=1, name="a"), Foo(id=2, name="b")]
+        >>> assert_rows_equal(rows, [(2, "b"), (1, "a")])
+        >>> assert_rows_equal(rows, [(1, "a"), (2, "c"), (3, "d")])
+        Traceback (most recent call last):
+        ...
+        AssertionError: 2 mismatches between the 2 rows and the 3 expected rows:
+          Foo(id=2): name='b' != 'c'
+          missing: (3, 'd')
+    """
+    actual = _collect_rows(rows, include=include, exclude=exclude)
+    others = _collect_rows(expected, include=include, exclude=exclude)
+
+    if ordered:
+        diffs = _ordered_diffs(actual, others)
+    else:
+        diffs = _unordered_diffs(actual, others)
+
+    if not diffs:
+        return
+
+    lines = [f"  {diff}" for diff in diffs[:max_diffs]]
+    if len(diffs) > max_diffs:
+        lines.append(f"  ... and {len(diffs) - max_diffs} more")
+
+    mismatches = f"{len(diffs)} mismatch" + ("es" if len(diffs) != 1 else "")
+    raise AssertionError(
+        f"{mismatches} between the {len(actual)} rows and the {len(others)} expected "
+        "rows:\n" + "\n".join(lines)
+    )
+
+
+def create_savepoint_fixture(
+    bind: Union[str, sqlalchemy.engine.Engine],
+    *,
+    metadata: Optional[sqlalchemy.MetaData] = None,
+    scope: str = "function",
+    verbosity: int = 0,
+):
+    """Create a pytest fixture producing a session whose changes are rolled back after each test.
+
+    Rather than recreating the database (or its tables) per test, the tables of `metadata` are
+    created once per engine, and each test runs inside a single outer transaction, which is
+    rolled back at the end of the test. The session is a savepoint-backed
+    :class:`strapp.sqlalchemy.session.DryRunSession`, so code under test may freely `commit`
+    and `rollback`.
+
+    Args:
+        bind: The engine, or the name of a fixture producing an engine (ideally session-scoped),
+            to connect to.
+        metadata: Optional metadata whose tables are created (once per engine) before use.
+        scope: The pytest scope of the fixture.
+        verbosity: See :class:`strapp.sqlalchemy.session.DryRunSession`.
+
+    Examples:
+        >>> import pytest
+        >>> from strapp.sqlalchemy import declarative_base
+        >>> Base = declarative_base()
+
+        >>> @pytest.fixture(scope="session")
+        ... def engine():
+        ...     return sqlalchemy.create_engine("sqlite:///test.db")
+
+        >>> db = create_savepoint_fixture("engine", metadata=Base.metadata)
+    """
+    import pytest
+
+    @pytest.fixture(scope=scope)  # type: ignore
+    def _fixture(request):
+        engine = request.getfixturevalue(bind) if isinstance(bind, str) else bind
+
+        if metadata is not None:
+            created = _created_metadata.setdefault(engine, set())
+            if id(metadata) not in created:
+                metadata.create_all(bind=engine)
+                created.add(id(metadata))
+
+        session = sqlalchemy.orm.Session(bind=engine)
+        with DryRunSession(session, verbosity=verbosity, savepoint=True) as dry_run_session:
+            yield dry_run_session
+
+    return _fixture
+
+
 def _collect_loaded_values(instance, include=None, exclude=None):
     """Collect a sqlalchemy model into a comparable object."""
-    cls = instance.__class__
-    class_name = cls.__name__
-    state = sqlalchemy.inspect(cls)
-
-    columns = _collect_columns(state.columns.keys(), include=include, exclude=exclude)
-    result_cls = namedtuple(class_name, columns)
+    result_cls, attrs = _comparison_plan(instance.__class__, include, exclude)
+    loaded = instance.__dict__
 
     result = []
-    for column in columns:
-        if state.attrs[column].deferred:
+    for attr, deferred in attrs:
+        if deferred:
             result.append(None)
+        elif attr in loaded:
+            result.append(loaded[attr])
         else:
-            value = getattr(instance, column)
-            result.append(value)
+            result.append(getattr(instance, attr))
 
     return result_cls(*result)
 
 
+def _comparison_plan(cls, include=None, exclude=None):
+    """Produce the comparison namedtuple class, and (attr, deferred) pairs, of a model.
+
+    Plans are cached per (class, `include`, `exclude`), such that comparing many instances
+    inspects the class (and creates its namedtuple) once.
+    """
+    plans = _comparison_plans.get(cls)
+    if plans is None:
+        plans = _comparison_plans[cls] = {}
+
+    key = (frozenset(include or ()), frozenset(exclude or ()))
+    plan = plans.get(key)
+    if plan is None:
+        state = sqlalchemy.inspect(cls)
+        columns = _collect_columns(state.columns.keys(), include=include, exclude=exclude)
+
+        result_cls = namedtuple(cls.__name__, columns)
+        primary_key = {state.get_property_by_column(column).key for column in state.primary_key}
+        result_cls._key_indexes = tuple(
+            index for index, column in enumerate(columns) if column in primary_key
+        )
+
+        attrs = tuple((column, bool(state.attrs[column].deferred)) for column in columns)
+        plan = plans[key] = (result_cls, attrs)
+    return plan
+
+
 def _collect_columns(columns, include=None, exclude=None):
     columns = set(columns)
 
@@ -67,3 +218,104 @@ def _collect_columns(columns, include=None, exclude=None):
         columns = columns - exclude
 
     return sorted(list(columns))
+
+
+def _collect_rows(rows, include=None, exclude=None):
+    result = []
+    for row in rows:
+        if not isinstance(row, tuple):
+            row = _collect_loaded_values(row, include=include, exclude=exclude)
+        result.append(row)
+    return result
+
+
+def _ordered_diffs(actual, expected):
+    diffs = []
+    for index, (row, other) in enumerate(
+        itertools.zip_longest(actual, expected, fillvalue=_missing)
+    ):
+        if row is _missing:
+            diffs.append(f"[{index}] missing: {other!r}")
+        elif other is _missing:
+            diffs.append(f"[{index}] unexpected: {row!r}")
+        elif row != other:
+            diffs.append(f"[{index}] {_describe_diff(row, other)}")
+    return diffs
+
+
+def _unordered_diffs(actual, expected):
+    try:
+        remaining = Counter(expected)
+        unexpected = []
+        for row in actual:
+            if remaining[row]:
+                remaining[row] -= 1
+            else:
+                unexpected.append(row)
+        missing = list(remaining.elements())
+    except TypeError:
+        # Unhashable values (i.e. JSON columns) fall back to a quadratic match.
+        missing = list(expected)
+        unexpected = []
+        for row in actual:
+            try:
+                missing.remove(row)
+            except ValueError:
+                unexpected.append(row)
+
+    pairs, missing = _pair_by_primary_key(unexpected, missing)
+
+    diffs = []
+    for row, other in pairs:
+        if other is _missing:
+            diffs.append(f"unexpected: {row!r}")
+        else:
+            diffs.append(_describe_diff(row, other))
+
+    diffs.extend(f"missing: {other!r}" for other in missing)
+    return diffs
+
+
+def _pair_by_primary_key(unexpected, missing):
+    """Pair each unexpected row with a missing row with the same primary key, if any.
+
+    Returns the (row, missing row or `_missing`) pairs, and the missing rows left unpaired.
+    """
+    pairs = []
+    paired = set()
+    candidates = {}
+    for row in unexpected:
+        indexes = getattr(type(row), "_key_indexes", ())
+        if indexes not in candidates:
+            candidates[indexes] = by_key = {}
+            for other in missing if indexes else ():
+                if len(other) == len(row):
+                    by_key.setdefault(tuple(other[i] for i in indexes), []).append(other)
+
+        matches = candidates[indexes].get(tuple(row[i] for i in indexes))
+        if matches:
+            other = matches.pop(0)
+            paired.add(id(other))
+            pairs.append((row, other))
+        else:
+            pairs.append((row, _missing))
+
+    return pairs, [other for other in missing if id(other) not in paired]
+
+
+def _describe_diff(row, other):
+    fields = getattr(row, "_fields", None)
+    if fields is None or len(row) != len(other):
+        return f"{row!r} != {other!r}"
+
+    name = type(row).__name__
+    indexes = getattr(type(row), "_key_indexes", ())
+    if indexes:
+        name += "({})".format(", ".join(f"{fields[i]}={row[i]!r}" for i in indexes))
+
+    columns = ", ".join(
+        f"{field}={value!r} != {other_value!r}"
+        for field, value, other_value in zip(fields, row, other)
+        if value != other_value
+    )
+    return f"{name}: {columns}"
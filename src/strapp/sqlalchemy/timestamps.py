@@ -0,0 +1,139 @@
+from typing import List, Optional
+
+import sqlalchemy
+
+# The `Table.info` key marking tables whose `updated_at` is maintained by a trigger.
+TRIGGER_INFO_KEY = "strapp_updated_at_trigger"
+
+# The (postgresql) trigger function shared by every table.
+TRIGGER_FUNCTION = "strapp_set_updated_at"
+
+SUPPORTED_DIALECTS = ("postgresql", "sqlite")
+
+
+def server_updated_at_column() -> sqlalchemy.Column:
+    """Produce an `updated_at` column which is maintained by the database, upon UPDATE.
+
+    Unlike a Python-side `onupdate`, every UPDATE (including Core and :meth:`Query.update`
+    bulk updates) sets the column, and ORM updates bind no extra parameter. Values assigned
+    explicitly are kept.
+
+    The trigger which maintains the column is created alongside the table (i.e. by
+    `create_all`) on postgresql and sqlite. See :mod:`strapp.sqlalchemy.alembic` for
+    migrations.
+
+    Prefer the :code:`updated_at="server"` model option to using this directly.
+    """
+    column = sqlalchemy.Column(
+        "updated_at",
+        sqlalchemy.types.DateTime(timezone=True),
+        server_onupdate=sqlalchemy.FetchedValue(),
+        nullable=True,
+    )
+    sqlalchemy.event.listen(column, "after_parent_attach", _attach_trigger)
+    return column
+
+
+def _attach_trigger(column, table):
+    if table.info.get(TRIGGER_INFO_KEY):
+        return
+
+    table.info[TRIGGER_INFO_KEY] = True
+
+    for dialect in SUPPORTED_DIALECTS:
+        for statement in create_trigger_ddl(dialect, table.name, schema=table.schema):
+            # `DDL` statements are %-formatted.
+            ddl = sqlalchemy.DDL(statement.replace("%", "%%")).execute_if(dialect=dialect)
+            sqlalchemy.event.listen(table, "after_create", ddl)
+
+
+def trigger_name(table_name: str) -> str:
+    return f"{table_name}_set_updated_at"
+
+
+def create_trigger_ddl(dialect: str, table_name: str, *, schema: Optional[str] = None) -> List[str]:
+    """Produce the statements which create the `updated_at` trigger of a table.
+
+    Examples:
+        >>> for statement in create_trigger_ddl("sqlite", "foo"):
+        ...     print(statement)
+        CREATE TRIGGER foo_set_updated_at AFTER UPDATE ON foo FOR EACH ROW
+        WHEN NEW.updated_at IS OLD.updated_at
+        BEGIN
+            UPDATE foo SET updated_at = strftime('%Y-%m-%d %H:%M:%f000', 'now')
+            WHERE rowid = NEW.rowid;
+        END
+    """
+    name = trigger_name(table_name)
+    table = _qualified(table_name, schema)
+
+    if dialect == "postgresql":
+        return [
+            f"""CREATE OR REPLACE FUNCTION {TRIGGER_FUNCTION}() RETURNS trigger AS $$
+BEGIN
+    IF NEW.updated_at IS NOT DISTINCT FROM OLD.updated_at THEN
+        NEW.updated_at = now();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql""",
+            f"CREATE TRIGGER {name} BEFORE UPDATE ON {table} FOR EACH ROW "
+            f"EXECUTE PROCEDURE {TRIGGER_FUNCTION}()",
+        ]
+
+    if dialect == "sqlite":
+        # Recursive triggers are disabled by default, so the trigger's own UPDATE does not
+        # re-trigger it. The timestamp is padded to the microseconds sqlalchemy expects.
+        return [
+            f"""CREATE TRIGGER {name} AFTER UPDATE ON {table} FOR EACH ROW
+WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE {table} SET updated_at = strftime('%Y-%m-%d %H:%M:%f000', 'now')
+    WHERE rowid = NEW.rowid;
+END"""
+        ]
+
+    raise NotImplementedError(f"Database-maintained updated_at is not supported for {dialect}")
+
+
+def drop_trigger_ddl(dialect: str, table_name: str, *, schema: Optional[str] = None) -> List[str]:
+    """Produce the statements which drop the `updated_at` trigger of a table.
+
+    The shared postgresql trigger function is left in place, as other tables may use it.
+    """
+    name = trigger_name(table_name)
+
+    if dialect == "postgresql":
+        return [f"DROP TRIGGER IF EXISTS {name} ON {_qualified(table_name, schema)}"]
+
+    if dialect == "sqlite":
+        return [f"DROP TRIGGER IF EXISTS {name}"]
+
+    raise NotImplementedError(f"Database-maintained updated_at is not supported for {dialect}")
+
+
+def has_trigger(connection, table_name: str, *, schema: Optional[str] = None) -> bool:
+    """Check whether a table's `updated_at` trigger exists in the database."""
+    dialect = connection.dialect.name
+    name = trigger_name(table_name)
+
+    if dialect == "postgresql":
+        query = sqlalchemy.text(
+            "SELECT 1 FROM information_schema.triggers "
+            "WHERE trigger_name = :name AND event_object_table = :table "
+            "AND event_object_schema = coalesce(:schema, current_schema())"
+        ).bindparams(name=name, table=table_name, schema=schema)
+    elif dialect == "sqlite":
+        query = sqlalchemy.text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = :name"
+        ).bindparams(name=name)
+    else:
+        raise NotImplementedError(f"Database-maintained updated_at is not supported for {dialect}")
+
+    return connection.execute(query).first() is not None
+
+
+def _qualified(table_name: str, schema: Optional[str]) -> str:
+    if schema is None:
+        return table_name
+    return f"{schema}.{table_name}"
@@ -4,6 +4,7 @@ import sentry_sdk
 
 from strapp.click import Resolver
 from strapp.click.testing import ClickRunner
+from strapp.sqlalchemy.profiling import current_unit_of_work
 
 
 def test_resolve():
@@ -223,3 +224,19 @@ def test_double_submission_command():
     result = ClickRunner(group).invoke("foo", "--a", "woah")
 
     result.assert_successful()
+
+
+def test_command_unit_of_work():
+    resolver = Resolver()
+
+    @resolver.group()
+    def foo():
+        pass
+
+    @resolver.command(foo)
+    def command():
+        click.echo(current_unit_of_work().name)
+
+    result = ClickRunner(foo).invoke("command")
+    result.assert_successful()
+    assert result.output == "command\n"
@@ -0,0 +1,77 @@
+import logging
+
+import pytest
+import sqlalchemy
+from dramatiq.brokers.stub import StubBroker
+from dramatiq.middleware import Retries, TimeLimit
+from dramatiq.results import Results
+from dramatiq.results.backends import StubBackend
+from dramatiq.worker import Worker
+
+from strapp.dramatiq.base import enqueue, PreparedActor
+from strapp.dramatiq.sqlalchemy import UnitOfWorkMiddleware
+from strapp.sqlalchemy.profiling import current_unit_of_work, instrument_statements
+
+
+@pytest.fixture()
+def broker():
+    broker = StubBroker(
+        [Results(backend=StubBackend()), TimeLimit(), Retries(), UnitOfWorkMiddleware()]
+    )
+    yield broker
+    broker.flush_all()
+    broker.close()
+
+
+@pytest.fixture()
+def worker(broker):
+    worker = Worker(broker, worker_timeout=100, worker_threads=1)
+    worker.start()
+    yield worker
+    worker.stop()
+
+
+def test_message_unit_of_work(worker, broker):
+    engine = sqlalchemy.create_engine("sqlite://")
+    instrumentation = instrument_statements(engine, repeat_limit=2, on_repeat=lambda *args: None)
+    units = []
+
+    def do_work():
+        unit = current_unit_of_work()
+        units.append(unit)
+
+        with engine.connect() as conn:
+            for i in range(3):
+                conn.execute(sqlalchemy.text(f"select {i}"))
+
+    PreparedActor(do_work, actor_name="foo").register(broker)
+    enqueue("foo", broker=broker)
+
+    broker.join("default")
+    worker.join()
+
+    [unit] = units
+    assert unit.name == "foo"
+    assert unit.counts == {"select ?": 3}
+    assert instrumentation.repeated_statements == 1
+
+
+def test_repeated_statements_logged(worker, broker, caplog):
+    caplog.set_level(logging.ERROR, logger="strapp")
+    engine = sqlalchemy.create_engine("sqlite://")
+    instrument_statements(engine, repeat_limit=2, on_repeat="raise")
+
+    def do_work():
+        with engine.connect() as conn:
+            for i in range(3):
+                conn.execute(sqlalchemy.text(f"select {i}"))
+
+    PreparedActor(do_work, actor_name="foo").register(broker)
+    enqueue("foo", broker=broker)
+
+    broker.join("default")
+    worker.join()
+
+    [record] = [r for r in caplog.records if r.name == "strapp.dramatiq.sqlalchemy"]
+    assert "Repeated statements" in record.message
+    assert "more than 2 times" in record.exc_text
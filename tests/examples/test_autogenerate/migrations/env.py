@@ -1,6 +1,7 @@
 from alembic import context
 from sqlalchemy import engine_from_config, pool
 
+import strapp.sqlalchemy.alembic  # noqa
 from models import Base
 
 config = context.config
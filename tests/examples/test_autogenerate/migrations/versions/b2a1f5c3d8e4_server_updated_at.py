@@ -0,0 +1,30 @@
+"""server updated_at
+
+Revision ID: b2a1f5c3d8e4
+Revises: 7969ce99fb31
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b2a1f5c3d8e4"
+down_revision = "7969ce99fb31"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "bar",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_updated_at_trigger("bar", schema=None)
+
+
+def downgrade():
+    op.drop_updated_at_trigger("bar", schema=None)
+    op.drop_table("bar")
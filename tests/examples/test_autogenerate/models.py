@@ -9,3 +9,9 @@ class Foo(Base, created_at=True, updated_at=True):
     __tablename__ = "asdf"
 
     id = Column(Integer, primary_key=True)
+
+
+class Bar(Base, updated_at="server"):
+    __tablename__ = "bar"
+
+    id = Column(Integer, primary_key=True)
@@ -1,6 +1,11 @@
+import contextlib
+
+import pytest
+
 from strapp.flask import (
     callback_factory,
     create_app,
+    identity,
     inject,
     inject_db,
     json_response,
@@ -8,6 +13,7 @@ from strapp.flask import (
     Route,
     sqlalchemy_database,
 )
+from strapp.sqlalchemy.profiling import current_unit_of_work
 
 config = {
     "drivername": "sqlite",
@@ -129,8 +135,90 @@ def test_inject_invalid():
     def view(db):
         pass
 
+    with pytest.raises(ValueError) as e:
+        create_app(routes=[Route.to("GET", "/foo", view)], validate_injections=True)
+    assert "db is not registered in flask's extensions" in str(e.value)
+
+    # Without the startup check, the missing extension still fails the request.
     app = create_app(routes=[Route.to("GET", "/foo", view)])
     with app.test_client() as client:
         response = client.get("/foo")
     assert response.status_code == 500
     assert response.json["error"] == "(ValueError) db is not registered in flask's extensions."
+
+
+def test_inject_db_invalid():
+    @inject_db(key="other")
+    def view(db):
+        pass
+
+    with pytest.raises(ValueError):
+        create_app(
+            routes=[Route.to("GET", "/foo", view)],
+            callbacks=[callback_factory(sqlalchemy_database, config, key="db")],
+            validate_injections=True,
+        )
+
+
+def test_inject_identity():
+    @json_response
+    @inject(db=identity(), other=identity())
+    def view(db, other, id):
+        return [db.execute("select 5").scalar(), other, id]
+
+    def register_other(app):
+        app.extensions["other"] = "other"
+
+    app = create_app(
+        routes=[Route.to("GET", "/foo/<int:id>", view)],
+        callbacks=[callback_factory(sqlalchemy_database, config, key="db"), register_other],
+    )
+    with app.test_client() as client:
+        response = client.get("/foo/4")
+    assert response.json == [5, "other", 4]
+
+
+def test_inject_multiple():
+    events = []
+
+    def manage(name):
+        @contextlib.contextmanager
+        def _manage(extension):
+            events.append(f"enter {name}")
+            yield f"{extension}!"
+            events.append(f"exit {name}")
+
+        return _manage
+
+    @json_response
+    @inject(foo=manage("foo"), bar=manage("bar"))
+    def view(foo, bar):
+        events.append("view")
+        return [foo, bar]
+
+    def register(app):
+        app.extensions.update(foo="foo", bar="bar")
+
+    app = create_app(routes=[Route.to("GET", "/foo", view)], callbacks=[register])
+    with app.test_client() as client:
+        response = client.get("/foo")
+    assert response.json == ["foo!", "bar!"]
+    assert events == ["enter foo", "enter bar", "view", "exit bar", "exit foo"]
+
+
+def test_request_unit_of_work():
+    @json_response
+    @inject_db
+    def view(db):
+        db.execute("select 5").scalar()
+        return current_unit_of_work().name
+
+    app = create_app(
+        routes=[Route.to("GET", "/foo", view)],
+        callbacks=[callback_factory(sqlalchemy_database, config, key="db")],
+    )
+    with app.test_client() as client:
+        response = client.get("/foo")
+
+    assert response.json == ".foo.get"
+    assert current_unit_of_work() is None
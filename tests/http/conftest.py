@@ -0,0 +1,160 @@
+import http.server
+import json
+import socket
+import threading
+import time
+
+import h2.config
+import h2.connection
+import h2.events
+import pytest
+
+
+class H2Server:
+    """A minimal plaintext (prior knowledge) HTTP/2 server.
+
+    Responses are held for `hold` seconds so that concurrently issued requests are
+    observably in flight at the same time.
+
+    * `/status/<code>` responds with the given status code.
+    * Anything else responds 200, echoing the path and stream id as json.
+    """
+
+    def __init__(self, hold=0.1):
+        self.hold = hold
+        self.connections = 0
+        self.requests = 0
+        self.max_open_streams = 0
+
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(("127.0.0.1", 0))
+        self._socket.listen()
+        self._socket.settimeout(0.05)
+        self._stopped = threading.Event()
+
+    @property
+    def url(self):
+        host, port = self._socket.getsockname()
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def stop(self):
+        self._stopped.set()
+        self._socket.close()
+
+    def _serve(self):
+        while not self._stopped.is_set():
+            try:
+                conn, _ = self._socket.accept()
+            except (socket.timeout, OSError):
+                continue
+
+            self.connections += 1
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        config = h2.config.H2Configuration(client_side=False)
+        h2_conn = h2.connection.H2Connection(config=config)
+        h2_conn.initiate_connection()
+        conn.sendall(h2_conn.data_to_send())
+        conn.settimeout(0.01)
+
+        paths = {}
+        pending = {}
+        while not self._stopped.is_set():
+            try:
+                data = conn.recv(65535)
+                if not data:
+                    break
+            except socket.timeout:
+                data = b""
+            except OSError:
+                break
+
+            for event in h2_conn.receive_data(data) if data else []:
+                if isinstance(event, h2.events.RequestReceived):
+                    headers = dict(event.headers)
+                    paths[event.stream_id] = headers[b":path"].decode()
+                elif isinstance(event, h2.events.DataReceived):
+                    h2_conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                elif isinstance(event, h2.events.StreamEnded):
+                    pending[event.stream_id] = time.monotonic()
+                    self.max_open_streams = max(self.max_open_streams, len(pending))
+
+            now = time.monotonic()
+            for stream_id, received in list(pending.items()):
+                if now - received < self.hold:
+                    continue
+
+                del pending[stream_id]
+                self.requests += 1
+                self._respond(h2_conn, stream_id, paths.pop(stream_id))
+
+            outbound = h2_conn.data_to_send()
+            if outbound:
+                conn.sendall(outbound)
+
+        conn.close()
+
+    def _respond(self, h2_conn, stream_id, path):
+        status = 200
+        if path.startswith("/status/"):
+            status = int(path.split("/")[-1])
+
+        body = json.dumps({"path": path, "stream_id": stream_id}).encode()
+        h2_conn.send_headers(
+            stream_id,
+            [
+                (":status", str(status)),
+                ("content-type", "application/json"),
+                ("content-length", str(len(body))),
+            ],
+        )
+        h2_conn.send_data(stream_id, body, end_stream=True)
+
+
+@pytest.fixture
+def h2_server():
+    server = H2Server()
+    server.start()
+    try:
+        yield server
+    finally:
+        server.stop()
+
+
+class _Http1Handler(http.server.BaseHTTPRequestHandler):
+    """Echo the path as json, except `/redirect/<path>` which redirects to `/<path>`."""
+
+    def do_GET(self):
+        if self.path.startswith("/redirect/"):
+            self.send_response(302)
+            self.send_header("Location", self.path.replace("/redirect", "", 1))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Http1Handler)
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,136 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from strapp.http.client import Http4XXError, Http5XXError, HttpClient
+from strapp.http.transport import Http2Transport, RequestsTransport
+
+
+def make_client(h2_server):
+    return HttpClient(h2_server.url, transport=Http2Transport(http1=False))
+
+
+def test_default_transport():
+    client = HttpClient("http://foo")
+    assert isinstance(client.transport, RequestsTransport)
+    assert isinstance(client.session, requests.Session)
+
+
+def test_http2_request(h2_server):
+    client = make_client(h2_server)
+
+    response = client.make_request("GET", "foo")
+
+    assert isinstance(response, requests.Response)
+    assert response.status_code == 200
+    assert response.json()["path"] == "/foo"
+    assert response.request.url == f"{h2_server.url}/foo"
+
+
+def test_http2_multiplexes_concurrent_requests(h2_server):
+    client = make_client(h2_server)
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        futures = [executor.submit(client.make_request, "GET", str(i)) for i in range(20)]
+        responses = [future.result() for future in futures]
+
+    assert [r.json()["path"] for r in responses] == [f"/{i}" for i in range(20)]
+    assert h2_server.connections == 1
+    assert h2_server.max_open_streams > 1
+
+
+def test_http2_4xx(h2_server):
+    client = make_client(h2_server)
+
+    with pytest.raises(Http4XXError) as e:
+        client.make_request("GET", "status/404", retries=4, backoff_base=0, backoff_factor=0)
+
+    assert e.value.response.status_code == 404
+    assert h2_server.requests == 1
+
+
+def test_http2_5xx(h2_server):
+    client = make_client(h2_server)
+
+    with pytest.raises(Http5XXError):
+        client.make_request("GET", "status/500", retries=3, backoff_base=0, backoff_factor=0)
+
+    assert h2_server.requests == 3
+
+
+def test_http2_connection_error():
+    client = HttpClient("http://127.0.0.1:1", transport=Http2Transport(http1=False))
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.make_request("GET", "foo", retries=2, backoff_base=0, backoff_factor=0)
+
+
+def test_http2_headers(h2_server):
+    def authenticator(client):
+        client.set_header("Authorization", "Bearer foo")
+
+    client = HttpClient(
+        h2_server.url, authenticator=authenticator, transport=Http2Transport(http1=False)
+    )
+    response = client.make_request("GET", "foo")
+
+    assert response.request.headers["Authorization"] == "Bearer foo"
+    client.close()
+
+
+def test_http2_timeout_tuple(h2_server):
+    client = make_client(h2_server)
+
+    response = client.make_request("GET", "foo", timeout=(1, 5))
+    assert response.status_code == 200
+
+    with pytest.raises(requests.exceptions.Timeout):
+        client.make_request(
+            "GET", "foo", timeout=(1, 0.01), retries=1, backoff_base=0, backoff_factor=0
+        )
+
+
+def test_http2_basic_auth(h2_server):
+    client = make_client(h2_server)
+
+    response = client.make_request("GET", "foo", auth=requests.auth.HTTPBasicAuth("foo", "bar"))
+    assert response.request.headers["Authorization"] == "Basic Zm9vOmJhcg=="
+
+
+def test_http2_custom_auth(h2_server):
+    class TokenAuth(requests.auth.AuthBase):
+        def __call__(self, request):
+            request.headers["X-Token"] = "foo"
+            return request
+
+    client = make_client(h2_server)
+
+    response = client.make_request("GET", "foo", auth=TokenAuth())
+    assert response.request.headers["X-Token"] == "foo"
+
+
+def test_http2_stream_unsupported(h2_server):
+    transport = Http2Transport(http1=False)
+
+    with pytest.raises(ValueError):
+        transport.request("GET", f"{h2_server.url}/foo", stream=True)
+
+
+def test_redirects_match(http_server):
+    results = []
+    for transport in [RequestsTransport(), Http2Transport()]:
+        client = HttpClient(http_server.url, transport=transport)
+        response = client.make_request("GET", "redirect/foo")
+        client.close()
+
+        history = [(r.status_code, r.url) for r in response.history]
+        results.append((response.status_code, response.url, response.json(), history))
+
+    assert results[0] == results[1]
+    assert results[0] == (
+        200,
+        f"{http_server.url}/foo",
+        {"path": "/foo"},
+        [(302, f"{http_server.url}/redirect/foo")],
+    )
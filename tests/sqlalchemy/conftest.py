@@ -1,3 +1,20 @@
+import pytest
 from pytest_mock_resources import create_sqlite_fixture
 
+from strapp.sqlalchemy.session import create_session
+
 db = create_sqlite_fixture(session=True)
+
+
+@pytest.fixture
+def sqlite():
+    """Produce a session of a plain, in-memory sqlite database.
+
+    For tests which depend upon sqlite's own behavior, as `db` is postgres-like (i.e. it has its
+    own dialect name, and returns timezone-aware datetimes).
+    """
+    session = create_session({"drivername": "sqlite"})
+    yield session
+
+    session.close()
+    session.get_bind().dispose()
@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+import sqlalchemy
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from strapp.sqlalchemy.async_session import (
+    AsyncDryRunSession,
+    create_async_session,
+    create_async_session_cls,
+)
+from strapp.sqlalchemy.model_base import declarative_base
+
+Base = declarative_base()
+
+
+class Foo(Base):
+    __tablename__ = "foo"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+
+@pytest.fixture
+def config(tmp_path):
+    path = tmp_path / "db.sqlite"
+
+    engine = sqlalchemy.create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+    return {"drivername": "sqlite+aiosqlite", "database": str(path)}
+
+
+def count(config):
+    engine = sqlalchemy.create_engine(f"sqlite:///{config['database']}")
+    try:
+        with engine.connect() as conn:
+            return conn.execute(sqlalchemy.text("select count(*) from foo")).scalar()
+    finally:
+        engine.dispose()
+
+
+def test_create_async_session_cls(config):
+    async def main():
+        Session = create_async_session_cls(config, engine_kwargs={"echo": True})
+        session = Session()
+        try:
+            session.add(Foo(id=1))
+            await session.commit()
+
+            assert isinstance(session, AsyncSession)
+            assert session.bind.echo is True
+
+            # Not expired on commit, so attributes remain accessible without IO.
+            result = await session.execute(sqlalchemy.select(Foo))
+            assert [foo.id for foo in result.scalars()] == [1]
+        finally:
+            await Session.remove()
+            await Session.bind.dispose()
+
+    asyncio.run(main())
+    assert count(config) == 1
+
+
+def test_task_scoped(config):
+    async def main():
+        Session = create_async_session_cls(config)
+
+        async def task():
+            session = Session()
+            assert session is Session()
+            await Session.remove()
+            return session
+
+        try:
+            first, second = await asyncio.gather(task(), task())
+            assert first is not second
+        finally:
+            await Session.bind.dispose()
+
+    asyncio.run(main())
+
+
+def test_close_disposes_engine(config):
+    disposed = []
+
+    async def main():
+        session = create_async_session(config)
+        sqlalchemy.event.listen(session.bind.sync_engine, "engine_disposed", disposed.append)
+
+        async with session:
+            await session.execute(sqlalchemy.select(Foo))
+
+    asyncio.run(main())
+    assert len(disposed) == 1
+
+
+def test_dry_run(config):
+    async def main():
+        session = create_async_session(config, dry_run=True)
+        assert isinstance(session, AsyncDryRunSession)
+
+        async with session:
+            session.add(Foo(id=1))
+            await session.commit()
+            assert (await session.execute(sqlalchemy.select(Foo.id))).all() == [(1,)]
+
+    asyncio.run(main())
+    assert count(config) == 0
+
+
+def test_dry_run_savepoint(config):
+    async def main():
+        session = create_async_session(config, dry_run=True, savepoint=True)
+        async with session:
+            session.add(Foo(id=1))
+            await session.commit()
+
+            session.add(Foo(id=2))
+            await session.rollback()
+
+            assert (await session.execute(sqlalchemy.select(Foo.id))).all() == [(1,)]
+
+    asyncio.run(main())
+    assert count(config) == 0
+
+
+def test_dry_run_logs(config, caplog):
+    caplog.set_level("DEBUG", logger="strapp")
+
+    async def main():
+        session = create_async_session(config, dry_run=True, verbosity=3)
+        async with session:
+            session.add(Foo(id=1))
+            await session.commit()
+
+    asyncio.run(main())
+    messages = [record.message for record in caplog.records if record.name.startswith("strapp")]
+    assert messages == ["New data:", "NEW: Foo(id=1)"]
@@ -0,0 +1,129 @@
+from unittest import mock
+
+import pytest
+import sqlalchemy
+
+from strapp.sqlalchemy.batch import batch_delete, batch_update
+from strapp.sqlalchemy.model_base import declarative_base
+
+Base = declarative_base()
+
+
+class Foo(Base, updated_at=True):
+    __tablename__ = "foo"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+    name = sqlalchemy.Column(sqlalchemy.types.Unicode())
+
+
+class Bar(Base):
+    __tablename__ = "bar"
+    a = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+    b = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+
+@pytest.fixture
+def session(db):
+    Base.metadata.create_all(bind=db.connection())
+    Foo.bulk_insert(db, [{"id": i, "name": None} for i in range(1, 11)])
+    Bar.bulk_insert(db, [{"a": a, "b": b} for a in range(3) for b in range(3)])
+    db.commit()
+    return db
+
+
+def test_update(session):
+    runner = batch_update(session, Foo, {"name": "foo"}, where=Foo.id != 5, chunk_size=4)
+    assert list(runner.chunks()) == [4, 4, 1]
+    assert runner.rows == 9
+    assert runner.chunks_run == 3
+
+    rows = session.query(Foo.id, Foo.name, Foo.updated_at).order_by(Foo.id).all()
+    assert [name for _, name, _ in rows] == ["foo"] * 4 + [None] + ["foo"] * 5
+
+    # The model's `onupdate` columns are still applied.
+    assert all(updated_at is not None for id, _, updated_at in rows if id != 5)
+
+
+def test_commits_each_chunk(session):
+    runner = batch_update(session, Foo, {"name": "foo"}, chunk_size=4)
+    chunks = runner.chunks()
+
+    with mock.patch.object(session, "commit", wraps=session.commit) as commit:
+        next(chunks)
+        assert commit.call_count == 1
+
+        list(chunks)
+        assert commit.call_count == 3
+
+
+def test_resume(session):
+    runner = batch_delete(session, Foo, chunk_size=3)
+    chunks = runner.chunks()
+    next(chunks)
+    next(chunks)
+    assert runner.cursor == (6,)
+
+    resumed = batch_delete(session, Foo, chunk_size=3, cursor=runner.cursor)
+    assert resumed.run() == 4
+    assert session.query(Foo).count() == 0
+
+
+def test_composite_primary_key(session):
+    runner = batch_delete(session, Bar, where=Bar.b != 1, chunk_size=2)
+    assert list(runner.chunks()) == [2, 2, 2]
+    assert session.query(Bar.a, Bar.b).order_by(Bar.a).all() == [(0, 1), (1, 1), (2, 1)]
+
+
+def test_no_rows(session):
+    runner = batch_delete(session, Foo, where=Foo.id > 100)
+    assert runner.run() == 0
+    assert runner.cursor is None
+
+
+def test_adaptive_chunk_size(session):
+    runner = batch_update(
+        session,
+        Foo,
+        {"name": "foo"},
+        chunk_size=2,
+        target_duration=1,
+        min_chunk_size=1,
+        max_chunk_size=3,
+    )
+
+    # Each statement takes 0.25s, against a target of 1s.
+    with mock.patch("time.perf_counter", side_effect=[0, 0.25] * 10):
+        chunk_sizes = []
+        for _ in runner.chunks():
+            chunk_sizes.append(runner.chunk_size)
+
+    assert chunk_sizes == [2, 3, 3, 3]
+
+    runner = batch_update(
+        session, Foo, {"name": "bar"}, chunk_size=8, target_duration=1, min_chunk_size=3
+    )
+
+    # Each statement takes 4s, so the chunk size halves (at most), down to the minimum.
+    with mock.patch("time.perf_counter", side_effect=[0, 4] * 10):
+        chunk_sizes = []
+        for _ in runner.chunks():
+            chunk_sizes.append(runner.chunk_size)
+
+    assert chunk_sizes == [8, 4]
+    assert runner.chunk_size == 3
+
+
+def test_sleep_and_progress(session):
+    progress = []
+    runner = batch_delete(
+        session,
+        Foo,
+        chunk_size=4,
+        sleep=0.5,
+        on_progress=lambda runner: progress.append((runner.rows, runner.cursor)),
+    )
+
+    with mock.patch("time.sleep") as sleep:
+        runner.run()
+
+    assert sleep.call_args_list == [mock.call(0.5), mock.call(0.5)]
+    assert progress == [(4, (4,)), (8, (8,)), (10, (10,))]
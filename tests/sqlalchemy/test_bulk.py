@@ -0,0 +1,134 @@
+from datetime import datetime
+
+import pytest
+import sqlalchemy
+from pytest_mock_resources import create_postgres_fixture
+
+from strapp.sqlalchemy.bulk import bulk_insert, bulk_upsert
+from strapp.sqlalchemy.model_base import declarative_base
+
+Base = declarative_base()
+
+
+class Foo(Base, created_at=True, updated_at=True):
+    __tablename__ = "foo"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+    name = sqlalchemy.Column(sqlalchemy.types.Unicode(), unique=True)
+    value = sqlalchemy.Column(sqlalchemy.types.Integer())
+
+
+pg = create_postgres_fixture(Base, session=True)
+
+
+@pytest.fixture
+def session(sqlite):
+    Base.metadata.create_all(bind=sqlite.connection())
+    return sqlite
+
+
+def names(session):
+    return [(row.id, row.name, row.value) for row in session.query(Foo).order_by(Foo.id).all()]
+
+
+class Test_bulk_insert:
+    def test_dicts(self, session):
+        rows = ({"name": str(i), "value": i} for i in range(5))
+        assert Foo.bulk_insert(session, rows, chunk_size=2) == 5
+        assert names(session) == [(i + 1, str(i), i) for i in range(5)]
+
+    def test_instances(self, session):
+        rows = [Foo(id=1, name="a"), Foo(id=2, name="b")]
+        assert bulk_insert(session, Foo, rows) == 2
+        assert names(session) == [(1, "a", None), (2, "b", None)]
+
+    def test_created_at_once_per_chunk(self, session):
+        rows = [{"name": str(i)} for i in range(4)]
+        Foo.bulk_insert(session, rows, chunk_size=2)
+
+        created_ats = [foo.created_at for foo in session.query(Foo).order_by(Foo.id)]
+        assert None not in created_ats
+        assert created_ats[0] == created_ats[1]
+        assert created_ats[2] == created_ats[3]
+
+    def test_explicit_created_at(self, session):
+        created_at = datetime(2020, 1, 1)
+        Foo.bulk_insert(session, [{"name": "a", "created_at": created_at}])
+
+        assert session.query(Foo.created_at).scalar() == created_at
+
+    def test_return_generated_primary_keys(self, session):
+        rows = [{"name": str(i)} for i in range(3)]
+        assert Foo.bulk_insert(session, rows, return_primary_keys=True) == [1, 2, 3]
+
+    def test_return_supplied_primary_keys(self, session):
+        rows = [{"id": i, "name": str(i)} for i in (5, 9)]
+        assert Foo.bulk_insert(session, rows, return_primary_keys=True) == [5, 9]
+
+    def test_empty(self, session):
+        assert Foo.bulk_insert(session, []) == 0
+        assert Foo.bulk_insert(session, [], return_primary_keys=True) == []
+
+
+class Test_bulk_upsert:
+    def test_upsert(self, session):
+        Foo.bulk_insert(session, [{"id": 1, "name": "a", "value": 1}])
+
+        rows = [{"id": 1, "name": "a", "value": 2}, {"id": 2, "name": "b", "value": 3}]
+        assert Foo.bulk_upsert(session, rows) == 2
+        assert names(session) == [(1, "a", 2), (2, "b", 3)]
+
+        updated = session.query(Foo).filter(Foo.id == 1).one()
+        assert updated.updated_at is not None
+
+    def test_created_at_survives_conflict(self, session):
+        created_at = datetime(2020, 1, 1)
+        Foo.bulk_insert(session, [{"id": 1, "name": "a", "value": 1, "created_at": created_at}])
+
+        rows = [{"id": 1, "name": "a", "value": 2}, {"id": 2, "name": "b", "value": 2}]
+        Foo.bulk_upsert(session, rows)
+        Foo.bulk_upsert(session, [{"id": 1, "value": 3, "created_at": datetime(2021, 1, 1)}])
+
+        foos = session.query(Foo).order_by(Foo.id).all()
+        assert [(foo.value, foo.created_at) for foo in foos][0] == (3, created_at)
+        assert foos[1].created_at is not None
+
+    def test_conflict_columns(self, session):
+        Foo.bulk_insert(session, [{"id": 1, "name": "a", "value": 1}])
+
+        rows = [{"name": "a", "value": 5}]
+        bulk_upsert(session, Foo, rows, conflict_columns=["name"])
+        assert names(session) == [(1, "a", 5)]
+
+    def test_update_columns(self, session):
+        Foo.bulk_insert(session, [{"id": 1, "name": "a", "value": 1}])
+
+        rows = [{"id": 1, "name": "b", "value": 5}]
+        Foo.bulk_upsert(session, rows, update_columns=["value"])
+        assert names(session) == [(1, "a", 5)]
+
+    def test_do_nothing(self, session):
+        Foo.bulk_insert(session, [{"id": 1, "name": "a"}])
+
+        Foo.bulk_upsert(session, [{"id": 1}, {"id": 2}])
+        assert names(session) == [(1, "a", None), (2, None, None)]
+
+    def test_return_primary_keys(self, session):
+        rows = [{"id": 3, "name": "a"}, {"id": 4, "name": "b"}]
+        assert Foo.bulk_upsert(session, rows, return_primary_keys=True) == [3, 4]
+
+    def test_return_primary_keys_requires_primary_key(self, session):
+        with pytest.raises(ValueError):
+            Foo.bulk_upsert(
+                session, [{"name": "a"}], conflict_columns=["name"], return_primary_keys=True
+            )
+
+
+@pytest.mark.postgres
+def test_postgres_upsert_returning(pg):
+    Foo.bulk_insert(pg, [{"name": "a", "value": 1}])
+
+    rows = [{"name": "a", "value": 2}, {"name": "b", "value": 3}]
+    ids = Foo.bulk_upsert(pg, rows, conflict_columns=["name"], return_primary_keys=True)
+
+    assert len(ids) == 2
+    assert sorted((row.name, row.value) for row in pg.query(Foo).all()) == [("a", 2), ("b", 3)]
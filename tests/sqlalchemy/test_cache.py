@@ -0,0 +1,268 @@
+from unittest import mock
+
+import pytest
+import sqlalchemy
+
+from strapp.sqlalchemy.cache import cached, MemoryBackend, QueryCache
+from strapp.sqlalchemy.model_base import declarative_base
+from strapp.sqlalchemy.session import create_session_cls
+
+Base = declarative_base()
+
+
+class Foo(Base):
+    __tablename__ = "foo"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+    name = sqlalchemy.Column(sqlalchemy.types.Unicode())
+
+
+class Bar(Base):
+    __tablename__ = "bar"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+
+@pytest.fixture
+def query_cache():
+    return QueryCache(increment=mock.Mock())
+
+
+@pytest.fixture
+def Session(tmp_path, query_cache):
+    config = {"drivername": "sqlite", "database": str(tmp_path / "cache.db")}
+    Session = create_session_cls(config, registry=None, query_cache=query_cache)
+
+    session = Session()
+    Base.metadata.create_all(bind=session.connection())
+    Foo.bulk_insert(session, [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}])
+    Bar.bulk_insert(session, [{"id": 1}])
+    session.commit()
+    Session.remove()
+
+    return Session
+
+
+def names(session):
+    return [foo.name for foo in cached(session.query(Foo).order_by(Foo.id)).all()]
+
+
+def statements(session):
+    recorded = []
+
+    @sqlalchemy.event.listens_for(session.bind, "before_cursor_execute")
+    def record(conn, cursor, statement, *args):
+        recorded.append(statement)
+
+    return recorded
+
+
+def test_hit_across_sessions(Session, query_cache):
+    assert names(Session()) == ["a", "b"]
+    Session.remove()
+
+    session = Session()
+    executed = statements(session)
+    assert names(session) == ["a", "b"]
+
+    assert executed == []
+    assert query_cache.stats()["hits"] == 1
+    assert query_cache.stats()["misses"] == 1
+
+
+def test_hit_returns_persistent_objects(Session):
+    names(Session())
+    Session.remove()
+
+    session = Session()
+    foo = cached(session.query(Foo).filter(Foo.id == 1)).one()
+    assert sqlalchemy.inspect(foo).persistent
+
+    foo.name = "c"
+    session.commit()
+    assert session.query(Foo.name).filter(Foo.id == 1).scalar() == "c"
+
+
+def test_unmarked_queries_not_cached(Session, query_cache):
+    session = Session()
+    session.query(Foo).all()
+    session.query(Foo).all()
+
+    assert query_cache.stats()["size"] == 0
+
+
+def test_parameters_are_part_of_key(Session):
+    session = Session()
+    assert cached(session.query(Foo.name).filter(Foo.id == 1)).scalar() == "a"
+    assert cached(session.query(Foo.name).filter(Foo.id == 2)).scalar() == "b"
+
+
+def test_column_rows(Session):
+    session = Session()
+    cached(session.query(Foo.id, Foo.name)).all()
+
+    rows = cached(session.query(Foo.id, Foo.name).order_by(Foo.id)).all()
+    assert [row.name for row in rows] == ["a", "b"]
+
+
+def test_get(Session, query_cache):
+    assert query_cache.get(Session(), Foo, 1).name == "a"
+    Session.remove()
+
+    session = Session()
+    executed = statements(session)
+    assert query_cache.get(session, Foo, 1).name == "a"
+    assert executed == []
+
+
+def test_changes_do_not_leak_into_cache(Session):
+    session = Session()
+    foo = cached(session.query(Foo).filter(Foo.id == 1)).one()
+    foo.name = "changed"
+
+    other = Session.session_factory()
+    assert cached(other.query(Foo).filter(Foo.id == 1)).one().name == "a"
+
+
+def test_flush_invalidates_table(Session, query_cache):
+    session = Session()
+    names(session)
+    cached(session.query(Bar)).all()
+
+    session.add(Foo(id=3, name="c"))
+    session.flush()
+
+    # The session's own uncommitted writes bypass the cache.
+    assert names(session) == ["a", "b", "c"]
+    assert query_cache.stats()["misses"] == 2
+
+    # Other tables' results are unaffected.
+    cached(session.query(Bar)).all()
+    assert query_cache.stats()["hits"] == 1
+
+
+def test_uncommitted_writes_are_not_cached(Session):
+    writer = Session.session_factory()
+    writer.add(Foo(id=3, name="c"))
+    writer.flush()
+    assert names(writer) == ["a", "b", "c"]
+    writer.rollback()
+
+    reader = Session.session_factory()
+    assert names(reader) == ["a", "b"]
+
+
+def test_rollback_invalidates_table(Session, query_cache):
+    writer = Session.session_factory()
+    writer.add(Foo(id=3, name="c"))
+    writer.flush()
+    invalidations = query_cache.stats()["invalidations"]
+
+    writer.rollback()
+    assert query_cache.stats()["invalidations"] == invalidations + 1
+
+
+def test_close_clears_uncommitted_writes(Session, query_cache):
+    session = Session()
+    session.add(Foo(id=3, name="c"))
+    session.flush()
+    session.close()
+
+    # The discarded writes no longer bypass the cache.
+    assert names(session) == ["a", "b"]
+    assert names(session) == ["a", "b"]
+    assert query_cache.stats()["hits"] == 1
+
+
+def test_update_and_delete_invalidate(Session):
+    session = Session()
+    names(session)
+
+    session.query(Foo).filter(Foo.id == 1).one().name = "z"
+    session.flush()
+    assert names(session) == ["z", "b"]
+
+    session.delete(session.query(Foo).filter(Foo.id == 2).one())
+    session.flush()
+    assert names(session) == ["z"]
+
+
+def test_commit_invalidates_table(Session, query_cache):
+    writer = Session.session_factory()
+    writer.add(Foo(id=3, name="c"))
+    writer.flush()
+
+    # A concurrent session caches the pre-commit state of the table.
+    reader = Session.session_factory()
+    assert names(reader) == ["a", "b"]
+    reader.rollback()
+
+    writer.commit()
+    assert names(reader) == ["a", "b", "c"]
+
+
+def test_dml_invalidates_table(Session):
+    session = Session()
+    names(session)
+
+    Foo.bulk_insert(session, [{"id": 3, "name": "c"}])
+    assert names(session) == ["a", "b", "c"]
+
+    session.execute(sqlalchemy.update(Foo).where(Foo.id == 3).values(name="d"))
+    assert names(session) == ["a", "b", "d"]
+
+
+def test_ttl(Session):
+    session = Session()
+    query = cached(session.query(Foo.name).filter(Foo.id == 1), ttl=60)
+
+    with mock.patch("time.monotonic", return_value=0):
+        query.scalar()
+
+    session.execute(sqlalchemy.text("update foo set name = 'z' where id = 1"))
+
+    with mock.patch("time.monotonic", return_value=59):
+        assert query.scalar() == "a"
+
+    with mock.patch("time.monotonic", return_value=60):
+        assert query.scalar() == "z"
+
+
+def test_metrics(Session, query_cache):
+    query_cache.increment.reset_mock()
+
+    session = Session()
+    names(session)
+    names(session)
+
+    calls = [call.args[0] for call in query_cache.increment.call_args_list]
+    assert calls == ["sqlalchemy.cache.miss", "sqlalchemy.cache.hit"]
+    assert query_cache.stats()["hit_ratio"] == 0.5
+
+    session.add(Foo(id=3))
+    session.flush()
+    query_cache.increment.assert_called_with("sqlalchemy.cache.invalidate", 1, tags=None)
+
+
+class Test_MemoryBackend:
+    def test_lru_eviction(self):
+        backend = MemoryBackend(max_size=2)
+        backend.set("a", 1)
+        backend.set("b", 2)
+        backend.get("a")
+        backend.set("c", 3)
+
+        assert backend.get("a") == 1
+        assert backend.get("b") is None
+        assert backend.get("c") == 3
+        assert len(backend) == 2
+
+    def test_expiry(self):
+        backend = MemoryBackend()
+        with mock.patch("time.monotonic", return_value=0):
+            backend.set("a", 1, ttl=5)
+
+        with mock.patch("time.monotonic", return_value=4):
+            assert backend.get("a") == 1
+
+        with mock.patch("time.monotonic", return_value=5):
+            assert backend.get("a") is None
+        assert len(backend) == 0
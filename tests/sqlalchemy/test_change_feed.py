@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta
+
+import pytest
+import sqlalchemy
+
+from strapp.sqlalchemy.change_feed import _timestamp_of, change_feed, change_feed_index
+from strapp.sqlalchemy.model_base import declarative_base
+from strapp.sqlalchemy.soft_delete import install_soft_delete
+
+Base = declarative_base()
+
+
+class Foo(Base, created_at=True, updated_at=True, deleted_at=True):
+    __tablename__ = "foo"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+
+class Bar(Base, created_at=True):
+    __tablename__ = "bar"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+
+class Qux(Base, updated_at=True):
+    __tablename__ = "qux"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+
+class Baz(Base):
+    __tablename__ = "baz"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+
+change_feed_index(Foo)
+
+day = datetime(2020, 1, 1)
+
+
+@pytest.fixture
+def session(sqlite):
+    install_soft_delete(sqlite)
+    Base.metadata.create_all(bind=sqlite.connection())
+
+    # Many rows share a timestamp, straddling chunk boundaries.
+    sqlite.add_all([Foo(id=i, created_at=day) for i in range(1, 6)])
+    sqlite.add_all([Foo(id=i, created_at=day - timedelta(days=1)) for i in range(6, 8)])
+    sqlite.commit()
+    return sqlite
+
+
+def ids(feed):
+    return [foo.id for foo in feed]
+
+
+def test_ordered_by_timestamp_then_pk(session):
+    assert ids(change_feed(session.query(Foo), chunk_size=2)) == [6, 7, 1, 2, 3, 4, 5]
+
+
+def test_resume_from_watermark(session):
+    feed = change_feed(session.query(Foo), chunk_size=2)
+    chunks = feed.chunks()
+    next(chunks)
+    next(chunks)
+    assert feed.watermark == (day, 2)
+
+    assert ids(change_feed(session.query(Foo), watermark=feed.watermark)) == [3, 4, 5]
+
+
+def test_updates_are_emitted(session):
+    feed = change_feed(session.query(Foo))
+    assert len(ids(feed)) == 7
+
+    session.get(Foo, 6).updated_at = day + timedelta(hours=1)
+    session.get(Foo, 1).deleted_at = day
+    session.get(Foo, 1).updated_at = day + timedelta(hours=2)
+    session.commit()
+
+    feed = change_feed(session.query(Foo), watermark=feed.watermark)
+    assert ids(feed) == [6, 1]
+    assert feed.watermark == (day + timedelta(hours=2), 1)
+    assert ids(change_feed(session.query(Foo), watermark=feed.watermark)) == []
+
+
+def test_settle(session):
+    session.add(Foo(id=8))
+    session.commit()
+
+    assert 8 not in ids(change_feed(session.query(Foo)))
+    assert 8 in ids(change_feed(session.query(Foo), settle=timedelta(seconds=-5)))
+
+
+def test_filtered_query(session):
+    assert ids(change_feed(session.query(Foo).filter(Foo.id > 4))) == [6, 7, 5]
+
+
+def test_created_at_only(session):
+    session.add_all([Bar(id=2, created_at=day), Bar(id=1, created_at=day)])
+    session.commit()
+
+    assert ids(change_feed(session.query(Bar), chunk_size=1)) == [1, 2]
+
+
+def test_updated_at_only(session):
+    session.add_all([Qux(id=1), Qux(id=2), Qux(id=3, updated_at=day)])
+    session.commit()
+
+    with pytest.warns(UserWarning, match="never updated"):
+        assert ids(change_feed(session.query(Qux))) == [3]
+
+    with pytest.raises(ValueError, match="neither"):
+        _timestamp_of(Qux(id=4))
+
+
+def test_no_timestamp(session):
+    with pytest.raises(ValueError):
+        change_feed(session.query(Baz))
+
+
+def test_index():
+    index = change_feed_index(Foo)
+    assert index is change_feed_index(Foo)
+    assert index.table is Foo.__table__
+    assert str(sqlalchemy.schema.CreateIndex(index)) == (
+        "CREATE INDEX ix_foo_change_feed ON foo (coalesce(updated_at, created_at), id)"
+    )
+
+    with pytest.raises(ValueError):
+        change_feed_index(Baz)
@@ -0,0 +1,115 @@
+import csv
+import enum
+import io
+from datetime import datetime
+
+import pytest
+import sqlalchemy
+from pytest_mock_resources import create_postgres_fixture
+
+from strapp.sqlalchemy.copy import _copy_line, _copy_value, copy_from, copy_to
+from strapp.sqlalchemy.model_base import declarative_base
+
+Base = declarative_base()
+
+
+class Color(enum.Enum):
+    red = "r"
+    blue = "b"
+
+
+class Foo(Base, created_at=True):
+    __tablename__ = "foo"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+    name = sqlalchemy.Column(sqlalchemy.types.Unicode())
+    data = sqlalchemy.Column(sqlalchemy.types.JSON())
+    blob = sqlalchemy.Column(sqlalchemy.types.LargeBinary())
+    color = sqlalchemy.Column(sqlalchemy.types.Enum(Color))
+
+
+pg = create_postgres_fixture(Base, session=True)
+
+
+@pytest.fixture
+def session(db):
+    Base.metadata.create_all(bind=db.connection())
+    return db
+
+
+def rows(count):
+    for i in range(1, count + 1):
+        yield {"id": i, "name": None if i % 2 else str(i)}
+
+
+class Test_copy_from:
+    def test_fallback(self, session):
+        assert copy_from(session, Foo, rows(5), chunk_size=2) == 5
+
+        result = session.query(Foo.id, Foo.name).order_by(Foo.id).all()
+        assert result == [(1, None), (2, "2"), (3, None), (4, "4"), (5, None)]
+        assert session.query(Foo).filter(Foo.created_at.is_(None)).count() == 0
+
+    def test_instances(self, session):
+        assert copy_from(session, Foo, [Foo(id=1, name="a"), Foo(id=2, name="b")]) == 2
+        assert session.query(Foo.name).order_by(Foo.id).all() == [("a",), ("b",)]
+
+
+class Test_copy_to:
+    def test_model(self, session):
+        copy_from(session, Foo, rows(3))
+
+        file = io.StringIO()
+        assert copy_to(session, Foo, file) == 3
+
+        result = list(csv.reader(io.StringIO(file.getvalue())))
+        assert result[0] == ["id", "name", "data", "blob", "color", "created_at"]
+        assert [row[:2] for row in result[1:]] == [["1", ""], ["2", "2"], ["3", ""]]
+
+    def test_select_no_header(self, session):
+        copy_from(session, Foo, rows(3))
+
+        file = io.StringIO()
+        statement = sqlalchemy.select(Foo.id).where(Foo.id.in_([1, 3])).order_by(Foo.id)
+        assert copy_to(session, statement, file, header=False, chunk_size=1) == 2
+        assert file.getvalue().splitlines() == ["1", "3"]
+
+
+def test_copy_value():
+    table = Foo.__table__
+    assert _copy_value(table.c.data, {"a": [1]}) == '{"a": [1]}'
+    assert _copy_value(table.c.blob, b"\x00\xff") == "\\x00ff"
+    assert _copy_value(table.c.color, Color.red) == "red"
+    assert _copy_value(table.c.name, "") == ""
+    assert _copy_value(table.c.name, None) is None
+
+
+def test_copy_line():
+    assert _copy_line([1, None, "", 'a "b",\nc']) == '"1",,"","a ""b"",\nc"\n'
+    assert list(csv.reader(io.StringIO(_copy_line(["", None])))) == [["", ""]]
+
+
+@pytest.mark.postgres
+def test_postgres_round_trip(pg):
+    created_at = datetime(2020, 1, 1)
+    values = [
+        {"id": 1, "name": "", "data": {"a": 1}, "blob": b"\x00", "color": Color.red},
+        {"id": 2, "name": None, "data": None, "blob": None, "color": None},
+        {"id": 3, "name": 'a "quoted", value\n', "data": [1], "blob": b"", "color": Color.blue},
+    ]
+    assert copy_from(pg, Foo, [dict(row, created_at=created_at) for row in values]) == 3
+
+    result = pg.query(Foo).order_by(Foo.id).all()
+    assert [(foo.name, foo.data, foo.blob, foo.color) for foo in result] == [
+        ("", {"a": 1}, b"\x00", Color.red),
+        (None, None, None, None),
+        ('a "quoted", value\n', [1], b"", Color.blue),
+    ]
+
+    file = io.StringIO()
+    query = pg.query(Foo.id, Foo.name).filter(Foo.id.in_([1, 3])).order_by(Foo.id)
+    assert copy_to(pg, query, file) == 2
+    assert list(csv.reader(io.StringIO(file.getvalue()))) == [
+        ["id", "name"],
+        ["1", ""],
+        ["3", 'a "quoted", value\n'],
+    ]
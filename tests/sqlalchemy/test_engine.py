@@ -0,0 +1,120 @@
+import os
+
+import pytest
+
+from strapp.sqlalchemy.engine import EngineRegistry
+from strapp.sqlalchemy.session import create_session_cls
+
+
+@pytest.fixture
+def config(tmp_path):
+    return {"drivername": "sqlite", "database": str(tmp_path / "foo.db")}
+
+
+def test_same_config_same_engine(config):
+    registry = EngineRegistry()
+
+    engine = registry.get(config)
+    assert registry.get(dict(config)) is engine
+    assert registry.engines() == [engine]
+
+
+def test_engine_kwargs_distinguish_engines(config):
+    registry = EngineRegistry()
+
+    engine1 = registry.get(config, engine_kwargs={"pool_pre_ping": True})
+    engine2 = registry.get(config, engine_kwargs={"pool_pre_ping": False})
+    engine3 = registry.get(config, engine_kwargs={"pool_pre_ping": True})
+
+    assert engine1 is not engine2
+    assert engine1 is engine3
+
+
+def test_unhashable_engine_kwargs(config):
+    registry = EngineRegistry()
+
+    engine_kwargs = {"connect_args": {"timeout": 5}, "execution_options": {"foo": [1, 2]}}
+    engine = registry.get(config, engine_kwargs=engine_kwargs)
+    assert registry.get(config, engine_kwargs=dict(engine_kwargs)) is engine
+
+
+def test_memory_sqlite_not_shared():
+    registry = EngineRegistry()
+
+    engine1 = registry.get({"drivername": "sqlite"})
+    engine2 = registry.get({"drivername": "sqlite"})
+    assert engine1 is not engine2
+    assert registry.engines() == []
+
+
+def test_dispose_one(config, tmp_path):
+    registry = EngineRegistry()
+    other_config = {"drivername": "sqlite", "database": str(tmp_path / "bar.db")}
+
+    engine = registry.get(config)
+    other_engine = registry.get(other_config)
+
+    registry.dispose(config)
+    assert registry.engines() == [other_engine]
+    assert registry.get(config) is not engine
+
+
+def test_dispose_all(config):
+    registry = EngineRegistry()
+    registry.get(config)
+
+    registry.dispose()
+    assert registry.engines() == []
+
+
+def test_status(config):
+    registry = EngineRegistry()
+    engine = registry.get(config, engine_kwargs={"pool_pre_ping": True})
+
+    (status,) = registry.status()
+    assert status["url"] == f"sqlite:///{config['database']}"
+    assert status["engine_kwargs"] == {"pool_pre_ping": True}
+    assert status["pool"] == engine.pool.status()
+
+
+def test_reset_after_fork(config):
+    registry = EngineRegistry()
+    engine = registry.get(config)
+    pool = engine.pool
+
+    registry.reset_after_fork()
+    assert engine.pool is not pool
+    assert registry.get(config) is engine
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Requires os.fork")
+def test_fork_replaces_pool(config):
+    registry = EngineRegistry()
+    engine = registry.get(config)
+    with engine.connect():
+        pass
+    pool = engine.pool
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # pragma: nocover
+        os.write(write_fd, b"1" if engine.pool is not pool else b"0")
+        os._exit(0)
+
+    os.waitpid(pid, 0)
+    assert os.read(read_fd, 1) == b"1"
+    assert engine.pool is pool
+
+
+def test_create_session_cls_shares_engine(config):
+    registry = EngineRegistry()
+
+    Session1 = create_session_cls(config, registry=registry)
+    Session2 = create_session_cls(config, registry=registry)
+    assert Session1.bind is Session2.bind
+
+
+def test_create_session_cls_without_registry(config):
+    Session1 = create_session_cls(config, registry=None)
+    Session2 = create_session_cls(config, registry=None)
+    assert Session1.bind is not Session2.bind
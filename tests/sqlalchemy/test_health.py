@@ -0,0 +1,182 @@
+import time
+from unittest import mock
+
+import pytest
+import sqlalchemy
+from sqlalchemy.pool import NullPool, QueuePool
+
+from strapp.sqlalchemy.engine import EngineRegistry
+from strapp.sqlalchemy.health import configure_pool_health, get_pool_health, PoolHealth
+from strapp.sqlalchemy.pool import instrument_pool
+from strapp.sqlalchemy.session import create_session_cls
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = sqlalchemy.create_engine(
+        f"sqlite:///{tmp_path / 'foo.db'}", poolclass=QueuePool, pool_size=3, max_overflow=2
+    )
+    yield engine
+    engine.dispose()
+
+
+class Recorder:
+    def __init__(self):
+        self.increments = []
+        self.gauges = {}
+
+    def increment(self, metric, value=1, tags=None):
+        self.increments.append((metric, value))
+
+    def gauge(self, metric, value, tags=None):
+        self.gauges[metric] = value
+
+
+class Test_warm_up:
+    def test_fills_pool(self, engine):
+        recorder = Recorder()
+        health = configure_pool_health(engine, warm_up=2, gauge=recorder.gauge, tags=["a"])
+
+        assert engine.pool.checkedin() == 2
+        assert health.warm_up_duration is not None
+        assert recorder.gauges["sqlalchemy.pool.warm_up_ms"] == health.warm_up_duration * 1000
+
+    def test_limited_to_pool_size(self, engine):
+        assert PoolHealth(engine).warm_up(10) == 3
+        assert engine.pool.checkedin() == 3
+
+    def test_unsized_pool(self, tmp_path):
+        engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'foo.db'}", poolclass=NullPool)
+        assert PoolHealth(engine).warm_up() == 0
+
+
+def test_configure_idempotent(engine):
+    health = configure_pool_health(engine)
+    assert configure_pool_health(engine, warm_up=1) is health
+    assert get_pool_health(engine) is health
+    assert engine.pool.checkedin() == 1
+
+
+def test_recycle(engine):
+    PoolHealth(engine, recycle=60, recycle_jitter=0.5)
+
+    with mock.patch("time.monotonic", return_value=1000):
+        with engine.connect() as connection:
+            original = connection.connection.dbapi_connection
+
+        # Between 30 and 60 seconds, depending on the jitter.
+        with engine.connect() as connection:
+            assert connection.connection.dbapi_connection is original
+
+    with mock.patch("time.monotonic", return_value=1029):
+        with engine.connect() as connection:
+            assert connection.connection.dbapi_connection is original
+
+    with mock.patch("time.monotonic", return_value=1060):
+        with engine.connect() as connection:
+            assert connection.connection.dbapi_connection is not original
+            assert connection.execute(sqlalchemy.text("select 1")).scalar() == 1
+
+
+def test_check(engine):
+    recorder = Recorder()
+    health = configure_pool_health(engine, warm_up=3, increment=recorder.increment)
+    assert health.check() == 0
+
+    # One of the idle connections has died.
+    with mock.patch.object(engine.dialect, "do_ping", side_effect=[True, False, True]):
+        assert health.check() == 1
+    assert recorder.increments == [("sqlalchemy.pool.invalidated", 1)]
+    assert health.checks == 2
+
+    # The dead connection is replaced upon its next use.
+    for _ in range(3):
+        with engine.connect() as connection:
+            assert connection.execute(sqlalchemy.text("select 1")).scalar() == 1
+    assert health.check() == 0
+
+
+def test_check_one_at_a_time(engine):
+    instrumentation = instrument_pool(engine)
+    health = configure_pool_health(engine, warm_up=3, recycle=60)
+
+    idle = []
+
+    def do_ping(dbapi_connection):
+        idle.append(engine.pool.checkedin())
+        return True
+
+    with engine.connect():
+        checkouts = instrumentation.checkouts
+        with mock.patch.object(engine.dialect, "do_ping", side_effect=do_ping):
+            # Connections due to be recycled are not recycled by the check.
+            with mock.patch("time.monotonic", return_value=time.monotonic() + 120):
+                assert health.check() == 0
+
+        # The other idle connections remain available while each is pinged.
+        assert idle == [1, 1]
+        assert engine.pool.checkedin() == 2
+        assert instrumentation.checkouts == checkouts
+
+
+def test_check_while_pool_fills(engine):
+    health = configure_pool_health(engine, warm_up=3)
+    pool = engine.pool
+
+    filled = []
+
+    def do_ping(dbapi_connection):
+        # Concurrent checkouts take the other idle connections, and open overflow connections.
+        if not filled:
+            filled.append(True)
+            connections = [pool.connect() for _ in range(4)]
+            assert pool.overflow() == 2
+            for connection in connections:
+                connection.close()
+        return True
+
+    with mock.patch.object(engine.dialect, "do_ping", side_effect=do_ping):
+        assert health.check() == 0
+
+    # The pinged connection is kept, alongside the overflow connection which fit the queue.
+    assert pool.checkedout() == 0
+    assert pool.checkedin() == 4
+    assert pool.overflow() == 1
+
+    with engine.connect() as connection:
+        assert connection.execute(sqlalchemy.text("select 1")).scalar() == 1
+
+
+def test_background_check(engine):
+    health = configure_pool_health(engine, warm_up=1, check_interval=0.01)
+    try:
+        deadline = time.monotonic() + 5
+        while health.checks < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        health.stop()
+
+    assert health.checks >= 2
+
+    with pytest.raises(ValueError):
+        PoolHealth(engine).start()
+
+
+class Test_create_session_cls:
+    def test_pool_pre_ping(self, tmp_path):
+        config = {"drivername": "sqlite", "database": str(tmp_path / "foo.db")}
+        Session = create_session_cls(config, registry=EngineRegistry(), pool_pre_ping=True)
+        assert Session().get_bind().pool._pre_ping is True
+
+    def test_pool_health(self, tmp_path):
+        config = {"drivername": "sqlite", "database": str(tmp_path / "foo.db")}
+        Session = create_session_cls(
+            config,
+            registry=EngineRegistry(),
+            engine_kwargs={"poolclass": QueuePool},
+            pool_health={"warm_up": 2, "recycle": 3600},
+        )
+
+        engine = Session().get_bind()
+        assert engine.pool.checkedin() == 2
+        assert get_pool_health(engine).recycle == 3600
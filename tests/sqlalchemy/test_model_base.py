@@ -1,9 +1,10 @@
 from datetime import datetime, timedelta, timezone
+from unittest import mock
 
 import sqlalchemy
 from sqlalchemy.orm import declarative_base as sqlalchemy_declarative_base
 
-from strapp.sqlalchemy.model_base import declarative_base
+from strapp.sqlalchemy.model_base import declarative_base, make_repr_fn
 
 
 class Test_declarative_base:
@@ -172,3 +173,49 @@ class Test_declarative_base:
 
         db_foo = db.query(Foo).one()
         assert db_foo.deleted_at == now
+
+
+class Test_repr:
+    def test_truncated(self):
+        Base = declarative_base(repr=make_repr_fn(max_length=4))
+
+        class Foo(Base):
+            __tablename__ = "foo"
+            id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+            name = sqlalchemy.Column(sqlalchemy.types.Unicode())
+
+        assert repr(Foo(id=12345, name="ab")) == "Foo(id=1234..., name='ab')"
+
+    def test_plan_computed_once_per_class(self):
+        repr_fn = make_repr_fn()
+        Base = declarative_base(repr=repr_fn)
+
+        class Foo(Base):
+            __tablename__ = "foo"
+            id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+        class Bar(Foo):
+            name = sqlalchemy.Column(sqlalchemy.types.Unicode())
+
+        with mock.patch("sqlalchemy.inspect", wraps=sqlalchemy.inspect) as inspect:
+            assert repr(Foo(id=1)) == "Foo(id=1)"
+            assert repr(Foo(id=2)) == "Foo(id=2)"
+            assert repr(Bar(id=3, name="a")) == "Bar(id=3, name='a')"
+
+        assert inspect.call_count == 2
+
+    def test_expired_attributes_are_loaded(self, db):
+        Base = declarative_base()
+
+        class Foo(Base):
+            __tablename__ = "foo"
+            id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+            name = sqlalchemy.Column(sqlalchemy.types.Unicode())
+
+        Base.metadata.create_all(bind=db.connection())
+        foo = Foo(id=1, name="a")
+        db.add(foo)
+        db.commit()
+
+        assert "name" not in foo.__dict__
+        assert repr(foo) == "Foo(id=1, name='a')"
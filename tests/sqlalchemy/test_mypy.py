@@ -0,0 +1,60 @@
+from mypy import api
+
+MODELS = """
+import sqlalchemy
+
+from strapp.sqlalchemy.model_base import declarative_base
+
+Base = declarative_base()
+
+
+class Foo(Base, created_at=True):
+    __tablename__ = "foo"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+
+class Bar(Base, updated_at=True):
+    __tablename__ = "bar"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+
+class Plain:
+    pass
+
+
+class Baz(Plain):
+    pass
+
+
+reveal_type(Foo(id=1).created_at)
+reveal_type(Foo(id=1).id)
+reveal_type(Bar(id=1).updated_at)
+Foo.bulk_insert
+Baz().created_at
+"""
+
+
+def test_declarative_models(tmp_path):
+    (tmp_path / "models.py").write_text(MODELS)
+    (tmp_path / "mypy.ini").write_text(
+        "[mypy]\nplugins = strapp.sqlalchemy.mypy, sqlalchemy.ext.mypy.plugin\n"
+    )
+
+    stdout, _, _ = api.run(
+        [
+            str(tmp_path / "models.py"),
+            "--config-file",
+            str(tmp_path / "mypy.ini"),
+            "--no-incremental",
+            "--hide-error-context",
+            "--no-error-summary",
+        ]
+    )
+
+    messages = [line.split(": ", 1)[1] for line in stdout.splitlines()]
+    assert messages == [
+        'note: Revealed type is "datetime.datetime"',
+        'note: Revealed type is "Union[builtins.int, None]"',
+        'note: Revealed type is "datetime.datetime"',
+        'error: "Baz" has no attribute "created_at"  [attr-defined]',
+    ]
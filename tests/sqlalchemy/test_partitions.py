@@ -0,0 +1,187 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import sqlalchemy
+from alembic.autogenerate import render_python_code
+from alembic.operations import ops
+from pytest_mock_resources import create_postgres_fixture
+from sqlalchemy.dialects import postgresql
+
+from strapp.sqlalchemy.alembic import CreatePartitionsOp, DropPartitionsOp, exclude_partitions
+from strapp.sqlalchemy.model_base import declarative_base
+from strapp.sqlalchemy.partitions import (
+    create_partition_ddl,
+    maintain_partitions,
+    partition_bounds,
+    partition_name,
+    plan_partitions,
+)
+
+Base = declarative_base()
+
+
+class Event(Base, created_at=True, partitioned="month"):
+    __tablename__ = "event"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+    name = sqlalchemy.Column(sqlalchemy.types.Unicode())
+
+
+class Foo(Base):
+    __tablename__ = "foo"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+
+pg = create_postgres_fixture(Base, session=True)
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class Test_model:
+    @pytest.mark.parametrize("migration", [False, True])
+    def test_postgresql_ddl(self, migration):
+        table = Event.__table__
+        if migration:
+            table = ops.CreateTableOp.from_table(table).to_table()
+
+        ddl = str(sqlalchemy.schema.CreateTable(table).compile(dialect=postgresql.dialect()))
+        assert "id SERIAL NOT NULL" in ddl
+        assert "PRIMARY KEY (id, created_at)" in ddl
+        assert ddl.strip().endswith("PARTITION BY RANGE (created_at)")
+
+    def test_primary_key_unchanged(self):
+        assert [column.name for column in Event.__table__.primary_key] == ["id"]
+
+        ddl = str(
+            sqlalchemy.schema.CreateTable(Foo.__table__).compile(dialect=postgresql.dialect())
+        )
+        assert "PRIMARY KEY (id)" in ddl
+
+    def test_sqlite_unpartitioned(self, sqlite):
+        Base.metadata.create_all(bind=sqlite.connection())
+
+        sqlite.add(Event(name="a"))
+        sqlite.add(Event(name="b"))
+        sqlite.commit()
+        assert sqlite.query(Event.id, Event.name).order_by(Event.id).all() == [(1, "a"), (2, "b")]
+
+    def test_invalid_interval(self):
+        with pytest.raises(ValueError):
+
+            class Bad(Base, created_at=True, partitioned="fortnight"):
+                __tablename__ = "bad"
+                id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+    def test_requires_created_at(self):
+        Base = declarative_base()
+        with pytest.raises(ValueError):
+
+            class Bad(Base, partitioned="month"):
+                __tablename__ = "bad"
+                id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+
+@pytest.mark.parametrize(
+    "interval, at, lower, upper",
+    [
+        ("day", utc(2020, 3, 15, 10), utc(2020, 3, 15), utc(2020, 3, 16)),
+        ("week", utc(2020, 3, 15, 10), utc(2020, 3, 9), utc(2020, 3, 16)),
+        ("month", utc(2020, 12, 15), utc(2020, 12, 1), utc(2021, 1, 1)),
+        ("year", utc(2020, 12, 15), utc(2020, 1, 1), utc(2021, 1, 1)),
+        # Naive datetimes are UTC, aware datetimes are converted.
+        ("day", datetime(2020, 3, 15, 23), utc(2020, 3, 15), utc(2020, 3, 16)),
+        (
+            "day",
+            datetime(2020, 3, 15, 23, tzinfo=timezone(timedelta(hours=-5))),
+            utc(2020, 3, 16),
+            utc(2020, 3, 17),
+        ),
+    ],
+)
+def test_partition_bounds(interval, at, lower, upper):
+    assert partition_bounds(interval, at) == (lower, upper)
+
+
+def test_partition_name():
+    assert partition_name("event", "day", utc(2020, 3, 9)) == "event_p20200309"
+    assert partition_name("event", "year", utc(2020, 1, 1)) == "event_p2020"
+
+
+def test_create_partition_ddl_schema():
+    ddl = create_partition_ddl("event", "year", utc(2020, 1, 1), schema="foo")
+    assert ddl.startswith("CREATE TABLE IF NOT EXISTS foo.event_p2020 PARTITION OF foo.event\n")
+
+
+class Test_plan_partitions:
+    def test_premake(self):
+        create, drop = plan_partitions("event", "month", [], now=utc(2020, 11, 30), premake=2)
+        assert create == [utc(2020, 11, 1), utc(2020, 12, 1), utc(2021, 1, 1)]
+        assert drop == []
+
+    def test_existing_skipped(self):
+        existing = ["event_p202011", "event_p202012"]
+        create, _ = plan_partitions("event", "month", existing, now=utc(2020, 11, 30), premake=2)
+        assert create == [utc(2021, 1, 1)]
+
+    def test_retention(self):
+        existing = ["event_p202009", "event_p202010", "event_p202011", "event_other", "event_p1"]
+        _, drop = plan_partitions(
+            "event", "month", existing, now=utc(2020, 11, 15), retention=timedelta(days=30)
+        )
+        assert drop == ["event_p202009"]
+
+
+def test_maintain_unsupported(sqlite):
+    with pytest.raises(NotImplementedError):
+        maintain_partitions(sqlite, Event)
+
+    with pytest.raises(ValueError):
+        maintain_partitions(sqlite, Foo)
+
+
+class Test_alembic:
+    def test_render(self):
+        op = CreatePartitionsOp("event", "month")
+        code = render_python_code(ops.UpgradeOps([ops.ModifyTableOps("event", [op])]))
+        assert "op.create_partitions('event', 'month', schema=None, premake=3)" in code
+
+        reverse = op.reverse()
+        assert isinstance(reverse, DropPartitionsOp)
+        code = render_python_code(ops.UpgradeOps([ops.ModifyTableOps("event", [reverse])]))
+        assert "op.drop_partitions('event', 'month', schema=None)" in code
+
+    def test_create_table_renders_partitioning(self):
+        code = render_python_code(ops.UpgradeOps([ops.CreateTableOp.from_table(Event.__table__)]))
+        assert "postgresql_partition_by='RANGE (created_at)'" in code
+
+    def test_exclude_partitions(self):
+        include_name = exclude_partitions(
+            Base.metadata, include_name=lambda name, type_, parent_names: name != "skip"
+        )
+        assert include_name("event_p202001", "table", {"schema_name": None}) is False
+        assert include_name("event_p202001", "table", {"schema_name": "other"}) is True
+        assert include_name("event_p202001", "column", {}) is True
+        assert include_name("foo_p202001", "table", {"schema_name": None}) is True
+        assert include_name("skip", "table", {"schema_name": None}) is False
+
+
+@pytest.mark.postgres
+def test_postgres_partitions(pg):
+    now = datetime.now(timezone.utc)
+    created, dropped = maintain_partitions(pg, Event, premake=1)
+    assert created == [
+        partition_name("event", "month", lower)
+        for lower in plan_partitions("event", "month", [], now=now, premake=1)[0]
+    ]
+    assert dropped == []
+
+    pg.add(Event(id=1, name="a", created_at=now))
+    pg.commit()
+    assert pg.query(Event.name).scalar() == "a"
+
+    created, dropped = maintain_partitions(
+        pg, Event, premake=1, retention=timedelta(days=1), now=now + timedelta(days=100)
+    )
+    assert len(dropped) == 2
+    assert pg.query(Event).count() == 0
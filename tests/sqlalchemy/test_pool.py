@@ -0,0 +1,168 @@
+import gc
+import weakref
+
+import pytest
+import sqlalchemy
+from sqlalchemy.pool import QueuePool
+
+from strapp.sqlalchemy.engine import EngineRegistry
+from strapp.sqlalchemy.health import configure_pool_health
+from strapp.sqlalchemy.pool import get_pool_instrumentation, Histogram, instrument_pool
+from strapp.sqlalchemy.profiling import instrument_statements
+from strapp.sqlalchemy.session import create_session_cls
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = sqlalchemy.create_engine(
+        f"sqlite:///{tmp_path / 'foo.db'}",
+        poolclass=QueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.01,
+    )
+    yield engine
+    engine.dispose()
+
+
+class Recorder:
+    def __init__(self):
+        self.increments = []
+        self.gauges = {}
+        self.histograms = []
+
+    def increment(self, metric, tags=None):
+        self.increments.append(metric)
+
+    def gauge(self, metric, value, tags=None):
+        self.gauges[metric] = value
+
+    def histogram(self, metric, value, tags=None):
+        self.histograms.append((metric, value))
+
+
+def test_histogram():
+    histogram = Histogram(buckets=(1, 10))
+    for value in (0.5, 1, 5, 50):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 4
+    assert snapshot["max_ms"] == 50
+    assert snapshot["buckets"] == {"le_1": 2, "le_10": 1, "le_inf": 1}
+
+
+def test_checkout_metrics(engine):
+    recorder = Recorder()
+    instrumentation = instrument_pool(
+        engine,
+        increment=recorder.increment,
+        gauge=recorder.gauge,
+        histogram=recorder.histogram,
+        tags=["env:test"],
+    )
+
+    with engine.connect():
+        assert instrumentation.pool_state()["in_use"] == 1
+        assert recorder.gauges["sqlalchemy.pool.in_use"] == 1
+
+        with engine.connect():
+            assert recorder.gauges["sqlalchemy.pool.overflow"] == 1
+
+    snapshot = instrumentation.snapshot()
+    assert snapshot["checkouts"] == 2
+    assert snapshot["in_use"] == 0
+    assert snapshot["idle"] == 1
+    assert snapshot["checkout_wait"]["count"] == 2
+
+    assert recorder.increments == ["sqlalchemy.pool.checkout", "sqlalchemy.pool.checkout"]
+    assert [metric for metric, _ in recorder.histograms] == ["sqlalchemy.pool.checkout_wait"] * 2
+    assert recorder.gauges["sqlalchemy.pool.in_use"] == 0
+
+
+def test_checkout_timeout(engine):
+    recorder = Recorder()
+    instrumentation = instrument_pool(engine, increment=recorder.increment)
+
+    with engine.connect(), engine.connect():
+        with pytest.raises(sqlalchemy.exc.TimeoutError):
+            engine.connect()
+
+    assert instrumentation.checkout_timeouts == 1
+    assert "sqlalchemy.pool.checkout_timeout" in recorder.increments
+
+
+def test_long_held(engine):
+    reports = []
+
+    def on_long_held(duration, stack):
+        reports.append((duration, stack))
+
+    instrumentation = instrument_pool(engine, long_held_threshold=0, on_long_held=on_long_held)
+
+    with engine.connect():
+        (held,) = instrumentation.long_held()
+        assert "test_long_held" in "".join(held["stack"])
+
+    (report,) = reports
+    assert "test_long_held" in "".join(report[1])
+    assert instrumentation.snapshot()["long_held"] == 1
+
+
+def test_long_held_logs(engine, caplog):
+    instrument_pool(engine, long_held_threshold=0)
+
+    with engine.connect():
+        pass
+
+    assert "Connection held for" in caplog.records[0].message
+
+
+def test_reinstrumented_after_dispose(engine):
+    instrumentation = instrument_pool(engine)
+
+    engine.dispose()
+    with engine.connect():
+        pass
+
+    assert instrumentation.checkout_wait.count == 1
+
+
+def test_instrument_idempotent(engine):
+    instrumentation = instrument_pool(engine)
+    assert instrument_pool(engine) is instrumentation
+    assert get_pool_instrumentation(engine) is instrumentation
+
+
+def test_create_session_cls_pool_metrics(tmp_path):
+    config = {"drivername": "sqlite", "database": str(tmp_path / "foo.db")}
+    Session = create_session_cls(config, registry=EngineRegistry(), pool_metrics={})
+
+    session = Session()
+    session.execute(sqlalchemy.text("select 1"))
+    session.close()
+
+    instrumentation = get_pool_instrumentation(Session.bind)
+    assert instrumentation.checkouts == 1
+
+
+def test_instrumented_engine_is_collected():
+    engine = sqlalchemy.create_engine("sqlite://")
+    instrument_pool(engine)
+    configure_pool_health(engine)
+    instrument_statements(engine)
+    with engine.connect():
+        pass
+
+    ref = weakref.ref(engine)
+    del engine
+    gc.collect()
+    assert ref() is None
+
+
+def test_reinstrument_with_different_arguments_warns(engine):
+    instrumentation = instrument_pool(engine, tags=["a"])
+    assert instrument_pool(engine, tags=["a"]) is instrumentation
+
+    with pytest.warns(UserWarning, match="different arguments"):
+        assert instrument_pool(engine, tags=["b"]) is instrumentation
@@ -0,0 +1,192 @@
+import logging
+from typing import List
+from unittest import mock
+
+import pytest
+import sqlalchemy
+
+from strapp.sqlalchemy.model_base import declarative_base
+from strapp.sqlalchemy.profiling import (
+    _normalize,
+    current_unit_of_work,
+    get_statement_instrumentation,
+    instrument_statements,
+    RepeatedStatementError,
+    RepeatedStatementWarning,
+    unit_of_work,
+)
+from strapp.sqlalchemy.session import create_session_cls
+
+Base = declarative_base()
+
+
+class Foo(Base):
+    __tablename__ = "foo"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+    bars: List["Bar"] = sqlalchemy.orm.relationship("Bar")
+
+
+class Bar(Base):
+    __tablename__ = "bar"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+    foo_id = sqlalchemy.Column(sqlalchemy.types.Integer(), sqlalchemy.ForeignKey("foo.id"))
+
+
+def make_session(**statement_metrics):
+    Session = create_session_cls(
+        {"drivername": "sqlite"}, registry=None, statement_metrics=statement_metrics
+    )
+    session = Session()
+    Base.metadata.create_all(bind=session.connection())
+
+    Foo.bulk_insert(session, [{"id": i} for i in range(5)])
+    Bar.bulk_insert(session, [{"id": i, "foo_id": i} for i in range(5)])
+    return session
+
+
+def load_bars(session):
+    """Lazily load each `Foo.bars`, i.e. an N+1 query."""
+    for foo in session.query(Foo).all():
+        foo.bars
+
+
+def test_counts_statements_per_unit():
+    session = make_session()
+
+    with unit_of_work("example") as unit:
+        assert current_unit_of_work() is unit
+        load_bars(session)
+
+    assert current_unit_of_work() is None
+    assert unit.statements == 6
+    assert sorted(unit.counts.values()) == [1, 5]
+
+
+def test_statements_outside_unit_not_counted():
+    session = make_session()
+    with unit_of_work("example") as unit:
+        pass
+
+    load_bars(session)
+    assert unit.statements == 0
+
+
+def test_repeated_warns():
+    session = make_session(repeat_limit=3)
+
+    with pytest.warns(RepeatedStatementWarning, match="more than 3 times within 'example'"):
+        with unit_of_work("example"):
+            load_bars(session)
+
+    instrumentation = get_statement_instrumentation(session.bind)
+    assert instrumentation.repeated_statements == 1
+
+
+def test_repeated_raises_on_exit():
+    session = make_session(repeat_limit=3, on_repeat="raise")
+
+    with pytest.raises(RepeatedStatementError) as e:
+        with unit_of_work("example"):
+            load_bars(session)
+
+    assert "test_profiling.py" in str(e.value)
+    assert "in load_bars" in str(e.value)
+
+
+def test_repeated_does_not_obscure_other_errors():
+    session = make_session(repeat_limit=3, on_repeat="raise")
+
+    with pytest.raises(ValueError):
+        with unit_of_work("example"):
+            load_bars(session)
+            raise ValueError()
+
+
+def test_eager_load_within_limit():
+    session = make_session(repeat_limit=3, on_repeat="raise")
+
+    with unit_of_work("example"):
+        for foo in session.query(Foo).options(sqlalchemy.orm.selectinload(Foo.bars)):
+            foo.bars
+
+
+def test_repeated_callback():
+    on_repeat = mock.Mock()
+    session = make_session(repeat_limit=4, on_repeat=on_repeat)
+
+    with unit_of_work("example") as unit:
+        load_bars(session)
+
+    on_repeat.assert_called_once()
+    called_unit, statement, count, call_site = on_repeat.call_args.args
+    assert called_unit is unit
+    assert statement.startswith("SELECT bar.id")
+    assert count == 5
+    assert call_site.endswith("in load_bars")
+
+
+def test_slow_statements_logged(caplog):
+    caplog.set_level(logging.WARNING, logger="strapp")
+    session = make_session(slow_threshold=0)
+
+    session.execute(sqlalchemy.text("select :value"), {"value": 5})
+
+    [record] = [r for r in caplog.records if r.name == "strapp.sqlalchemy.profiling"][-1:]
+    assert "Slow statement" in record.message
+    assert "select ?" in record.message
+    assert "parameters: (5,)" in record.message
+    assert "test_profiling.py" in record.message
+
+
+def test_failed_statement_start_cleared():
+    engine = sqlalchemy.create_engine("sqlite://")
+    instrumentation = instrument_statements(engine)
+
+    with engine.connect() as conn:
+        with pytest.raises(sqlalchemy.exc.OperationalError):
+            conn.execute(sqlalchemy.text("select * from missing"))
+
+        assert conn.info["strapp_statement_start"] == []
+        conn.execute(sqlalchemy.text("select 1"))
+
+    assert instrumentation.snapshot()["statements"] == 1
+
+
+def test_metrics():
+    increment = mock.Mock()
+    histogram = mock.Mock()
+    session = make_session(repeat_limit=3, on_repeat=mock.Mock(), **locals())
+
+    with unit_of_work("example"):
+        load_bars(session)
+
+    increment.assert_called_once_with("sqlalchemy.statement.repeated", tags=None)
+    histogram.assert_any_call("sqlalchemy.statement.per_unit", 6, tags=["unit:example"])
+
+
+def test_instrument_idempotent():
+    engine = sqlalchemy.create_engine("sqlite://")
+    instrumentation = instrument_statements(engine)
+    assert instrument_statements(engine) is instrumentation
+
+    with pytest.warns(UserWarning, match="different arguments"):
+        assert instrument_statements(engine, repeat_limit=1) is instrumentation
+
+
+def test_invalid_on_repeat():
+    with pytest.raises(ValueError):
+        instrument_statements(sqlalchemy.create_engine("sqlite://"), on_repeat="explode")
+
+
+@pytest.mark.parametrize(
+    "statement, normalized",
+    [
+        ("select *\n  from foo where id = 5", "select * from foo where id = ?"),
+        ("select * from foo where name = 'it''s'", "select * from foo where name = ?"),
+        ("select * from foo where id IN (?, ?, ?)", "select * from foo where id IN (?)"),
+        ("select * from foo where id IN (%(id_1)s, %(id_2)s)", "select * from foo where id IN (?)"),
+        ("select * from foo1 where id = $1", "select * from foo1 where id = $1"),
+    ],
+)
+def test_normalize(statement, normalized):
+    assert _normalize(statement) == normalized
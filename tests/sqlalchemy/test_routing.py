@@ -0,0 +1,116 @@
+import pytest
+import sqlalchemy
+
+from strapp.sqlalchemy.model_base import declarative_base
+from strapp.sqlalchemy.routing import create_routing_session_cls
+
+Base = declarative_base()
+
+
+class Foo(Base):
+    __tablename__ = "foo"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+    source = sqlalchemy.Column(sqlalchemy.types.Unicode())
+
+
+@pytest.fixture
+def configs(tmp_path):
+    primary = {"drivername": "sqlite", "database": str(tmp_path / "primary.db")}
+    replicas = [
+        {"drivername": "sqlite", "database": str(tmp_path / f"replica{i}.db")} for i in range(2)
+    ]
+
+    # Seed each database with a row identifying it, in order to observe the routing.
+    for name, config in [
+        ("primary", primary),
+        ("replica0", replicas[0]),
+        ("replica1", replicas[1]),
+    ]:
+        engine = sqlalchemy.create_engine(f"sqlite:///{config['database']}")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(Foo.__table__.insert().values(id=1, source=name))
+        engine.dispose()
+
+    return primary, replicas
+
+
+def source(session):
+    return session.query(Foo.source).filter(Foo.id == 1).scalar()
+
+
+def test_reads_round_robin_replicas(configs):
+    primary, replicas = configs
+    Session = create_routing_session_cls(primary, replicas, registry=None)
+    session = Session()
+
+    assert [source(session) for _ in range(4)] == ["replica0", "replica1"] * 2
+
+
+def test_no_replicas(configs):
+    primary, _ = configs
+    Session = create_routing_session_cls(primary, registry=None)
+    session = Session()
+
+    assert source(session) == "primary"
+
+
+def test_writes_go_to_primary(configs):
+    primary, replicas = configs
+    Session = create_routing_session_cls(primary, replicas, registry=None, sticky_seconds=0)
+    session = Session()
+
+    session.add(Foo(id=2, source="new"))
+    session.flush()
+
+    # Having flushed, reads within the transaction must observe the write.
+    assert session.query(Foo.source).filter(Foo.id == 2).scalar() == "new"
+    session.commit()
+
+    # With no stickiness, reads go back to the replicas after the commit.
+    assert session.query(Foo.source).filter(Foo.id == 2).scalar() is None
+
+
+def test_sticky_after_commit(configs):
+    primary, replicas = configs
+    Session = create_routing_session_cls(primary, replicas, registry=None, sticky_seconds=60)
+    session = Session()
+
+    session.add(Foo(id=2, source="new"))
+    session.commit()
+
+    assert session.query(Foo.source).filter(Foo.id == 2).scalar() == "new"
+
+
+def test_rollback_resets_writes(configs):
+    primary, replicas = configs
+    Session = create_routing_session_cls(primary, replicas, registry=None, sticky_seconds=60)
+    session = Session()
+
+    session.add(Foo(id=2, source="new"))
+    session.flush()
+    session.rollback()
+
+    assert source(session) == "replica0"
+
+
+def test_using_primary(configs):
+    primary, replicas = configs
+    Session = create_routing_session_cls(primary, replicas, registry=None)
+    session = Session()
+
+    with session.using_primary():
+        assert source(session) == "primary"
+    assert source(session) == "replica0"
+
+
+def test_text_and_for_update_go_to_primary(configs):
+    primary, replicas = configs
+    Session = create_routing_session_cls(primary, replicas, registry=None)
+    session = Session()
+
+    result = session.execute(sqlalchemy.text("select source from foo where id = 1")).scalar()
+    assert result == "primary"
+
+    result = session.query(Foo.source).filter(Foo.id == 1).with_for_update().scalar()
+    assert result == "primary"
@@ -0,0 +1,117 @@
+import gc
+import weakref
+from datetime import datetime
+
+import pytest
+import sqlalchemy
+from sqlalchemy.orm import deferred
+
+from strapp.sqlalchemy.model_base import declarative_base
+from strapp.sqlalchemy.serialize import _plans, to_dict, to_dicts
+
+Base = declarative_base()
+
+
+class Foo(Base, created_at=True):
+    __tablename__ = "foo"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+    name = sqlalchemy.Column("full_name", sqlalchemy.types.Unicode())
+    body = deferred(sqlalchemy.Column(sqlalchemy.types.Unicode()))
+
+
+class Bar(Base):
+    __tablename__ = "bar"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+
+@pytest.fixture
+def session(sqlite):
+    Base.metadata.create_all(bind=sqlite.connection())
+    sqlite.add_all(
+        [Foo(id=i, name=str(i), body="x" * i, created_at=datetime(2020, 1, 1)) for i in range(3)]
+    )
+    sqlite.commit()
+    return sqlite
+
+
+def test_attribute_names(session):
+    foo = session.query(Foo).filter(Foo.id == 1).one()
+    assert foo.to_dict() == {"id": 1, "name": "1", "created_at": datetime(2020, 1, 1)}
+
+
+def test_deferred_not_loaded(session):
+    foos = session.query(Foo).order_by(Foo.id).all()
+
+    statements = []
+    sqlalchemy.event.listen(
+        session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2])
+    )
+
+    result = to_dicts(foos)
+    assert [row["id"] for row in result] == [0, 1, 2]
+    assert "body" not in result[0]
+    assert statements == []
+
+
+def test_deferred_included(session):
+    foos = session.query(Foo).order_by(Foo.id).all()
+    assert to_dicts(foos, include={"id", "body"}) == [
+        {"id": 0, "body": ""},
+        {"id": 1, "body": "x"},
+        {"id": 2, "body": "xx"},
+    ]
+
+
+def test_deferred_loaded(session):
+    foo = session.query(Foo).options(sqlalchemy.orm.undefer(Foo.body)).filter(Foo.id == 2).one()
+    assert to_dict(foo, exclude=["created_at"]) == {"id": 2, "name": "2", "body": "xx"}
+
+
+def test_expired(session):
+    foo = session.query(Foo).filter(Foo.id == 1).one()
+    session.commit()
+
+    assert "id" not in foo.__dict__
+    assert to_dict(foo, include=["id"]) == {"id": 1}
+
+
+def test_mixed_classes():
+    assert to_dicts(
+        [Foo(id=1), Bar(id=2), Bar(id=3), Foo(id=4)], exclude={"name", "created_at"}
+    ) == [
+        {"id": 1},
+        {"id": 2},
+        {"id": 3},
+        {"id": 4},
+    ]
+
+
+def test_unknown_include():
+    with pytest.raises(ValueError):
+        to_dict(Foo(id=1), include=["full_name"])
+
+
+def test_unknown_exclude():
+    with pytest.raises(ValueError):
+        to_dict(Foo(id=1), exclude=["full_name"])
+
+
+def test_mixed_classes_unknown():
+    with pytest.raises(ValueError, match="Bar or Foo has no columns named"):
+        to_dicts([Foo(id=1), Bar(id=2)], exclude={"name", "full_name"})
+
+
+def test_plans_do_not_keep_classes_alive():
+    LocalBase = declarative_base()
+
+    class Baz(LocalBase):
+        __tablename__ = "baz"
+        id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+    assert to_dict(Baz(id=1)) == {"id": 1}
+    assert Baz in _plans
+
+    ref = weakref.ref(Baz)
+    del Baz, LocalBase
+    gc.collect()
+    assert ref() is None
@@ -1,3 +1,4 @@
+import pytest
 import sqlalchemy
 from sqlalchemy.orm.session import Session
 
@@ -114,3 +115,61 @@ def test_DryRunSession_commit_logs(caplog):
 
     session.commit()
     assert len(caplog.records) == 2
+
+
+class Test_DryRunSession_savepoint:
+    @staticmethod
+    def count(tmp_path):
+        engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}")
+        try:
+            with engine.connect() as conn:
+                return conn.execute(sqlalchemy.text("select count(*) from foo")).scalar()
+        finally:
+            engine.dispose()
+
+    @pytest.fixture
+    def config(self, tmp_path):
+        config = {"drivername": "sqlite", "database": str(tmp_path / "db.sqlite")}
+        engine = sqlalchemy.create_engine(sqlalchemy.engine.URL.create(**config))
+        Base.metadata.create_all(bind=engine)
+        engine.dispose()
+        return config
+
+    def test_commit_releases_savepoint(self, config, tmp_path):
+        with create_session(config, dry_run=True, savepoint=True) as session:
+            session.add(Foo(id=1))
+            session.commit()
+
+            session.add(Foo(id=2))
+            session.rollback()
+
+            assert session.query(Foo.id).all() == [(1,)]
+
+        assert self.count(tmp_path) == 0
+
+    def test_close_rolls_back(self, config, tmp_path):
+        session = create_session(config, dry_run=True, savepoint=True)
+        session.add(Foo(id=1))
+        session.commit()
+        session.close()
+
+        assert self.count(tmp_path) == 0
+
+    def test_failed_flush(self, config):
+        with create_session(config, dry_run=True, savepoint=True) as session:
+            session.add(Foo(id=1))
+            session.commit()
+
+            session.add(Foo(id=1))
+            with pytest.raises(sqlalchemy.exc.IntegrityError):
+                session.commit()
+            session.rollback()
+
+            assert session.query(Foo.id).all() == [(1,)]
+
+    def test_without_savepoint_context_rolls_back(self, config, tmp_path):
+        with create_session(config, dry_run=True) as session:
+            session.add(Foo(id=1))
+            session.commit()
+
+        assert self.count(tmp_path) == 0
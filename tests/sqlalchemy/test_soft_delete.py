@@ -0,0 +1,212 @@
+from datetime import datetime
+from typing import List
+
+import pytest
+import sqlalchemy
+from sqlalchemy.dialects import postgresql
+
+from strapp.sqlalchemy.cache import cached, QueryCache
+from strapp.sqlalchemy.model_base import declarative_base, DeletedAt
+from strapp.sqlalchemy.session import create_session_cls
+from strapp.sqlalchemy.soft_delete import include_deleted, install_soft_delete
+
+Base = declarative_base(partial_indexes=True)
+
+
+class Foo(Base, deleted_at=True):
+    __tablename__ = "foo"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+    name = sqlalchemy.Column(sqlalchemy.types.Unicode(), unique=True)
+    kind = sqlalchemy.Column(sqlalchemy.types.Unicode(), index=True)
+
+    bars: List["Bar"] = sqlalchemy.orm.relationship("Bar", back_populates="foo")
+
+    __mapper_args__ = {"polymorphic_on": kind, "polymorphic_identity": "foo"}
+
+
+class SubFoo(Foo):
+    __mapper_args__ = {"polymorphic_identity": "sub"}
+
+
+class Bar(Base, deleted_at=True):
+    __tablename__ = "bar"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+    foo_id = sqlalchemy.Column(sqlalchemy.types.Integer(), sqlalchemy.ForeignKey("foo.id"))
+
+    foo: Foo = sqlalchemy.orm.relationship("Foo", back_populates="bars")
+
+
+class Baz(Base):
+    __tablename__ = "baz"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+    name = sqlalchemy.Column(sqlalchemy.types.Unicode(), unique=True)
+
+
+deleted = datetime(2020, 1, 1)
+
+
+@pytest.fixture
+def session(sqlite):
+    install_soft_delete(sqlite)
+    Base.metadata.create_all(bind=sqlite.connection())
+
+    sqlite.add_all(
+        [
+            Foo(id=1, name="a", bars=[Bar(id=1), Bar(id=2, deleted_at=deleted)]),
+            Foo(id=2, name="b", deleted_at=deleted),
+            SubFoo(id=3, name="c"),
+            SubFoo(id=4, name="d", deleted_at=deleted),
+            Baz(id=1),
+        ]
+    )
+    sqlite.commit()
+    sqlite.expunge_all()
+    return sqlite
+
+
+def test_query_excludes_deleted(session):
+    assert [foo.id for foo in session.query(Foo).order_by(Foo.id)] == [1, 3]
+    assert [foo.id for foo in session.query(SubFoo)] == [3]
+    assert session.query(Baz).count() == 1
+
+
+def test_select_excludes_deleted(session):
+    ids = session.execute(sqlalchemy.select(Foo.id).order_by(Foo.id)).scalars().all()
+    assert ids == [1, 3]
+
+
+def test_include_deleted(session):
+    assert include_deleted(session.query(Foo)).count() == 4
+
+    statement = sqlalchemy.select(Foo.id)
+    assert len(session.execute(include_deleted(statement)).all()) == 4
+    assert len(session.execute(statement, execution_options={"include_deleted": True}).all()) == 4
+
+
+def test_relationships(session):
+    foo = session.query(Foo).filter(Foo.id == 1).one()
+    assert [bar.id for bar in foo.bars] == [1]
+
+    foo = (
+        session.query(Foo).options(sqlalchemy.orm.selectinload(Foo.bars)).filter(Foo.id == 1).one()
+    )
+    assert [bar.id for bar in foo.bars] == [1]
+
+
+def test_joins(session):
+    rows = session.query(Foo.id, Bar.id).join(Foo.bars).all()
+    assert rows == [(1, 1)]
+
+    alias = sqlalchemy.orm.aliased(Foo)
+    assert session.query(alias).count() == 2
+
+
+def test_get_and_refresh(session):
+    assert session.get(Foo, 2) is None
+
+    foo = include_deleted(session.query(Foo)).filter(Foo.id == 2).one()
+    session.refresh(foo)
+    assert foo.deleted_at == deleted
+    assert session.get(Foo, 2) is foo
+
+
+def test_bulk_update_unaffected(session):
+    session.query(Foo).update({"deleted_at": None})
+    assert session.query(Foo).count() == 4
+
+
+def test_query_cache_keys_upon_criteria():
+    Session = create_session_cls(
+        {"drivername": "sqlite"}, registry=None, soft_delete=True, query_cache=QueryCache()
+    )
+    session = Session()
+    Base.metadata.create_all(bind=session.connection())
+    session.add_all([Foo(id=1), Foo(id=2, deleted_at=deleted)])
+    session.flush()
+
+    assert cached(session.query(Foo)).count() == 1
+    assert include_deleted(cached(session.query(Foo))).count() == 2
+
+
+def test_not_installed():
+    Session = create_session_cls({"drivername": "sqlite"}, registry=None)
+    session = Session()
+    Base.metadata.create_all(bind=session.connection())
+    session.add_all([Foo(id=1), Foo(id=2, deleted_at=deleted)])
+    session.flush()
+
+    assert session.query(Foo).count() == 2
+
+
+def test_marker():
+    assert issubclass(Foo, DeletedAt)
+    assert issubclass(SubFoo, DeletedAt)
+    assert not issubclass(Baz, DeletedAt)
+
+
+class Test_partial_indexes:
+    def compile(self, table):
+        dialect = postgresql.dialect()
+        return sorted(
+            str(sqlalchemy.schema.CreateIndex(index).compile(dialect=dialect))
+            for index in table.indexes
+        )
+
+    def test_indexes(self):
+        assert self.compile(Foo.__table__) == [
+            "CREATE INDEX ix_foo_kind ON foo (kind) WHERE deleted_at IS NULL",
+            "CREATE UNIQUE INDEX ix_foo_name ON foo (name) WHERE deleted_at IS NULL",
+        ]
+        assert not [
+            constraint
+            for constraint in Foo.__table__.constraints
+            if isinstance(constraint, sqlalchemy.UniqueConstraint)
+        ]
+
+    def test_non_deleted_at_untouched(self):
+        assert self.compile(Baz.__table__) == []
+        assert [
+            constraint
+            for constraint in Baz.__table__.constraints
+            if isinstance(constraint, sqlalchemy.UniqueConstraint)
+        ]
+
+    def test_table_args(self):
+        Base = declarative_base(partial_indexes=True)
+
+        class Foo(Base, deleted_at=True):
+            __tablename__ = "foo"
+            id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+            a = sqlalchemy.Column(sqlalchemy.types.Integer())
+            b = sqlalchemy.Column(sqlalchemy.types.Integer())
+
+            __table_args__ = (
+                sqlalchemy.UniqueConstraint("a", "b", name="uq_a_b"),
+                sqlalchemy.Index("ix_b", "b", postgresql_where=sqlalchemy.text("b > 0")),
+                sqlalchemy.Index("ix_deleted_at", "deleted_at"),
+            )
+
+        assert self.compile(Foo.__table__) == [
+            "CREATE INDEX ix_b ON foo (b) WHERE b > 0",
+            "CREATE INDEX ix_deleted_at ON foo (deleted_at)",
+            "CREATE UNIQUE INDEX uq_a_b ON foo (a, b) WHERE deleted_at IS NULL",
+        ]
+
+    def test_opt_out(self):
+        Base = declarative_base(partial_indexes=True)
+
+        class Foo(Base, deleted_at=True):
+            __tablename__ = "foo"
+            __partial_indexes__ = False
+            id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+            a = sqlalchemy.Column(sqlalchemy.types.Integer(), index=True)
+
+        assert self.compile(Foo.__table__) == ["CREATE INDEX ix_foo_a ON foo (a)"]
+
+    def test_deleted_values_reusable(self, session):
+        session.add(Foo(id=5, name="b"))
+        session.flush()
+
+        session.add(Foo(id=6, name="a"))
+        with pytest.raises(sqlalchemy.exc.IntegrityError):
+            session.flush()
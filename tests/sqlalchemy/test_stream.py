@@ -0,0 +1,113 @@
+from datetime import datetime
+
+import pytest
+import sqlalchemy
+
+from strapp.sqlalchemy.model_base import declarative_base
+from strapp.sqlalchemy.stream import stream
+
+Base = declarative_base()
+
+
+class Foo(Base, created_at=True):
+    __tablename__ = "foo"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+    value = sqlalchemy.Column(sqlalchemy.types.Integer())
+
+
+@pytest.fixture
+def session(sqlite):
+    Base.metadata.create_all(bind=sqlite.connection())
+
+    # Insert out of primary key order, with `created_at` ties.
+    rows = [
+        {"id": id, "value": id % 2, "created_at": datetime(2020, 1, 1 + id // 3)}
+        for id in [7, 3, 1, 9, 5, 2, 8, 4, 6]
+    ]
+    Foo.bulk_insert(sqlite, rows)
+    return sqlite
+
+
+def test_primary_key_order(session):
+    assert [foo.id for foo in stream(session.query(Foo), chunk_size=2)] == list(range(1, 10))
+
+
+def test_filtered(session):
+    query = session.query(Foo).filter(Foo.value == 1).order_by(Foo.value.desc())
+    assert [foo.id for foo in stream(query, chunk_size=2)] == [1, 3, 5, 7, 9]
+
+
+def test_chunks(session):
+    chunks = stream(session.query(Foo), chunk_size=4).chunks()
+    assert [[foo.id for foo in chunk] for chunk in chunks] == [[1, 2, 3, 4], [5, 6, 7, 8], [9]]
+
+
+def test_exact_multiple_of_chunk_size(session):
+    chunks = list(stream(session.query(Foo), chunk_size=3).chunks())
+    assert len(chunks) == 3
+
+
+def test_composite_key_with_ties(session):
+    rows = stream(session.query(Foo), key=[Foo.created_at, Foo.id], chunk_size=2)
+    result = [(foo.created_at.day, foo.id) for foo in rows]
+
+    assert result == sorted(result)
+    assert len(result) == 9
+    assert rows.cursor == (datetime(2020, 1, 4), 9)
+
+
+def test_column_rows(session):
+    rows = stream(session.query(Foo.id, Foo.value), key=[Foo.id], chunk_size=4)
+    assert [row.id for row in rows] == list(range(1, 10))
+
+
+def test_resume(session):
+    rows = stream(session.query(Foo), chunk_size=2)
+    iterator = iter(rows)
+    assert [next(iterator).id for _ in range(3)] == [1, 2, 3]
+    assert rows.cursor == (3,)
+
+    resumed = stream(session.query(Foo), chunk_size=2, cursor=rows.cursor)
+    assert [foo.id for foo in resumed] == list(range(4, 10))
+
+
+def test_expunge(session):
+    chunks = stream(session.query(Foo), chunk_size=4).chunks()
+
+    first = next(chunks)
+    assert all(foo in session for foo in first)
+
+    second = next(chunks)
+    assert not any(foo in session for foo in first)
+    assert all(foo in session for foo in second)
+
+
+def test_expunge_rows(session):
+    seen = []
+    for foo in stream(session.query(Foo), chunk_size=4):
+        assert foo in session
+        seen.append(foo)
+
+    assert not any(foo in session for foo in seen)
+
+
+def test_no_expunge(session):
+    seen = list(stream(session.query(Foo), chunk_size=4, expunge=False))
+    assert all(foo in session for foo in seen)
+
+
+def test_keyset_queries(session):
+    statements = []
+
+    @sqlalchemy.event.listens_for(session.bind, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, *args):
+        statements.append((statement, parameters))
+
+    list(stream(session.query(Foo), chunk_size=4))
+
+    assert len(statements) == 3
+    assert "foo.id >" not in statements[0][0]
+    assert "foo.id >" in statements[1][0]
+
+    # Each page seeks past the previous page's last key, rather than offsetting.
+    assert [parameters[0] for _, parameters in statements[1:]] == [4, 8]
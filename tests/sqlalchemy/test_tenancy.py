@@ -0,0 +1,221 @@
+import threading
+
+import pytest
+import sqlalchemy
+
+from strapp.sqlalchemy.engine import EngineRegistry
+from strapp.sqlalchemy.model_base import declarative_base
+from strapp.sqlalchemy.tenancy import create_tenant_session_cls, NoTenantError, tenant
+
+Base = declarative_base()
+
+
+class Foo(Base):
+    __tablename__ = "foo"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+    source = sqlalchemy.Column(sqlalchemy.types.Unicode())
+
+
+def seed(path, name):
+    engine = sqlalchemy.create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(Foo.__table__.insert().values(id=1, source=name))
+    engine.dispose()
+
+
+@pytest.fixture
+def schemas(tmp_path):
+    """Produce a config whose connections have a (sqlite) schema per tenant attached."""
+    config = {"drivername": "sqlite", "database": str(tmp_path / "main.db")}
+    seed(tmp_path / "main.db", "main")
+    for name in ["a", "b"]:
+        seed(tmp_path / f"{name}.db", name)
+
+    registry = EngineRegistry()
+
+    @sqlalchemy.event.listens_for(registry.get(config), "connect")
+    def attach(dbapi_connection, connection_record):
+        for name in ["a", "b"]:
+            dbapi_connection.execute(f"ATTACH DATABASE '{tmp_path / name}.db' AS tenant_{name}")
+
+    yield config, registry
+    registry.dispose()
+
+
+@pytest.fixture
+def databases(tmp_path):
+    configs = {}
+    for name in ["a", "b", "c"]:
+        seed(tmp_path / f"{name}.db", name)
+        configs[name] = {"drivername": "sqlite", "database": str(tmp_path / f"{name}.db")}
+    return configs
+
+
+def source(session):
+    return session.query(Foo.source).filter(Foo.id == 1).scalar()
+
+
+def test_routes_to_tenant_schema(schemas):
+    config, registry = schemas
+    Session = create_tenant_session_cls(
+        config, schema=lambda key: f"tenant_{key}", registry=registry
+    )
+
+    with tenant("a"):
+        assert source(Session()) == "a"
+    with tenant("b"):
+        assert source(Session()) == "b"
+    with tenant("a"):
+        assert source(Session()) == "a"
+
+
+def test_schemas_share_one_pool(schemas):
+    config, registry = schemas
+    Session = create_tenant_session_cls(
+        config, schema=lambda key: f"tenant_{key}", registry=registry
+    )
+    router = Session.session_factory
+
+    engine_a = router.sessionmaker("a").kw["bind"]
+    engine_b = router.sessionmaker("b").kw["bind"]
+    assert engine_a is not engine_b
+    assert engine_a.pool is engine_b.pool is registry.get(config).pool
+
+
+def test_scoped_per_tenant(schemas):
+    config, registry = schemas
+    Session = create_tenant_session_cls(
+        config, schema=lambda key: f"tenant_{key}", registry=registry
+    )
+
+    with tenant("a"):
+        session_a = Session()
+        assert Session() is session_a
+        with tenant("b"):
+            assert Session() is not session_a
+        assert Session() is session_a
+
+        Session.remove()
+        assert Session() is not session_a
+
+
+def test_tenant_is_context_local(schemas):
+    config, registry = schemas
+    Session = create_tenant_session_cls(
+        config, schema=lambda key: f"tenant_{key}", registry=registry
+    )
+
+    result = []
+
+    def run():
+        with tenant("b"):
+            result.append(source(Session()))
+            Session.remove()
+
+    with tenant("a"):
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+        assert source(Session()) == "a"
+
+    assert result == ["b"]
+
+
+def test_no_tenant(schemas):
+    config, registry = schemas
+    Session = create_tenant_session_cls(config, registry=registry)
+
+    with pytest.raises(NoTenantError):
+        Session()
+
+
+def test_routes_to_tenant_database(tmp_path, databases):
+    default = {"drivername": "sqlite", "database": str(tmp_path / "main.db")}
+    seed(tmp_path / "main.db", "main")
+
+    Session = create_tenant_session_cls(default, database=databases.get)
+
+    with tenant("a"):
+        assert source(Session()) == "a"
+    with tenant("c"):
+        assert source(Session()) == "c"
+    with tenant("other"):
+        assert source(Session()) == "main"
+
+
+def test_lru_eviction_disposes_unused_databases(databases):
+    registry = EngineRegistry()
+    Session = create_tenant_session_cls(
+        databases["a"], database=databases.get, max_tenants=2, registry=registry
+    )
+    router = Session.session_factory
+
+    router.sessionmaker("a")
+    router.sessionmaker("b")
+    router.sessionmaker("a")
+    assert router.tenants() == ["b", "a"]
+
+    engine_b = registry.get(databases["b"])
+    router.sessionmaker("c")
+    assert router.tenants() == ["a", "c"]
+
+    # "b"'s engine was disposed and unregistered, so a new one is created.
+    assert registry.get(databases["b"]) is not engine_b
+    registry.dispose()
+
+
+def test_eviction_keeps_shared_databases(databases):
+    registry = EngineRegistry()
+    Session = create_tenant_session_cls(
+        databases["a"],
+        database=lambda key: databases["c" if key == 3 else "b"],
+        max_tenants=2,
+        registry=registry,
+    )
+    router = Session.session_factory
+
+    engine = router.sessionmaker(1).kw["bind"]
+    assert router.sessionmaker(2).kw["bind"] is engine
+
+    # Evicting 1 leaves its database in use by 2.
+    router.sessionmaker(3)
+    assert router.tenants() == [2, 3]
+    assert registry.get(databases["b"]) is engine
+    registry.dispose()
+
+
+def test_eviction_keeps_unowned_engines(databases):
+    registry = EngineRegistry()
+    shared = registry.get(databases["b"])
+    Session = create_tenant_session_cls(
+        databases["a"], database=databases.get, max_tenants=1, registry=registry
+    )
+    router = Session.session_factory
+
+    # "a" resolves to the default config, and "b" was registered before the router used it.
+    default = router.sessionmaker("a").kw["bind"]
+    router.sessionmaker("b")
+    router.sessionmaker("c")
+    assert router.tenants() == ["c"]
+
+    assert registry.get(databases["a"]) is default
+    assert registry.get(databases["b"]) is shared
+    registry.dispose()
+
+
+def test_engines_created_under_lock(databases):
+    router = None
+    locked = []
+
+    def database(key):
+        locked.append(router._lock.locked())
+        return databases[key]
+
+    Session = create_tenant_session_cls(databases["a"], database=database, max_tenants=1)
+    router = Session.session_factory
+
+    router.sessionmaker("a")
+    router.sessionmaker("b")
+    assert locked == [True, True]
+    router.dispose()
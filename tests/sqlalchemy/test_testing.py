@@ -2,7 +2,14 @@ import pytest
 import sqlalchemy
 from sqlalchemy.orm import registry
 
-from strapp.sqlalchemy.testing import assert_equals, assert_equals_factory
+from strapp.sqlalchemy.model_base import declarative_base
+from strapp.sqlalchemy.testing import (
+    _comparison_plan,
+    assert_equals,
+    assert_equals_factory,
+    assert_rows_equal,
+    create_savepoint_fixture,
+)
 
 
 class Test_assert_equals:
@@ -139,3 +146,117 @@ class Test_assert_equals:
         with pytest.raises(ValueError) as e:
             assert_equals(a, a, exclude=["wat"])
         assert "wat" in str(e.value)
+
+
+savepoint_base = declarative_base()
+
+
+class Bar(savepoint_base):
+    __tablename__ = "bar"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    path = tmp_path_factory.mktemp("savepoint") / "db.sqlite"
+    engine = sqlalchemy.create_engine(f"sqlite:///{path}")
+    yield engine
+    engine.dispose()
+
+
+savepoint_db = create_savepoint_fixture("engine", metadata=savepoint_base.metadata)
+
+
+class Test_create_savepoint_fixture:
+    @pytest.mark.parametrize("id", [1, 2])
+    def test_isolated(self, savepoint_db, id):
+        assert savepoint_db.query(Bar).count() == 0
+
+        savepoint_db.add(Bar(id=id))
+        savepoint_db.commit()
+        assert savepoint_db.query(Bar.id).all() == [(id,)]
+
+
+class Baz(savepoint_base):
+    __tablename__ = "baz"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+    name = sqlalchemy.Column(sqlalchemy.types.Unicode())
+    data = sqlalchemy.Column(sqlalchemy.types.JSON())
+
+
+class Test_assert_rows_equal:
+    def test_unordered(self):
+        rows = [Baz(id=i, name=str(i)) for i in range(1000)]
+        expected = [Baz(id=i, name=str(i)) for i in reversed(range(1000))]
+        assert_rows_equal(rows, expected)
+
+        with pytest.raises(AssertionError):
+            assert_rows_equal(rows, expected, ordered=True)
+
+    def test_duplicates(self):
+        rows = [Baz(id=1, name="a"), Baz(id=1, name="a")]
+        with pytest.raises(AssertionError) as e:
+            assert_rows_equal(rows, [(None, 1, "a")])
+        assert "unexpected: Baz(data=None, id=1, name='a')" in str(e.value)
+
+    def test_column_diff(self):
+        rows = [Baz(id=1, name="a"), Baz(id=2, name="b"), Baz(id=3, name="c")]
+        expected = [(None, 1, "a"), (None, 2, "x"), (None, 4, "d")]
+
+        with pytest.raises(AssertionError) as e:
+            assert_rows_equal(rows, expected)
+
+        assert str(e.value).splitlines() == [
+            "3 mismatches between the 3 rows and the 3 expected rows:",
+            "  Baz(id=2): name='b' != 'x'",
+            "  unexpected: Baz(data=None, id=3, name='c')",
+            "  missing: (None, 4, 'd')",
+        ]
+
+    def test_mismatch_count(self):
+        rows = [Baz(id=i, name="a") for i in range(5)]
+        expected = [(None, i, "b" if i == 2 else "a") for i in range(5)]
+
+        with pytest.raises(AssertionError) as e:
+            assert_rows_equal(rows, expected)
+        assert (
+            str(e.value).splitlines()[0] == "1 mismatch between the 5 rows and the 5 expected rows:"
+        )
+
+    def test_ordered(self):
+        rows = [Baz(id=1, name="a"), Baz(id=2, name="b")]
+
+        with pytest.raises(AssertionError) as e:
+            assert_rows_equal(rows, [(None, 1, "a"), (None, 2, "x"), (None, 3, "c")], ordered=True)
+
+        assert str(e.value).splitlines()[1:] == [
+            "  [1] Baz(id=2): name='b' != 'x'",
+            "  [2] missing: (None, 3, 'c')",
+        ]
+
+    def test_unhashable(self):
+        rows = [Baz(id=1, data={"a": 1}), Baz(id=2, data=[1])]
+        assert_rows_equal(rows, [Baz(id=2, data=[1]), Baz(id=1, data={"a": 1})])
+
+        with pytest.raises(AssertionError) as e:
+            assert_rows_equal(rows, [Baz(id=2, data=[2]), Baz(id=1, data={"a": 1})])
+        assert "Baz(id=2): data=[1] != [2]" in str(e.value)
+
+    def test_include_exclude(self):
+        rows = [Baz(id=1, name="a", data=1)]
+        assert_rows_equal(rows, [(1, "a")], exclude=["data"])
+        assert_rows_equal(rows, [("a",)], include=["name"])
+
+    def test_max_diffs(self):
+        rows = [Baz(id=i) for i in range(20)]
+        with pytest.raises(AssertionError) as e:
+            assert_rows_equal(rows, [], max_diffs=3)
+
+        lines = str(e.value).splitlines()
+        assert len(lines) == 5
+        assert lines[-1] == "  ... and 17 more"
+
+    def test_plan_cached(self):
+        plan = _comparison_plan(Baz, exclude=["data"])
+        assert _comparison_plan(Baz, exclude={"data"}) is plan
+        assert _comparison_plan(Baz) is not plan
@@ -0,0 +1,143 @@
+from datetime import datetime
+
+import pytest
+import sqlalchemy
+from alembic.autogenerate import produce_migrations, render_python_code
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from strapp.sqlalchemy.alembic import CreateUpdatedAtTriggerOp, DropUpdatedAtTriggerOp
+from strapp.sqlalchemy.model_base import declarative_base
+from strapp.sqlalchemy.timestamps import create_trigger_ddl, has_trigger
+
+Base = declarative_base()
+
+
+class Foo(Base, updated_at="server"):
+    __tablename__ = "foo"
+    id = sqlalchemy.Column(sqlalchemy.types.Integer(), primary_key=True)
+    name = sqlalchemy.Column(sqlalchemy.types.Unicode())
+
+
+@pytest.fixture
+def session(sqlite):
+    Base.metadata.create_all(bind=sqlite.connection())
+
+    sqlite.add_all([Foo(id=1, name="a"), Foo(id=2, name="b")])
+    sqlite.commit()
+    return sqlite
+
+
+def test_null_until_updated(session):
+    assert session.get(Foo, 1).updated_at is None
+
+
+def test_orm_update(session):
+    foo = session.get(Foo, 1)
+    statements = []
+
+    @sqlalchemy.event.listens_for(session.bind, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, *args):
+        statements.append((statement, parameters))
+
+    foo.name = "c"
+    session.flush()
+
+    assert statements[0] == ("UPDATE foo SET name=? WHERE foo.id = ?", ("c", 1))
+    assert isinstance(foo.updated_at, datetime)
+    assert session.get(Foo, 2).updated_at is None
+
+
+def test_bulk_update(session):
+    session.query(Foo).update({"name": "c"})
+    session.execute(sqlalchemy.update(Foo).where(Foo.id == 1).values(name="d"))
+    session.expire_all()
+
+    assert all(foo.updated_at is not None for foo in session.query(Foo))
+
+
+def test_explicit_value_kept(session):
+    foo = session.get(Foo, 1)
+    foo.updated_at = datetime(2020, 1, 1)
+    session.flush()
+    session.expire_all()
+
+    assert foo.updated_at == datetime(2020, 1, 1)
+
+
+def test_unsupported_dialect():
+    with pytest.raises(NotImplementedError):
+        create_trigger_ddl("mysql", "foo")
+
+
+def test_postgresql_ddl():
+    function, trigger = create_trigger_ddl("postgresql", "foo", schema="bar")
+    assert "CREATE OR REPLACE FUNCTION strapp_set_updated_at()" in function
+    assert trigger == (
+        "CREATE TRIGGER foo_set_updated_at BEFORE UPDATE ON bar.foo FOR EACH ROW "
+        "EXECUTE PROCEDURE strapp_set_updated_at()"
+    )
+
+
+class Test_alembic:
+    def diff(self, connection, metadata):
+        context = MigrationContext.configure(connection)
+        migrations = produce_migrations(context, metadata)
+        return [
+            op
+            for table_ops in migrations.upgrade_ops.ops
+            for op in getattr(table_ops, "ops", [])
+            if isinstance(op, (CreateUpdatedAtTriggerOp, DropUpdatedAtTriggerOp))
+        ]
+
+    def test_in_sync(self):
+        engine = sqlalchemy.create_engine("sqlite://")
+        with engine.begin() as connection:
+            Base.metadata.create_all(bind=connection)
+            assert self.diff(connection, Base.metadata) == []
+
+    def test_new_table(self):
+        engine = sqlalchemy.create_engine("sqlite://")
+        with engine.begin() as connection:
+            [op] = self.diff(connection, Base.metadata)
+
+        assert isinstance(op, CreateUpdatedAtTriggerOp)
+        assert op.table_name == "foo"
+
+    def test_missing_trigger(self):
+        engine = sqlalchemy.create_engine("sqlite://")
+        with engine.begin() as connection:
+            connection.execute(
+                sqlalchemy.text("CREATE TABLE foo (id INTEGER, updated_at DATETIME)")
+            )
+
+            context = MigrationContext.configure(connection)
+            migrations = produce_migrations(context, Base.metadata)
+            code = render_python_code(migrations.upgrade_ops)
+            assert "op.create_updated_at_trigger('foo', schema=None)" in code
+
+            [op] = self.diff(connection, Base.metadata)
+            Operations(context).invoke(op)
+            assert has_trigger(connection, "foo")
+            assert self.diff(connection, Base.metadata) == []
+
+            Operations(context).drop_updated_at_trigger("foo")
+            assert not has_trigger(connection, "foo")
+
+    def test_extraneous_trigger(self):
+        metadata = sqlalchemy.MetaData()
+        sqlalchemy.Table(
+            "foo",
+            metadata,
+            sqlalchemy.Column("id", sqlalchemy.types.Integer(), primary_key=True),
+            sqlalchemy.Column("name", sqlalchemy.types.Unicode()),
+            sqlalchemy.Column("updated_at", sqlalchemy.types.DateTime(timezone=True)),
+        )
+
+        engine = sqlalchemy.create_engine("sqlite://")
+        with engine.begin() as connection:
+            Base.metadata.create_all(bind=connection)
+
+            [op] = self.diff(connection, metadata)
+            assert isinstance(op, DropUpdatedAtTriggerOp)
+            assert isinstance(op.reverse(), CreateUpdatedAtTriggerOp)
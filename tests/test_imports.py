@@ -0,0 +1,80 @@
+import json
+import subprocess  # nosec
+import sys
+import threading
+
+import pytest
+
+from strapp._lazy import lazy_import
+
+# Heavy dependencies which should only be loaded upon first use, rather than upon import.
+HEAVY = [
+    "datadog",
+    "pytest",
+    "redis",
+    "sentry_sdk",
+    "sqlalchemy",
+    "sqlalchemy.dialects.postgresql",
+    "unittest.mock",
+]
+
+SCRIPT = """
+import json, sys, types
+import {module}
+{use}
+print(json.dumps(sorted(
+    name for name in {heavy!r}
+    # Lazily imported modules are only loaded once their class reverts to a plain module.
+    if name in sys.modules and type(sys.modules[name]) is types.ModuleType
+)))
+"""
+
+
+def loaded_by(module, use=""):
+    script = SCRIPT.format(module=module, use=use, heavy=HEAVY)
+    output = subprocess.check_output([sys.executable, "-c", script])  # nosec
+    return json.loads(output)
+
+
+@pytest.mark.parametrize(
+    "module, expected",
+    [
+        ("strapp.click", []),
+        ("strapp.datadog", []),
+        ("strapp.dramatiq", []),
+        ("strapp.sentry", []),
+        ("strapp.sqlalchemy", ["sqlalchemy"]),
+        ("strapp.flask", []),
+    ],
+)
+def test_heavy_dependencies_load_lazily(module, expected):
+    assert loaded_by(module) == expected
+
+
+def test_lazy_dependencies_load_upon_use():
+    use = "strapp.sentry.sentry_sdk.capture_exception"
+    assert loaded_by("strapp.sentry", use) == ["sentry_sdk"]
+
+    use = "strapp.click.testing.ClickRunner"
+    assert loaded_by("strapp.click", use) == ["unittest.mock"]
+
+    use = "strapp.sqlalchemy.copy_from"
+    assert loaded_by("strapp.sqlalchemy", use) == ["sqlalchemy"]
+
+
+def test_lazy_import_is_thread_safe(tmp_path, monkeypatch):
+    (tmp_path / "strapp_slow_module.py").write_text("import time\ntime.sleep(0.1)\nvalue = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "strapp_slow_module", raising=False)
+
+    module = lazy_import("strapp_slow_module")
+
+    values = []
+    threads = [threading.Thread(target=lambda: values.append(module.value)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # No thread observed the module before it finished executing.
+    assert values == [1] * 5